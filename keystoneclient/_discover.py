@@ -21,6 +21,7 @@ This includes functions like url_for which allow you to retrieve URLs and the
 raw data specified in version discovery responses.
 """
 
+from concurrent import futures
 import logging
 import re
 
@@ -31,11 +32,42 @@ from keystoneclient.i18n import _
 _LOGGER = logging.getLogger(__name__)
 
 
-def get_version_data(session, url, authenticated=None):
-    """Retrieve raw version data from a url."""
+def get_version_data(session, url, authenticated=None, cache=None,
+                     timeout=None):
+    """Retrieve raw version data from a url.
+
+    :param cache: A cache to look the version data up in before requesting
+                  it, and to store it in after. Defaults to the
+                  ``discovery_cache`` of the session if it has one.
+    :type cache: :py:class:`keystoneclient.cache.DiscoveryCache`
+    :param float timeout: A timeout for the request, overriding the one of
+                          the session. (optional)
+    """
+    if cache is None:
+        cache = getattr(session, 'discovery_cache', None)
+
+    if cache is not None:
+        data = cache.get(url, authenticated=authenticated)
+        if data is not None:
+            return data
+
+    data = _fetch_version_data(session, url, authenticated=authenticated,
+                               timeout=timeout)
+
+    if cache is not None:
+        cache.set(url, data, authenticated=authenticated)
+
+    return data
+
+
+def _fetch_version_data(session, url, authenticated=None, timeout=None):
     headers = {'Accept': 'application/json'}
+    kwargs = {}
+    if timeout is not None:
+        kwargs['timeout'] = timeout
 
-    resp = session.get(url, headers=headers, authenticated=authenticated)
+    resp = session.get(url, headers=headers, authenticated=authenticated,
+                       **kwargs)
 
     try:
         body_resp = resp.json()
@@ -70,6 +102,114 @@ def get_version_data(session, url, authenticated=None):
     raise exceptions.DiscoveryFailure(msg)
 
 
+def get_version_data_many(session, urls, authenticated=None, cache=None,
+                          timeout=None, version=None, max_workers=10):
+    """Retrieve raw version data from several urls concurrently.
+
+    The urls are requested at the same time and the version data of the ones
+    that respond is merged, so the slowest or an unreachable candidate only
+    costs its own timeout.
+
+    :param list urls: The candidate urls, for example the unversioned root
+                      and the versioned endpoints of a service.
+    :param float timeout: A timeout for each request, overriding the one of
+                          the session. (optional)
+    :param version: If given, return the version data of the first url to
+                    respond with a version matching it, without waiting for
+                    the other urls. (optional)
+    :param int max_workers: The maximum number of requests in flight at once.
+
+    See :py:func:`get_version_data` for the other parameters.
+
+    :returns: The version data of the urls. A version advertised by several
+              urls is only listed once.
+    :rtype: list
+
+    :raises keystoneclient.exceptions.DiscoveryFailure: if none of the urls
+        returned version data.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        raise exceptions.DiscoveryFailure(_('No URLs to discover given'))
+
+    if version is not None:
+        version = normalize_version_number(version)
+
+    def fetch(url):
+        return get_version_data(session, url, authenticated=authenticated,
+                                cache=cache, timeout=timeout)
+
+    results = {}
+    errors = []
+
+    executor = futures.ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(urls))))
+    try:
+        pending = dict((executor.submit(fetch, url), url) for url in urls)
+
+        for future in futures.as_completed(pending):
+            url = pending[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                _LOGGER.debug('Version discovery at %(url)s failed: %(err)s',
+                              {'url': url, 'err': e})
+                errors.append('%s: %s' % (url, e))
+                continue
+
+            if version is not None and _has_version(data, version):
+                return data
+
+            results[url] = data
+    finally:
+        # don't wait on the remaining requests once a match is found
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not results:
+        msg = _('Version discovery failed for all URLs: %s')
+        raise exceptions.DiscoveryFailure(msg % '; '.join(errors))
+
+    merged = []
+    seen = set()
+
+    for url in urls:
+        for v in results.get(url, []):
+            key = (v.get('id'), _self_link(v))
+            if key not in seen:
+                seen.add(key)
+                merged.append(v)
+
+    return merged
+
+
+def _self_link(version_data):
+    for link in version_data.get('links') or []:
+        try:
+            if link['rel'].lower() == 'self':
+                return link['href']
+        except (KeyError, TypeError, AttributeError):
+            continue
+
+    return None
+
+
+def _has_version(data, version):
+    # the versions considered are the ones Discover.data_for accepts
+    statuses = Discover.CURRENT_STATUSES + Discover.DEPRECATED_STATUSES
+
+    for v in data:
+        try:
+            status = v['status'].lower()
+            candidate = normalize_version_number(v['id'])
+        except (KeyError, AttributeError, TypeError):
+            continue
+
+        if status in statuses and version_match(version, candidate):
+            return True
+
+    return False
+
+
 def normalize_version_number(version):
     """Turn a version representation into a tuple."""
     # trim the v from a 'v2.0' or similar
@@ -138,9 +278,18 @@ class Discover(object):
     DEPRECATED_STATUSES = ('deprecated',)
     EXPERIMENTAL_STATUSES = ('experimental',)
 
-    def __init__(self, session, url, authenticated=None):
-        self._data = get_version_data(session, url,
-                                      authenticated=authenticated)
+    def __init__(self, session, url, authenticated=None, cache=None,
+                 timeout=None):
+        if isinstance(url, (list, tuple)):
+            self._data = get_version_data_many(session, url,
+                                               authenticated=authenticated,
+                                               cache=cache,
+                                               timeout=timeout)
+        else:
+            self._data = get_version_data(session, url,
+                                          authenticated=authenticated,
+                                          cache=cache,
+                                          timeout=timeout)
 
     def raw_version_data(self, allow_experimental=False,
                          allow_deprecated=True, allow_unknown=False):
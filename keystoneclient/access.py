@@ -16,6 +16,7 @@
 
 
 import datetime
+import functools
 import warnings
 
 from oslo_utils import timeutils
@@ -28,6 +29,32 @@ from keystoneclient import service_catalog
 STALE_TOKEN_DURATION = 30
 
 
+def _memoized(f):
+    """Cache the value computed by a property getter on the instance.
+
+    The cached values are discarded whenever the token data is changed
+    through the dict interface of :py:class:`AccessInfo`. Lists are copied on
+    the way out so callers can't corrupt the cached value.
+    """
+    name = f.__name__
+
+    @functools.wraps(f)
+    def inner(self):
+        cache = self.__dict__.setdefault('_property_cache', {})
+
+        try:
+            value = cache[name]
+        except KeyError:
+            value = cache[name] = f(self)
+
+        if isinstance(value, list):
+            value = list(value)
+
+        return value
+
+    return inner
+
+
 class AccessInfo(dict):
     """Encapsulates a raw authentication token from keystone.
 
@@ -89,10 +116,56 @@ class AccessInfo(dict):
         self.service_catalog = service_catalog.ServiceCatalog.factory(
             resource_dict=self, region_name=self._region_name)
 
+    def _invalidate_cache(self):
+        """Forget any values memoized from the token data.
+
+        This is called automatically when the AccessInfo is modified through
+        the dict interface. Changes made to nested structures of the token
+        are not detected and must be followed by a call to this method.
+        """
+        self.__dict__.pop('_property_cache', None)
+
+    def __setitem__(self, key, value):
+        self._invalidate_cache()
+        super(AccessInfo, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._invalidate_cache()
+        super(AccessInfo, self).__delitem__(key)
+
+    def __ior__(self, other):
+        self._invalidate_cache()
+        return super(AccessInfo, self).__ior__(other)
+
+    def clear(self):
+        self._invalidate_cache()
+        super(AccessInfo, self).clear()
+
+    def pop(self, *args):
+        self._invalidate_cache()
+        return super(AccessInfo, self).pop(*args)
+
+    def popitem(self):
+        self._invalidate_cache()
+        return super(AccessInfo, self).popitem()
+
+    def setdefault(self, key, default=None):
+        self._invalidate_cache()
+        return super(AccessInfo, self).setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self._invalidate_cache()
+        super(AccessInfo, self).update(*args, **kwargs)
+
     @property
     def _region_name(self):
         return self.get('region_name')
 
+    @property
+    @_memoized
+    def _normalized_expires(self):
+        return timeutils.normalize_time(self.expires)
+
     def will_expire_soon(self, stale_duration=None):
         """Determine if expiration is about to occur.
 
@@ -102,7 +175,7 @@ class AccessInfo(dict):
         """
         stale_duration = (STALE_TOKEN_DURATION if stale_duration is None
                           else stale_duration)
-        norm_expires = timeutils.normalize_time(self.expires)
+        norm_expires = self._normalized_expires
         # (gyee) should we move auth_token.will_expire_soon() to timeutils
         # instead of duplicating code here?
         soon = (timeutils.utcnow() + datetime.timedelta(
@@ -480,18 +553,22 @@ class AccessInfoV2(AccessInfo):
             return self['token']['id']
 
     @property
+    @_memoized
     def expires(self):
         return timeutils.parse_isotime(self['token']['expires'])
 
     @property
+    @_memoized
     def issued(self):
         return timeutils.parse_isotime(self['token']['issued_at'])
 
     @property
+    @_memoized
     def username(self):
         return self['user'].get('name', self['user'].get('username'))
 
     @property
+    @_memoized
     def user_id(self):
         return self['user']['id']
 
@@ -504,10 +581,12 @@ class AccessInfoV2(AccessInfo):
         return 'Default'
 
     @property
+    @_memoized
     def role_ids(self):
         return self.get('metadata', {}).get('roles', [])
 
     @property
+    @_memoized
     def role_names(self):
         return [r['name'] for r in self['user'].get('roles', [])]
 
@@ -520,6 +599,7 @@ class AccessInfoV2(AccessInfo):
         return None
 
     @property
+    @_memoized
     def project_name(self):
         try:
             tenant_dict = self['token']['tenant']
@@ -561,10 +641,12 @@ class AccessInfoV2(AccessInfo):
         return False
 
     @property
+    @_memoized
     def project_scoped(self):
         return 'tenant' in self['token']
 
     @property
+    @_memoized
     def domain_scoped(self):
         return False
 
@@ -573,6 +655,7 @@ class AccessInfoV2(AccessInfo):
         return self.get('trust', {}).get('id')
 
     @property
+    @_memoized
     def trust_scoped(self):
         return 'trust' in self
 
@@ -586,6 +669,7 @@ class AccessInfoV2(AccessInfo):
         return None
 
     @property
+    @_memoized
     def project_id(self):
         try:
             tenant_dict = self['token']['tenant']
@@ -712,14 +796,17 @@ class AccessInfoV3(AccessInfo):
         return 'OS-FEDERATION' in self['user']
 
     @property
+    @_memoized
     def expires(self):
         return timeutils.parse_isotime(self['expires_at'])
 
     @property
+    @_memoized
     def issued(self):
         return timeutils.parse_isotime(self['issued_at'])
 
     @property
+    @_memoized
     def user_id(self):
         return self['user']['id']
 
@@ -742,14 +829,17 @@ class AccessInfoV3(AccessInfo):
             raise
 
     @property
+    @_memoized
     def role_ids(self):
         return [r['id'] for r in self.get('roles', [])]
 
     @property
+    @_memoized
     def role_names(self):
         return [r['name'] for r in self.get('roles', [])]
 
     @property
+    @_memoized
     def username(self):
         return self['user']['name']
 
@@ -766,6 +856,7 @@ class AccessInfoV3(AccessInfo):
             return domain['id']
 
     @property
+    @_memoized
     def project_id(self):
         project = self.get('project')
         if project:
@@ -784,6 +875,7 @@ class AccessInfoV3(AccessInfo):
             return project['domain']['name']
 
     @property
+    @_memoized
     def project_name(self):
         project = self.get('project')
         if project:
@@ -803,10 +895,12 @@ class AccessInfoV3(AccessInfo):
         return ('catalog' in self and self['catalog'] and 'project' in self)
 
     @property
+    @_memoized
     def project_scoped(self):
         return 'project' in self
 
     @property
+    @_memoized
     def domain_scoped(self):
         return 'domain' in self
 
@@ -815,6 +909,7 @@ class AccessInfoV3(AccessInfo):
         return self.get('OS-TRUST:trust', {}).get('id')
 
     @property
+    @_memoized
     def trust_scoped(self):
         return 'OS-TRUST:trust' in self
 
@@ -14,6 +14,8 @@ import warnings
 
 from oslo_serialization import jsonutils
 
+from keystoneclient import utils
+
 
 class Adapter(object):
     """An instance of a session with local variables.
@@ -80,7 +82,7 @@ class Adapter(object):
         if self.version:
             kwargs.setdefault('version', self.version)
 
-    def request(self, url, method, **kwargs):
+    def _set_request_kwargs(self, kwargs):
         endpoint_filter = kwargs.setdefault('endpoint_filter', {})
         self._set_endpoint_filter_kwargs(endpoint_filter)
 
@@ -96,6 +98,8 @@ class Adapter(object):
         if self.logger:
             kwargs.setdefault('logger', self.logger)
 
+    def request(self, url, method, **kwargs):
+        self._set_request_kwargs(kwargs)
         return self.session.request(url, method, **kwargs)
 
     def get_token(self, auth=None):
@@ -219,3 +223,83 @@ class LegacyJsonAdapter(Adapter):
                 pass
 
         return resp, body
+
+    def request_items(self, url, method, response_key, chunk_size=65536,
+                      **kwargs):
+        """Make a request and parse the collection in the response lazily.
+
+        The response body is read and decoded incrementally and the items of
+        the list found under ``response_key`` are yielded one at a time, so
+        the whole body is never held in memory at once.
+
+        Note that when the session logs response bodies at debug level the
+        body is still read in full for logging.
+
+        :param str url: The URL to request.
+        :param str method: The HTTP method to use.
+        :param str response_key: The key in the response body holding the
+                                 collection.
+        :param int chunk_size: The number of bytes to read from the response
+                               at a time.
+        :param kwargs: Additional arguments are passed to the request.
+
+        :returns: A tuple of the response and a
+                  :py:class:`keystoneclient.utils.JsonCollectionReader` over
+                  its items. Once the
+                  items are exhausted the other top level members of the body
+                  are available from the reader's ``body`` attribute.
+        """
+        send = super(LegacyJsonAdapter, self).request
+        return request_json_items(send, url, method, response_key,
+                                  chunk_size=chunk_size, **kwargs)
+
+
+class AsyncAdapter(Adapter):
+    """An adapter for use with an asyncio event loop.
+
+    This provides the same client local defaults as :py:class:`Adapter` around
+    a :py:class:`keystoneclient.session.AsyncSession`. The request, token and
+    endpoint methods are coroutines.
+
+    :param session: The session object to wrap.
+    :type session: keystoneclient.session.AsyncSession
+    """
+
+    async def request(self, url, method, **kwargs):
+        self._set_request_kwargs(kwargs)
+        return await self.session.request(url, method, **kwargs)
+
+    async def get_endpoint(self, auth=None, **kwargs):
+        if self.endpoint_override:
+            return self.endpoint_override
+
+        self._set_endpoint_filter_kwargs(kwargs)
+        return await self.session.get_endpoint(auth or self.auth, **kwargs)
+
+
+def request_json_items(send, url, method, response_key, chunk_size=65536,
+                       **kwargs):
+    """Make a streamed JSON request with send and read its items lazily.
+
+    This implements :py:meth:`LegacyJsonAdapter.request_items` on top of the
+    ``request`` method of any adapter, including those of keystoneauth1.
+
+    :param send: The request method, called as ``send(url, method, **kwargs)``
+                 and returning a :py:class:`requests.Response`.
+
+    The other arguments and the return value are those of
+    :py:meth:`LegacyJsonAdapter.request_items`.
+    """
+    headers = kwargs.setdefault('headers', {})
+    headers.setdefault('Accept', 'application/json')
+
+    try:
+        kwargs['json'] = kwargs.pop('body')
+    except KeyError:  # nosec: 'json' is an optional argument
+        pass
+
+    kwargs['stream'] = True
+    resp = send(url, method, **kwargs)
+    chunks = resp.iter_content(chunk_size=chunk_size)
+    return resp, utils.JsonCollectionReader(chunks, response_key,
+                                            close=resp.close)
@@ -184,6 +184,23 @@ class BaseAuthPlugin(object):
         """
         return None
 
+    def get_endpoints(self, session, **kwargs):
+        """Return all the endpoints matching the client's requirements.
+
+        This takes the same arguments as :py:meth:`get_endpoint` and is used
+        to spread requests across equivalent endpoints. By default only the
+        endpoint returned by :py:meth:`get_endpoint` is given.
+
+        :param session: The session object that the auth_plugin belongs to.
+        :type session: keystoneclient.session.Session
+
+        :returns: The base URLs that can be used to talk to the required
+                  service, the preferred one first.
+        :rtype: list
+        """
+        url = self.get_endpoint(session, **kwargs)
+        return [url] if url else []
+
     def get_connection_params(self, session, **kwargs):
         """Return any additional connection parameters required for the plugin.
 
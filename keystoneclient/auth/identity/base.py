@@ -11,15 +11,18 @@
 # under the License.
 
 import abc
+import datetime
 import logging
 import threading
 import warnings
 
 from oslo_config import cfg
+from oslo_utils import timeutils
 
 from keystoneclient import _discover
 from keystoneclient.auth import base
 from keystoneclient import exceptions
+from keystoneclient import utils
 
 LOG = logging.getLogger(__name__)
 
@@ -36,13 +39,22 @@ class BaseIdentityPlugin(base.BaseAuthPlugin, metaclass=abc.ABCMeta):
     # least this many seconds before the token expiry time
     MIN_TOKEN_LIFE_SECONDS = 120
 
+    # the number of seconds to wait after a failed background refresh before
+    # trying again
+    REFRESH_RETRY_SECONDS = 10
+
+    # the number of seconds an endpoint list is reused when the discovery of
+    # one of its endpoints failed, before trying discovery again
+    DISCOVERY_RETRY_SECONDS = 60
+
     def __init__(self,
                  auth_url=None,
                  username=None,
                  password=None,
                  token=None,
                  trust_id=None,
-                 reauthenticate=True):
+                 reauthenticate=True,
+                 refresh_ahead=None):
 
         super(BaseIdentityPlugin, self).__init__()
 
@@ -54,9 +66,17 @@ class BaseIdentityPlugin(base.BaseAuthPlugin, metaclass=abc.ABCMeta):
         self.auth_url = auth_url
         self.auth_ref = None
         self.reauthenticate = reauthenticate
+        self.refresh_ahead = refresh_ahead
 
         self._endpoint_cache = {}
+        self._endpoints_cache = {}
         self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._refresh_failed_at = None
+
+        # The token and the time until which it can be returned without
+        # taking the lock, replaced as a whole so it is read consistently.
+        self._fresh_until = (None, None)
 
         self._username = username
         self._password = password
@@ -240,6 +260,15 @@ class BaseIdentityPlugin(base.BaseAuthPlugin, metaclass=abc.ABCMeta):
         :returns: Valid AccessInfo
         :rtype: :py:class:`keystoneclient.access.AccessInfo`
         """
+        # The token is read once so that it cannot be swapped between the
+        # check and the return. While it is the token the deadline was
+        # computed for and the deadline has not passed, nothing needs doing.
+        auth_ref = self.auth_ref
+        fresh_ref, fresh_until = self._fresh_until
+        if (auth_ref is not None and auth_ref is fresh_ref and
+                timeutils.utcnow() < fresh_until):
+            return auth_ref
+
         # Hey Kids! Thread safety is important particularly in the case where
         # a service is creating an admin style plugin that will then proceed
         # to make calls from many threads. As a token expires all the threads
@@ -248,8 +277,84 @@ class BaseIdentityPlugin(base.BaseAuthPlugin, metaclass=abc.ABCMeta):
         with self._lock:
             if self._needs_reauthenticate():
                 self.auth_ref = self.get_auth_ref(session)
+            elif self._needs_refresh_ahead():
+                self._start_refresh(session)
+
+            auth_ref = self.auth_ref
+            self._fresh_until = (auth_ref, self._get_fresh_until())
+            return auth_ref
+
+    def _get_fresh_until(self):
+        """Return the time until which the token needs no further checks.
+
+        Must be called with the lock held.
+        """
+        if not self.auth_ref:
+            return None
+
+        if not self.reauthenticate:
+            return datetime.datetime.max
+
+        expires = timeutils.normalize_time(self.auth_ref.expires)
+        fresh_until = expires - datetime.timedelta(
+            seconds=self.MIN_TOKEN_LIFE_SECONDS)
+
+        if self.refresh_ahead and self._refresh_thread is None:
+            refresh_at = expires - datetime.timedelta(
+                seconds=self.refresh_ahead)
+            if self._refresh_failed_at is not None:
+                retry = datetime.timedelta(seconds=self.REFRESH_RETRY_SECONDS)
+                refresh_at = max(refresh_at, self._refresh_failed_at + retry)
+            fresh_until = min(fresh_until, refresh_at)
+
+        return fresh_until
+
+    def _needs_refresh_ahead(self):
+        """Return if a new token should be fetched in the background.
+
+        Must be called with the lock held.
+        """
+        if not (self.refresh_ahead and self.reauthenticate and self.auth_ref):
+            return False
+
+        if self._refresh_thread is not None:
+            # a refresh is already in progress.
+            return False
+
+        if self._refresh_failed_at is not None:
+            retry = datetime.timedelta(seconds=self.REFRESH_RETRY_SECONDS)
+            if timeutils.utcnow() < self._refresh_failed_at + retry:
+                return False
+
+        return self.auth_ref.will_expire_soon(self.refresh_ahead)
 
-        return self.auth_ref
+    def _start_refresh(self, session):
+        self._refresh_thread = threading.Thread(target=self._refresh,
+                                                args=(session,),
+                                                name='keystoneclient-refresh')
+        self._refresh_thread.daemon = True
+        self._refresh_thread.start()
+
+    def _refresh(self, session):
+        try:
+            auth_ref = self.get_auth_ref(session)
+        except Exception as e:
+            LOG.warning('Failed to refresh the token in the background, the '
+                        'current token will be used until it expires: %s', e)
+            with self._lock:
+                self._refresh_failed_at = timeutils.utcnow()
+                self._refresh_thread = None
+                self._fresh_until = (None, None)
+            return
+
+        with self._lock:
+            # a token fetched in the meantime because the old one expired or
+            # was invalidated is kept if it lasts longer.
+            if not self.auth_ref or auth_ref.expires > self.auth_ref.expires:
+                self.auth_ref = auth_ref
+            self._refresh_failed_at = None
+            self._refresh_thread = None
+            self._fresh_until = (None, None)
 
     def invalidate(self):
         """Invalidate the current authentication data.
@@ -328,12 +433,89 @@ class BaseIdentityPlugin(base.BaseAuthPlugin, metaclass=abc.ABCMeta):
                                           region_name=region_name,
                                           service_name=service_name)
 
+        return self._versioned_url(session, service_type, url, version)
+
+    def get_endpoints(self, session, service_type=None, interface=None,
+                      region_name=None, service_name=None, version=None,
+                      **kwargs):
+        """Return all the valid endpoints for a service.
+
+        The arguments are the same as for :py:meth:`get_endpoint`. Every
+        endpoint of the catalog matching them is returned, in catalog order,
+        and version discovery is performed on each concurrently.
+
+        The list is resolved once per token. If the discovery of an endpoint
+        failed, or was skipped because the circuit of the session to its host
+        is open, its catalog URL is used and the list is resolved again after
+        :py:attr:`DISCOVERY_RETRY_SECONDS`.
+
+        :return: The valid endpoint URLs.
+        :rtype: list
+        """
+        if interface is base.AUTH_INTERFACE or not service_type:
+            return super(BaseIdentityPlugin, self).get_endpoints(
+                session, service_type=service_type, interface=interface,
+                region_name=region_name, service_name=service_name,
+                version=version, **kwargs)
+
+        interface = interface or 'public'
+        if isinstance(version, list):
+            version = tuple(version)
+
+        auth_ref = self.get_access(session)
+        key = (service_type, interface, region_name, service_name, version)
+        now = timeutils.utcnow()
+
+        try:
+            cached_ref, expires, endpoints = self._endpoints_cache[key]
+        except KeyError:
+            pass
+        else:
+            if cached_ref is auth_ref and (expires is None or now < expires):
+                return list(endpoints)
+
+        urls = auth_ref.service_catalog.get_urls(service_type=service_type,
+                                                 endpoint_type=interface,
+                                                 region_name=region_name,
+                                                 service_name=service_name)
+        urls = list(dict.fromkeys(url for url in urls or () if url))
+        breaker = getattr(session, 'circuit_breaker', None)
+
+        def resolve(url):
+            if not version:
+                return url, True
+            if breaker is not None and breaker.get_state(url) == breaker.OPEN:
+                return url, False
+            return self._discover_url(session, service_type, url, version)
+
+        if version and len(urls) > 1:
+            resolved = utils.map_concurrently(resolve, urls)
+        else:
+            resolved = [resolve(url) for url in urls]
+
+        expires = None
+        if not all(discovered for url, discovered in resolved):
+            expires = now + datetime.timedelta(
+                seconds=self.DISCOVERY_RETRY_SECONDS)
+
+        endpoints = list(dict.fromkeys(url for url, discovered in resolved
+                                       if url))
+        self._endpoints_cache[key] = (auth_ref, expires, endpoints)
+        return list(endpoints)
+
+    def _versioned_url(self, session, service_type, url, version):
         if not version:
             # NOTE(jamielennox): This may not be the best thing to default to
             # but is here for backwards compatibility. It may be worth
             # defaulting to the most recent version.
             return url
 
+        return self._discover_url(session, service_type, url, version)[0]
+
+    def _discover_url(self, session, service_type, url, version):
+        # Return the URL of the version of an endpoint, and whether it could
+        # be discovered.
+
         # NOTE(jamielennox): For backwards compatibility people might have a
         # versioned endpoint in their catalog even though they want to use
         # other endpoint versions. So we support a list of client defined
@@ -352,10 +534,9 @@ class BaseIdentityPlugin(base.BaseAuthPlugin, metaclass=abc.ABCMeta):
             LOG.warning(
                 'Failed to contact the endpoint at %s for discovery. Fallback '
                 'to using that endpoint as the base url.', url)
-        else:
-            url = disc.url_for(version)
+            return url, False
 
-        return url
+        return disc.url_for(version), True
 
     def get_user_id(self, session, **kwargs):
         return self.get_access(session).user_id
@@ -387,6 +568,14 @@ class BaseIdentityPlugin(base.BaseAuthPlugin, metaclass=abc.ABCMeta):
 
         :returns: A discovery object with the results of looking up that URL.
         """
+        # A discovery cache on the session handles expiry and sharing between
+        # auth plugins itself, so the plugin keeps no Discover objects then.
+        discovery_cache = getattr(session, 'discovery_cache', None)
+        if discovery_cache is not None:
+            return _discover.Discover(session, url,
+                                      authenticated=authenticated,
+                                      cache=discovery_cache)
+
         # NOTE(jamielennox): we want to cache endpoints on the session as well
         # so that they maintain sharing between auth plugins. Create a cache on
         # the session if it doesn't exist already.
@@ -32,6 +32,12 @@ class Auth(base.BaseIdentityPlugin, metaclass=abc.ABCMeta):
     :param string tenant_name: Tenant name for project scoping.
     :param bool reauthenticate: Allow fetching a new token if the current one
                                 is going to expire. (optional) default True
+    :param int refresh_ahead: Fetch a new token in a background thread once
+                              the current one expires within this many
+                              seconds, while the current one keeps being
+                              used, so that requests do not wait for a new
+                              token when it expires. It should be larger than
+                              MIN_TOKEN_LIFE_SECONDS. (optional) default None
     """
 
     @classmethod
@@ -50,9 +56,11 @@ class Auth(base.BaseIdentityPlugin, metaclass=abc.ABCMeta):
                  trust_id=None,
                  tenant_id=None,
                  tenant_name=None,
-                 reauthenticate=True):
+                 reauthenticate=True,
+                 refresh_ahead=None):
         super(Auth, self).__init__(auth_url=auth_url,
-                                   reauthenticate=reauthenticate)
+                                   reauthenticate=reauthenticate,
+                                   refresh_ahead=refresh_ahead)
 
         self._trust_id = trust_id
         self.tenant_id = tenant_id
@@ -42,6 +42,12 @@ class BaseAuth(base.BaseIdentityPlugin, metaclass=abc.ABCMeta):
                                 is going to expire. (optional) default True
     :param bool include_catalog: Include the service catalog in the returned
                                  token. (optional) default True.
+    :param int refresh_ahead: Fetch a new token in a background thread once
+                              the current one expires within this many
+                              seconds, while the current one keeps being
+                              used, so that requests do not wait for a new
+                              token when it expires. It should be larger than
+                              MIN_TOKEN_LIFE_SECONDS. (optional) default None
     """
 
     def __init__(self, auth_url,
@@ -53,9 +59,11 @@ class BaseAuth(base.BaseIdentityPlugin, metaclass=abc.ABCMeta):
                  project_domain_id=None,
                  project_domain_name=None,
                  reauthenticate=True,
-                 include_catalog=True):
+                 include_catalog=True,
+                 refresh_ahead=None):
         super(BaseAuth, self).__init__(auth_url=auth_url,
-                                       reauthenticate=reauthenticate)
+                                       reauthenticate=reauthenticate,
+                                       refresh_ahead=refresh_ahead)
         self._trust_id = trust_id
         self.domain_id = domain_id
         self.domain_name = domain_name
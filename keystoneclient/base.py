@@ -18,8 +18,11 @@
 """Base utilities to build API operation managers and objects on top of."""
 
 import abc
+import collections
 import copy
 import functools
+import itertools
+import time
 import urllib
 import warnings
 
@@ -29,6 +32,17 @@ from oslo_utils import strutils
 
 from keystoneclient import exceptions as ksc_exceptions
 from keystoneclient.i18n import _
+from keystoneclient import session as client_session
+from keystoneclient import utils
+
+
+# Failures after which an operation of a bulk request is attempted again.
+_TRANSIENT_ERRORS = (ksa_exceptions.RetriableConnectionFailure,
+                     ksa_exceptions.RequestTimeout,
+                     ksa_exceptions.TooManyRequests,
+                     ksa_exceptions.BadGateway,
+                     ksa_exceptions.ServiceUnavailable,
+                     ksa_exceptions.GatewayTimeout)
 
 
 class Response(object):
@@ -48,6 +62,42 @@ class Response(object):
         self.data = data
 
 
+class BulkResult(object):
+    """The outcome of one operation of a bulk request.
+
+    :ivar request: the keyword arguments the operation was called with.
+    :ivar result: the value returned by the operation, None if it failed.
+    :ivar error: the exception the operation failed with, None if it
+                 succeeded.
+    :ivar int attempts: the number of times the operation was attempted.
+    :ivar bool planned: whether the operation was only planned, as for a dry
+                        run, and never attempted.
+    """
+
+    def __init__(self, request, planned=False):
+        self.request = request
+        self.result = None
+        self.error = None
+        self.attempts = 0
+        self.planned = planned
+
+    @property
+    def ok(self):
+        """Whether the operation was attempted and succeeded."""
+        return not self.planned and self.error is None
+
+    def __repr__(self):
+        """Return string representation of the outcome."""
+        if self.planned:
+            status = 'planned'
+        elif self.ok:
+            status = 'ok'
+        else:
+            status = 'error=%r' % self.error
+        return '<BulkResult %s attempts=%d %s>' % (
+            status, self.attempts, self.request)
+
+
 def getid(obj):
     """Return id if argument is a Resource.
 
@@ -117,6 +167,184 @@ class Manager(object):
             'may be removed in the 2.0.0 release', DeprecationWarning)
         return self.client
 
+    @property
+    def compact_resources(self):
+        """Whether this manager returns compact resources.
+
+        Set this to True to have the manager return
+        :py:class:`CompactResource` variants of its resource class, which hold
+        their attributes in a single mapping and use considerably less memory.
+        """
+        return issubclass(self.resource_class or Resource, CompactResource)
+
+    @compact_resources.setter
+    def compact_resources(self, value):
+        resource_class = type(self).resource_class
+        if value and resource_class is not None:
+            resource_class = compact_resource_class(resource_class)
+        self.resource_class = resource_class
+
+    @property
+    def resolution_cache(self):
+        """The cache of name and ID resolutions of the client, if any.
+
+        It is shared by all the managers of a client and is not used when the
+        client includes response metadata.
+        """
+        if getattr(self.client, 'include_metadata', False):
+            return None
+        return getattr(self.client, 'resolution_cache', None)
+
+    def _resolution_key(self, name_or_id):
+        if isinstance(name_or_id, bytes):
+            name_or_id = name_or_id.decode('utf-8', 'strict')
+        return (type(self), getattr(self, 'base_url', None), str(name_or_id))
+
+    def _get_resolution(self, name_or_id):
+        """Return the cached resource for a name or ID, or None."""
+        cache = self.resolution_cache
+        if cache is None:
+            return None
+
+        info = cache.get(self._resolution_key(name_or_id))
+        if info is None:
+            return None
+        # the resource may be changed, the cached entry must not be
+        return self.resource_class(self, copy.deepcopy(info), loaded=True)
+
+    def _set_resolution(self, resource, *names):
+        """Cache a resource under its ID and any of the given names."""
+        cache = self.resolution_cache
+        if cache is None or not isinstance(resource, Resource):
+            return
+
+        info = copy.deepcopy(resource._info)
+        resource_id = getattr(resource, 'id', None)
+        for name in (resource_id,) + names:
+            if name is not None:
+                cache.set(self._resolution_key(name), info)
+
+    def _remember_listing(self, url, body, resources):
+        """Cache the resources of a listing.
+
+        Resources are always cached by ID. They are also cached by name if
+        the listing is of the complete collection and no other resource in it
+        has the same name.
+        """
+        cache = self.resolution_cache
+        if cache is None:
+            return
+
+        names = collections.Counter()
+        if self._is_complete_listing(url) and not body.get('truncated'):
+            names.update(getattr(r, 'name', None) for r in resources)
+
+        for resource in resources:
+            name = getattr(resource, 'name', None)
+            if name is not None and names[name] == 1:
+                self._set_resolution(resource, name)
+            else:
+                self._set_resolution(resource)
+
+    def _is_complete_listing(self, url):
+        return False
+
+    def _forget_resolutions(self, url, *bodies):
+        """Drop the cached resolutions of the resources a write changed.
+
+        Those are the resources identified by a segment of the URL or by an
+        ID in the request or response body, which are forgotten under both
+        their ID and name, and the resources cached under a name in the
+        bodies, which a new or renamed resource may now share.
+        """
+        cache = self.resolution_cache
+        if cache is None:
+            return
+
+        ids = set(urllib.parse.urlsplit(url).path.split('/'))
+        names = set()
+        for body in bodies:
+            if not isinstance(body, dict):
+                continue
+            for data in body.values():
+                if isinstance(data, dict):
+                    ids.add(data.get('id'))
+                    names.add(data.get('name'))
+
+        # a changed resource is also cached under its previous name
+        for resource_id in ids:
+            if resource_id and isinstance(resource_id, str):
+                info = cache.pop(self._resolution_key(resource_id))
+                if info:
+                    names.add(info.get('name'))
+
+        for name in names:
+            if name and isinstance(name, str):
+                cache.delete(self._resolution_key(name))
+
+    def _write(self, method, url, **kwargs):
+        # Send a request that changes resources, then forget the resolutions
+        # it may have made stale, even if it failed as it may have been
+        # applied regardless.
+        resp_body = None
+        try:
+            resp, resp_body = getattr(self.client, method)(url, **kwargs)
+        finally:
+            self._forget_resolutions(url, kwargs.get('body'), resp_body)
+        return resp, resp_body
+
+    def _bulk(self, func, requests, max_workers=10, retries=2,
+              retry_delay=0.5):
+        """Call func once for each of the requests concurrently.
+
+        :param func: the operation, called with each request as keyword
+                     arguments.
+        :param requests: a list of dicts of keyword arguments.
+        :param int max_workers: the maximum number of operations in flight.
+        :param int retries: the number of times an operation that failed
+                            with a transient error is attempted again. Not
+                            used if the session of the client has a retry
+                            policy, which already retried the operation.
+        :param float retry_delay: the bound of the first delay before a
+                                  retry, doubled for each one after. The
+                                  delays are picked at random up to the
+                                  bound, as by
+                                  :py:class:`keystoneclient.session.RetryPolicy`.
+
+        :returns: a :py:class:`BulkResult` for each request, in order.
+        :rtype: list
+        """
+        session = getattr(self.client, 'session', None)
+        if getattr(session, 'retry_policy', None) is not None:
+            retries = 0
+
+        policy = client_session.RetryPolicy(max_attempts=retries + 1,
+                                            backoff=retry_delay)
+
+        def run(request):
+            outcome = BulkResult(request)
+
+            while True:
+                outcome.attempts += 1
+                try:
+                    outcome.result = func(**request)
+                    outcome.error = None
+                    return outcome
+                except _TRANSIENT_ERRORS as e:
+                    outcome.error = e
+                    delay = policy.get_delay(
+                        outcome.attempts - 1, 0,
+                        response=getattr(e, 'response', None))
+                    if delay is None:
+                        return outcome
+                except Exception as e:
+                    outcome.error = e
+                    return outcome
+
+                time.sleep(delay)
+
+        return utils.map_concurrently(run, requests, max_workers=max_workers)
+
     def _prepare_return_value(self, http_response, data):
         if self.client.include_metadata:
             return Response(http_response, data)
@@ -142,6 +370,13 @@ class Manager(object):
         if obj_class is None:
             obj_class = self.resource_class
 
+        data = self._list_data(body, response_key)
+        resources = [obj_class(self, res, loaded=True) for res in data if res]
+        if obj_class is self.resource_class:
+            self._remember_listing(url, body, resources)
+        return self._prepare_return_value(resp, resources)
+
+    def _list_data(self, body, response_key):
         data = body[response_key]
         # NOTE(ja): keystone returns values as list as {'values': [ ... ]}
         #           unlike other services which just return the list...
@@ -151,9 +386,73 @@ class Manager(object):
             # not as expected (see comment above), assumption is that values
             # are already returned in a list (so simply utilize that list)
             pass
+        return data
 
-        return self._prepare_return_value(
-            resp, [obj_class(self, res, loaded=True) for res in data if res])
+    def _list_iter(self, url, response_key, obj_class=None, page_size=None,
+                   **kwargs):
+        """Iterate over the collection a page at a time.
+
+        Pages are only requested as the previous one is exhausted and each
+        page is parsed incrementally as it is read, so neither the collection
+        nor a whole response body is held in memory at once. The next
+        page is found from the ``links.next`` reference of the response or,
+        when ``page_size`` is given and the server does not provide one, by
+        requesting the items after the last one seen with ``marker``.
+
+        :param url: a partial URL, e.g., '/servers'
+        :param response_key: the key to be looked up in response dictionary,
+            e.g., 'servers'
+        :param obj_class: class for constructing the returned objects
+            (self.resource_class will be used by default)
+        :param int page_size: the number of items to request per page with
+            ``limit``. (optional)
+        :param kwargs: Additional arguments will be passed to the request.
+        """
+        if obj_class is None:
+            obj_class = self.resource_class
+
+        def page_url(**params):
+            if not params:
+                return url
+            sep = '&' if '?' in url else '?'
+            return '%s%s%s' % (url, sep, urllib.parse.urlencode(params))
+
+        limit = {'limit': page_size} if page_size else {}
+        next_url = page_url(**limit)
+        visited = set()
+        first_ids = set()
+
+        while next_url and next_url not in visited:
+            visited.add(next_url)
+            resp, items = self.client.request_items(next_url, 'GET',
+                                                    response_key, **kwargs)
+            count = 0
+            last_id = None
+
+            # closing the reader releases the response when the caller stops
+            # iterating before the end of the page
+            with items:
+                for res in items:
+                    if not res:
+                        continue
+
+                    last_id = res.get('id')
+                    if count == 0 and last_id is not None:
+                        # A server that ignores marker will hand back a page
+                        # that has already been seen, stop rather than loop
+                        # over it.
+                        if last_id in first_ids:
+                            return
+                        first_ids.add(last_id)
+
+                    count += 1
+                    yield obj_class(self, res, loaded=True)
+
+            next_url = (items.body.get('links') or {}).get('next')
+
+            if not next_url and page_size and count >= page_size:
+                if last_id is not None:
+                    next_url = page_url(marker=last_id, **limit)
 
     def _get(self, url, response_key, **kwargs):
         """Get an object from collection.
@@ -188,7 +487,7 @@ class Manager(object):
             Python object of self.resource_class
         :param kwargs: Additional arguments will be passed to the request.
         """
-        resp, body = self.client.post(url, body=body, **kwargs)
+        resp, body = self._write('post', url, body=body, **kwargs)
         if return_raw:
             return body[response_key]
         return self._prepare_return_value(
@@ -204,7 +503,7 @@ class Manager(object):
             e.g., 'servers'
         :param kwargs: Additional arguments will be passed to the request.
         """
-        resp, body = self.client.put(url, body=body, **kwargs)
+        resp, body = self._write('put', url, body=body, **kwargs)
         # PUT requests may not return a body
         if body is not None:
             if response_key is not None:
@@ -228,7 +527,7 @@ class Manager(object):
             e.g., 'servers'
         :param kwargs: Additional arguments will be passed to the request.
         """
-        resp, body = self.client.patch(url, body=body, **kwargs)
+        resp, body = self._write('patch', url, body=body, **kwargs)
         if response_key is not None:
             return self._prepare_return_value(
                 resp, self.resource_class(self, body[response_key]))
@@ -242,20 +541,20 @@ class Manager(object):
         :param url: a partial URL, e.g., '/servers/my-server'
         :param kwargs: Additional arguments will be passed to the request.
         """
-        resp, body = self.client.delete(url, **kwargs)
+        resp, body = self._write('delete', url, **kwargs)
         return resp, self._prepare_return_value(resp, body)
 
     def _update(self, url, body=None, response_key=None, method="PUT",
                 **kwargs):
-        methods = {"PUT": self.client.put,
-                   "POST": self.client.post,
-                   "PATCH": self.client.patch}
+        methods = {"PUT": 'put',
+                   "POST": 'post',
+                   "PATCH": 'patch'}
         try:
-            resp, body = methods[method](url, body=body,
-                                         **kwargs)
+            method = methods[method]
         except KeyError:
             raise ksc_exceptions.ClientException(_("Invalid update method: %s")
                                                  % method)
+        resp, body = self._write(method, url, body=body, **kwargs)
         # PUT requests may not return a body
         if body:
             return self._prepare_return_value(
@@ -267,6 +566,9 @@ class Manager(object):
 class ManagerWithFind(Manager, metaclass=abc.ABCMeta):
     """Manager with additional `find()`/`findall()` methods."""
 
+    # keyword arguments of list() that the server filters on
+    list_filters = ()
+
     @abc.abstractmethod
     def list(self):
         pass  # pragma: no cover
@@ -274,8 +576,9 @@ class ManagerWithFind(Manager, metaclass=abc.ABCMeta):
     def find(self, **kwargs):
         """Find a single item with attributes matching ``**kwargs``.
 
-        This isn't very efficient: it loads the entire list then filters on
-        the Python side.
+        Attributes named in ``list_filters`` are passed to ``list()`` so that
+        the server filters on them, any others are filtered on the Python
+        side.
         """
         rl = self.findall(**kwargs)
 
@@ -296,29 +599,48 @@ class ManagerWithFind(Manager, metaclass=abc.ABCMeta):
     def findall(self, **kwargs):
         """Find all items with attributes matching ``**kwargs``.
 
-        This isn't very efficient: it loads the entire list then filters on
-        the Python side.
+        Attributes named in ``list_filters`` are passed to ``list()`` so that
+        the server filters on them, any others are filtered on the Python
+        side.
         """
-        found = []
-        searches = kwargs.items()
+        list_kwargs, searches = _split_filters(kwargs, self.list_filters)
 
-        def _extract_data(objs, response_data):
-            for obj in objs:
-                try:
-                    if all(getattr(obj, attr) == value
-                           for (attr, value) in searches):
-                        response_data.append(obj)
-                except AttributeError:
-                    continue
-            return response_data
-
-        objs = self.list()
+        objs = self.list(**list_kwargs)
         if self.client.include_metadata:
             # 'objs' is the object of 'Response' class.
-            objs.data = _extract_data(objs.data, found)
+            objs.data = list(_filter_resources(objs.data, searches))
             return objs
 
-        return _extract_data(objs, found)
+        return list(_filter_resources(objs, searches))
+
+
+def _split_filters(kwargs, supported):
+    """Split filters into those the server supports and all the others.
+
+    If ``supported`` is None all of the filters are considered supported.
+    """
+    if supported is None:
+        return kwargs, {}
+
+    server = {}
+    local = {}
+    for key, value in kwargs.items():
+        if key in supported:
+            server[key] = value
+        else:
+            local[key] = value
+    return server, local
+
+
+def _filter_resources(objs, searches):
+    """Yield the resources with attributes matching ``searches``."""
+    for obj in objs:
+        try:
+            if all(getattr(obj, attr) == value
+                   for (attr, value) in searches.items()):
+                yield obj
+        except AttributeError:
+            continue
 
 
 class CrudManager(Manager):
@@ -338,6 +660,9 @@ class CrudManager(Manager):
     collection_key = None
     key = None
     base_url = None
+    # query parameters the server filters the collection on, find() filters
+    # on any others on the Python side. None passes every filter to the server
+    server_filters = None
 
     def build_url(self, dict_args_in_out=None):
         """Build a resource URL for the given kwargs.
@@ -393,6 +718,10 @@ class CrudManager(Manager):
     def head(self, **kwargs):
         return self._head(self.build_url(dict_args_in_out=kwargs))
 
+    def _is_complete_listing(self, url):
+        collection_url = self.build_url()
+        return url in (collection_url, collection_url + '?')
+
     def _build_query(self, params):
         if params is None:
             return ''
@@ -416,7 +745,20 @@ class CrudManager(Manager):
         return '?%s' % '&'.join(params_list) if params_list else ''
 
     @filter_kwargs
-    def list(self, fallback_to_auth=False, **kwargs):
+    def list(self, fallback_to_auth=False, stream=False, page_size=None,
+             **kwargs):
+        """List the collection.
+
+        :param bool fallback_to_auth: retry against the auth interface if the
+            catalog has no endpoint for the identity service.
+        :param bool stream: return a generator that requests the collection a
+            page at a time, following ``links.next`` or ``marker`` and
+            ``limit``, instead of a list. Streamed resources are yielded
+            without response metadata.
+        :param int page_size: when streaming, the number of items to request
+            per page. (optional)
+        :param kwargs: any other attribute provided will filter on.
+        """
 
         def return_resp(resp, include_metadata=False):
             base_response = None
@@ -440,6 +782,11 @@ class CrudManager(Manager):
 
         url = self.build_url(dict_args_in_out=kwargs)
 
+        if stream:
+            query = self._build_query(kwargs) if kwargs else ''
+            return self._stream_list('%s%s' % (url, query), page_size,
+                                     fallback_to_auth)
+
         try:
             query = self._build_query(kwargs)
             url_query = '%(url)s%(query)s' % {'url': url, 'query': query}
@@ -456,6 +803,33 @@ class CrudManager(Manager):
             else:
                 raise
 
+    def _stream_list(self, url, page_size, fallback_to_auth):
+        pages = self._list_iter(url, self.collection_key,
+                                page_size=page_size)
+        try:
+            first = next(pages)
+        except StopIteration:
+            return
+        except ksa_exceptions.EmptyCatalog:
+            if not fallback_to_auth:
+                raise
+            pages = self._list_iter(url, self.collection_key,
+                                    page_size=page_size,
+                                    endpoint_filter={
+                                        'interface': plugin.AUTH_INTERFACE})
+        else:
+            yield first
+
+        yield from pages
+
+    def iter_list(self, **kwargs):
+        """Iterate over the collection a page at a time.
+
+        This is a shortcut for calling ``list`` with ``stream=True`` and
+        accepts the same arguments.
+        """
+        return self.list(stream=True, **kwargs)
+
     @filter_kwargs
     def put(self, **kwargs):
         return self._update(
@@ -479,22 +853,30 @@ class CrudManager(Manager):
 
     @filter_kwargs
     def find(self, **kwargs):
-        """Find a single item with attributes matching ``**kwargs``."""
+        """Find a single item with attributes matching ``**kwargs``.
+
+        Attributes named in ``server_filters`` are sent as query parameters,
+        any others are filtered on the Python side. The collection is read a
+        page at a time and no more is read once a second match is found.
+        """
         url = self.build_url(dict_args_in_out=kwargs)
+        query_kwargs, searches = _split_filters(kwargs, self.server_filters)
 
-        query = self._build_query(kwargs)
+        query = self._build_query(query_kwargs)
         url_query = '%(url)s%(query)s' % {
             'url': url,
             'query': query
         }
-        elements = self._list(
-            url_query,
-            self.collection_key)
 
         if self.client.include_metadata:
-            base_response = elements
-            elements = elements.data
-            base_response.data = elements[0]
+            base_response = self._list(url_query, self.collection_key)
+            elements = list(_filter_resources(base_response.data, searches))
+            base_response.data = elements[0] if elements else None
+        else:
+            pages = self._list_iter(url_query, self.collection_key)
+            elements = list(itertools.islice(
+                _filter_resources(pages, searches), 2))
+            pages.close()
 
         if not elements:
             msg = _("No %(name)s matching %(kwargs)s.") % {
@@ -612,3 +994,79 @@ class Resource(object):
 
     def delete(self):
         return self.manager.delete(self)
+
+
+class CompactResource(Resource):
+    """A resource that keeps its attributes in a single mapping.
+
+    A :py:class:`Resource` stores each attribute both on the instance and in
+    ``_info``. A compact resource stores them only in ``_info`` and looks them
+    up from there on attribute access, and :py:meth:`to_dict` only copies the
+    nested containers that a caller could modify. This makes large numbers of
+    resources considerably cheaper to hold.
+
+    Compact variants of a manager's resource class are created by
+    :py:func:`compact_resource_class` and used once a manager is switched to
+    them with :py:attr:`Manager.compact_resources`.
+    """
+
+    __slots__ = ()
+
+    _SLOTS = ('manager', '_info', '_loaded')
+
+    def __repr__(self):
+        """Return string representation of resource attributes."""
+        reprkeys = sorted(k for k in self._info
+                          if k[0] != '_' and k != 'manager')
+        info = ", ".join("%s=%s" % (k, getattr(self, k)) for k in reprkeys)
+        return "<%s %s>" % (self.__class__.__name__, info)
+
+    def __setattr__(self, k, v):
+        if k in self._SLOTS or hasattr(type(self), k):
+            super(CompactResource, self).__setattr__(k, v)
+        else:
+            self._info[k] = v
+
+    def _add_details(self, info):
+        if info is not self._info:
+            self._info.update(info)
+
+    def __getattr__(self, k):
+        """Look up attributes in the resource information."""
+        if k in self._SLOTS:
+            raise AttributeError(k)
+
+        try:
+            return self._info[k]
+        except KeyError:
+            # NOTE(bcwaldon): disallow lazy-loading if already loaded once
+            if not self.is_loaded():
+                self.get()
+                return self.__getattr__(k)
+
+            raise AttributeError(k)
+
+    def to_dict(self):
+        return dict((k, copy.deepcopy(v) if isinstance(v, (dict, list)) else v)
+                    for k, v in self._info.items())
+
+
+@functools.lru_cache(maxsize=None)
+def compact_resource_class(resource_class):
+    """Return the compact variant of a resource class.
+
+    The returned class is a subclass of both ``resource_class`` and
+    :py:class:`CompactResource`, so ``isinstance`` checks against the original
+    class keep working.
+
+    :param resource_class: The resource class to make compact.
+    :type resource_class: :py:class:`Resource` subclass
+    """
+    if issubclass(resource_class, CompactResource):
+        return resource_class
+
+    return type(resource_class.__name__,
+                (CompactResource, resource_class),
+                {'__slots__': CompactResource._SLOTS,
+                 '__module__': resource_class.__module__,
+                 '__qualname__': resource_class.__qualname__})
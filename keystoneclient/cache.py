@@ -0,0 +1,485 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Caches shared by the client managers and the HTTP client."""
+
+import collections
+import contextlib
+import datetime
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+
+from oslo_utils import timeutils
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from keystoneclient import access
+
+
+_logger = logging.getLogger(__name__)
+
+
+class MemoryCache(object):
+    """A thread safe in-memory cache with LRU eviction and expiry.
+
+    :param int maxsize: The maximum number of entries held. When the cache is
+                        full the least recently used entry is evicted.
+    :param int ttl: The default number of seconds an entry is valid for. If
+                    None entries are only removed by eviction or explicitly.
+
+    The cache records the number of hits, misses, evictions and expirations
+    it has seen so that it can be sized appropriately, see :py:meth:`stats`.
+    """
+
+    def __init__(self, maxsize=1000, ttl=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be a positive integer')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expiry(self, ttl, expires):
+        if ttl is None:
+            ttl = self.ttl
+        elif self.ttl is not None:
+            ttl = min(ttl, self.ttl)
+
+        if ttl is not None:
+            ttl_expires = timeutils.utcnow() + datetime.timedelta(seconds=ttl)
+            expires = min(expires, ttl_expires) if expires else ttl_expires
+
+        return expires
+
+    def get(self, key, default=None):
+        """Fetch an entry from the cache.
+
+        :param key: The key the value was stored under.
+        :param default: Returned if there is no valid entry for the key.
+        """
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expires and expires <= timeutils.utcnow():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None, expires=None):
+        """Store an entry in the cache.
+
+        :param key: The key to store the value under.
+        :param value: The value to store.
+        :param int ttl: The number of seconds the entry is valid for. This can
+                        only shorten the lifetime configured on the cache.
+        :param expires: An absolute, naive UTC, time after which the entry is
+                        no longer valid regardless of the ttl.
+        :type expires: datetime.datetime
+        """
+        expires = self._expiry(ttl, expires)
+
+        if expires and expires <= timeutils.utcnow():
+            # already stale, there's no point keeping it
+            self.delete(key)
+            return
+
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Remove an entry from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop(self, key, default=None):
+        """Remove an entry from the cache and return its value.
+
+        Unlike :py:meth:`get` this is not counted as a hit or a miss.
+
+        :param key: The key the value was stored under.
+        :param default: Returned if there is no valid entry for the key.
+        """
+        with self._lock:
+            try:
+                value, expires = self._data.pop(key)
+            except KeyError:
+                return default
+
+        if expires and expires <= timeutils.utcnow():
+            return default
+        return value
+
+    def delete_if(self, predicate):
+        """Remove all the entries whose key satisfies the predicate.
+
+        :param predicate: A callable taking a key and returning True if the
+                          entry should be removed.
+        :returns: The number of entries removed.
+        :rtype: int
+        """
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+
+            for k in keys:
+                del self._data[k]
+
+        return len(keys)
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Return the usage counters of the cache.
+
+        :returns: A dict with the current ``size`` and ``maxsize`` of the
+                  cache and the number of ``hits``, ``misses``, ``evictions``
+                  and ``expirations`` seen so far.
+        :rtype: dict
+        """
+        with self._lock:
+            return {'size': len(self._data),
+                    'maxsize': self.maxsize,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations}
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _private_dir(path):
+    """Create a directory only its owner can access, or secure an existing one.
+
+    An existing directory that other users can access is restricted to its
+    owner, and one that belongs to another user is refused.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.stat(path)
+
+    if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+        raise PermissionError('Cache directory %s belongs to another user' %
+                              path)
+
+    if stat.S_IMODE(st.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+
+
+def _write_atomic(path, filename, content):
+    """Replace a file so that readers see either the old or new content."""
+    _private_dir(path)
+    fd, tmp = tempfile.mkstemp(dir=path, prefix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, filename)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+def _user_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'keystoneclient')
+
+
+class FileTokenCache(object):
+    """A token cache in files, shared by the processes of a user.
+
+    Each entry is kept in its own file of compact JSON holding the token data
+    and catalog, named after a hash of the key so that no credential appears
+    in a file name. Entries are replaced atomically, so they are read without
+    taking a lock, and :py:meth:`lock` serializes the processes that would
+    otherwise all re-authenticate at once when an entry is missing or stale.
+    There is a single lock file for the directory, rather than one per key
+    that would be left behind when the entry goes.
+
+    The directory is created readable by its owner only, and an existing
+    directory is restricted to its owner before it is used. A directory that
+    belongs to another user is not used at all. File locking is only
+    available on platforms that provide :py:mod:`fcntl`, elsewhere
+    :py:meth:`lock` does nothing.
+
+    :param str path: The directory to keep the entries in. Defaults to
+                     ``keystoneclient/tokens`` under the user's cache
+                     directory, ``$XDG_CACHE_HOME`` or ``~/.cache``.
+    """
+
+    _FORMAT = 2
+    _LOCK = '.lock'
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(_user_cache_dir(), 'tokens')
+
+    def _filename(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, digest + '.json')
+
+    def get(self, key):
+        """Fetch the token stored under a key.
+
+        :param str key: The key the token was stored under.
+
+        :returns: The token, or None if there is no entry for the key, it has
+                  expired or it cannot be read.
+        :rtype: :py:class:`keystoneclient.access.AccessInfo`
+        """
+        try:
+            _private_dir(self.path)
+            with open(self._filename(key), 'rb') as f:
+                entry = json.loads(f.read().decode('utf-8'))
+
+            if entry.get('format') != self._FORMAT:
+                return None
+
+            expires = timeutils.normalize_time(
+                timeutils.parse_isotime(entry['expires']))
+            if expires <= timeutils.utcnow():
+                return None
+
+            return access.AccessInfo.factory(body=entry['body'],
+                                             auth_token=entry['auth_token'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            _logger.warning('Unable to read token from cache %s', e)
+            return None
+
+    def set(self, key, auth_ref):
+        """Store a token under a key, replacing any previous entry.
+
+        :param str key: The key to store the token under.
+        :param auth_ref: The token to store.
+        :type auth_ref: :py:class:`keystoneclient.access.AccessInfo`
+        """
+        data = dict(auth_ref)
+        data.pop('auth_token', None)
+        if isinstance(auth_ref, access.AccessInfoV3):
+            body = {'token': data}
+        else:
+            body = {'access': data}
+        entry = {'format': self._FORMAT,
+                 'expires': auth_ref.expires.isoformat(),
+                 'auth_token': auth_ref.auth_token,
+                 'body': body}
+        content = json.dumps(entry, separators=(',', ':')).encode('utf-8')
+
+        try:
+            _write_atomic(self.path, self._filename(key), content)
+        except OSError as e:
+            _logger.warning('Failed to store token into cache %s', e)
+
+    def delete(self, key):
+        """Remove the entry for a key if present."""
+        try:
+            os.unlink(self._filename(key))
+        except FileNotFoundError:
+            pass
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        """Hold an exclusive lock on a key across processes.
+
+        The keys share the lock of the directory, so a process also waits
+        while another one re-authenticates for a different key.
+
+        :param str key: The key to lock.
+        """
+        if fcntl is None:
+            yield
+            return
+
+        try:
+            _private_dir(self.path)
+            fd = os.open(os.path.join(self.path, self._LOCK),
+                         os.O_CREAT | os.O_RDWR, 0o600)
+        except OSError as e:
+            _logger.warning('Unable to lock token cache %s', e)
+            fd = None
+
+        try:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+
+class DiscoveryCache(object):
+    """A cache of the version data returned by discovery.
+
+    Version documents rarely change, so a cache shared by the discoveries of a
+    session saves a request each time a client or auth plugin looks up the
+    versions of an endpoint. Entries are kept in memory and, if a path is
+    given, also in files so that they outlive the process, for example across
+    CLI invocations. The version data fetched with and without authentication
+    may differ and is cached separately.
+
+    :param int maxsize: The maximum number of URLs held in memory.
+    :param int ttl: The number of seconds version data is used for before it
+                    is fetched again. If None it is kept until invalidated.
+    :param str path: A directory to also store the version data in.
+                     (optional)
+    """
+
+    _FORMAT = 2
+    # distinct from the files of a FileTokenCache sharing the directory
+    _SUFFIX = '.versions.json'
+    _AUTHENTICATED = (None, True, False)
+
+    def __init__(self, maxsize=100, ttl=3600, path=None):
+        self.ttl = ttl
+        self.path = path
+        self._memory = MemoryCache(maxsize=maxsize, ttl=ttl)
+
+    def _filename(self, url, authenticated):
+        key = '%s %s' % (authenticated, url)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, digest + self._SUFFIX)
+
+    def _load(self, url, authenticated):
+        try:
+            with open(self._filename(url, authenticated), 'rb') as f:
+                entry = json.loads(f.read().decode('utf-8'))
+
+            if (entry.get('format') != self._FORMAT or
+                    entry['url'] != url or
+                    entry['authenticated'] != authenticated):
+                return None, None
+
+            expires = None
+            if self.ttl is not None:
+                fetched_at = timeutils.normalize_time(
+                    timeutils.parse_isotime(entry['fetched_at']))
+                expires = fetched_at + datetime.timedelta(seconds=self.ttl)
+                if expires <= timeutils.utcnow():
+                    return None, None
+
+            return entry['data'], expires
+        except FileNotFoundError:
+            return None, None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            _logger.warning('Unable to read discovery cache %s', e)
+            return None, None
+
+    def get(self, url, authenticated=None):
+        """Fetch the version data of a URL.
+
+        :param str url: The URL discovery was performed on.
+        :param bool authenticated: The authenticated argument discovery was
+                                   performed with. (optional)
+
+        :returns: The version data, or None if there is no fresh entry.
+        :rtype: list
+        """
+        key = (url, authenticated)
+        data = self._memory.get(key)
+
+        if data is None and self.path:
+            data, expires = self._load(url, authenticated)
+            if data is not None:
+                self._memory.set(key, data, expires=expires)
+
+        return data
+
+    def set(self, url, data, authenticated=None):
+        """Store the version data of a URL.
+
+        :param str url: The URL discovery was performed on.
+        :param list data: The version data returned from the URL.
+        :param bool authenticated: The authenticated argument discovery was
+                                   performed with. (optional)
+        """
+        self._memory.set((url, authenticated), data)
+
+        if self.path:
+            entry = {'format': self._FORMAT,
+                     'url': url,
+                     'authenticated': authenticated,
+                     'fetched_at': timeutils.utcnow().isoformat(),
+                     'data': data}
+            content = json.dumps(entry, separators=(',', ':'))
+            try:
+                _write_atomic(self.path, self._filename(url, authenticated),
+                              content.encode('utf-8'))
+            except OSError as e:
+                _logger.warning('Failed to store discovery cache %s', e)
+
+    def invalidate(self, url=None):
+        """Remove the version data of a URL, or of every URL.
+
+        Both the data fetched with and without authentication are removed.
+
+        :param str url: The URL to forget. If None all entries are removed.
+        """
+        if url is None:
+            self._memory.clear()
+            names = []
+            if self.path:
+                try:
+                    names = [os.path.join(self.path, n)
+                             for n in os.listdir(self.path)
+                             if n.endswith(self._SUFFIX)]
+                except FileNotFoundError:
+                    pass
+        else:
+            names = []
+            for authenticated in self._AUTHENTICATED:
+                self._memory.delete((url, authenticated))
+                if self.path:
+                    names.append(self._filename(url, authenticated))
+
+        for name in names:
+            try:
+                os.unlink(name)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        """Return the usage counters of the in-memory cache.
+
+        See :py:meth:`MemoryCache.stats`.
+        """
+        return self._memory.stats()
@@ -67,11 +67,29 @@ def version_match(required, candidate):
 
 
 def available_versions(url, session=None, **kwargs):
-    """Retrieve raw version data from a url."""
+    """Retrieve raw version data from a url.
+
+    If a list of urls is given they are requested concurrently and their
+    version data is merged, see
+    :py:func:`keystoneclient._discover.get_version_data_many`. A ``version``
+    may then be given to return the data of the first url that offers it,
+    and ``max_workers`` limits the number of requests in flight.
+    """
+    cache = kwargs.pop('discovery_cache', None)
+    version = kwargs.pop('version', None)
+    max_workers = kwargs.pop('max_workers', 10)
+    timeout = kwargs.get('timeout')
     if not session:
         session = client_session.Session._construct(kwargs)
 
-    return _discover.get_version_data(session, url)
+    if isinstance(url, (list, tuple)):
+        return _discover.get_version_data_many(session, url, cache=cache,
+                                               timeout=timeout,
+                                               version=version,
+                                               max_workers=max_workers)
+
+    return _discover.get_version_data(session, url, cache=cache,
+                                      timeout=timeout)
 
 
 class Discover(_discover.Discover):
@@ -101,10 +119,13 @@ class Discover(_discover.Discover):
     :param session: A session object that will be used for communication.
                     Clients will also be constructed with this session.
     :type session: keystoneclient.session.Session
-    :param string auth_url: Identity service endpoint for authorization.
-                            (optional)
+    :param string auth_url: Identity service endpoint for authorization. A
+                            list of candidate endpoints may be given, they
+                            are then queried concurrently and the versions
+                            they offer merged. (optional)
     :param string endpoint: A user-supplied endpoint URL for the identity
-                            service. (optional)
+                            service. Like auth_url it may be a list of
+                            candidates. (optional)
     :param string original_ip: The original IP of the requesting user which
                                will be sent to identity service in a
                                'Forwarded' header. (optional) This is ignored
@@ -142,6 +163,9 @@ class Discover(_discover.Discover):
     :param bool authenticated: Should a token be used to perform the initial
                                discovery operations. default: None (attach a
                                token if an auth plugin is available).
+    :param discovery_cache: A cache of version data to use instead of the
+                            session's. (optional)
+    :type discovery_cache: :py:class:`keystoneclient.cache.DiscoveryCache`
 
     """
 
@@ -173,9 +197,11 @@ class Discover(_discover.Discover):
                 _('Not enough information to determine URL. Provide'
                   ' either a Session, or auth_url or endpoint'))
 
+        discovery_cache = kwargs.pop('discovery_cache', None)
         self._client_kwargs = kwargs
         super(Discover, self).__init__(session, url,
-                                       authenticated=authenticated)
+                                       authenticated=authenticated,
+                                       cache=discovery_cache)
 
     @removals.remove(message='Use raw_version_data instead.', version='1.7.0',
                      removal_version='2.0.0')
@@ -0,0 +1,173 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Strategies to spread the requests of a session across endpoints.
+
+When a session is given an endpoint selector, a request resolved through an
+endpoint_filter may be sent to any of the endpoints of the catalog matching
+the filter. The selector orders them for each request, and the request fails
+over to the next endpoint if it cannot connect to one.
+"""
+
+import abc
+import itertools
+import threading
+
+from oslo_utils import timeutils
+
+
+class EndpointSelector(object, metaclass=abc.ABCMeta):
+    """The interface of the endpoint selection strategies.
+
+    The methods are called concurrently by the threads using the session so
+    implementations must be thread safe.
+    """
+
+    @abc.abstractmethod
+    def order(self, endpoints):
+        """Order the endpoints a request may be sent to.
+
+        :param list endpoints: The base URLs of the matching endpoints, in
+                               catalog order.
+
+        :returns: The endpoints in the order they should be tried.
+        :rtype: list
+        """
+
+    def started(self, endpoint):
+        """Record that a request is being sent to an endpoint."""
+        pass
+
+    def finished(self, endpoint, elapsed, failed):
+        """Record that a request to an endpoint completed.
+
+        :param str endpoint: The base URL of the endpoint.
+        :param float elapsed: The number of seconds the request took.
+        :param bool failed: True if the endpoint could not be reached.
+        """
+        pass
+
+
+class RoundRobinSelector(EndpointSelector):
+    """Send each request to the next endpoint in turn."""
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def order(self, endpoints):
+        if not endpoints:
+            return []
+
+        start = next(self._counter) % len(endpoints)
+        return endpoints[start:] + endpoints[:start]
+
+
+class LeastOutstandingSelector(RoundRobinSelector):
+    """Send each request to the endpoint with the fewest requests in flight.
+
+    Endpoints with the same number of requests in flight are taken in turn.
+    """
+
+    def __init__(self):
+        super(LeastOutstandingSelector, self).__init__()
+        self._lock = threading.Lock()
+        self._outstanding = {}
+
+    def order(self, endpoints):
+        endpoints = super(LeastOutstandingSelector, self).order(endpoints)
+
+        with self._lock:
+            return sorted(endpoints,
+                          key=lambda e: self._outstanding.get(e, 0))
+
+    def started(self, endpoint):
+        with self._lock:
+            self._outstanding[endpoint] = self._outstanding.get(endpoint,
+                                                                0) + 1
+
+    def finished(self, endpoint, elapsed, failed):
+        with self._lock:
+            count = self._outstanding.get(endpoint, 0) - 1
+            if count > 0:
+                self._outstanding[endpoint] = count
+            else:
+                self._outstanding.pop(endpoint, None)
+
+
+class EWMASelector(RoundRobinSelector):
+    """Send each request to the endpoint that has been responding fastest.
+
+    The latency of each endpoint is tracked as an exponentially weighted
+    moving average. Endpoints that have not been used yet are tried first,
+    and an endpoint that could not be reached counts as having taken
+    failure_penalty seconds.
+
+    The average of an endpoint also halves every half_life seconds it is not
+    updated, so that an endpoint that was slow or failed is eventually tried
+    again and can win its traffic back once it has recovered.
+
+    :param float decay: The weight of the latest request in the average,
+                        between 0 and 1. (optional, defaults to 0.3)
+    :param float failure_penalty: The latency recorded for a failed request.
+                                  (optional, defaults to 30)
+    :param float half_life: The number of seconds after which the average of
+                            an endpoint that is not used is halved.
+                            (optional, defaults to 10)
+    """
+
+    def __init__(self, decay=0.3, failure_penalty=30.0, half_life=10.0):
+        if not 0 < decay <= 1:
+            raise ValueError('decay must be greater than 0 and at most 1')
+        if half_life <= 0:
+            raise ValueError('half_life must be greater than 0')
+
+        super(EWMASelector, self).__init__()
+        self.decay = decay
+        self.failure_penalty = failure_penalty
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self._latency = {}
+
+    def _current(self, endpoint, now):
+        # Must be called with the lock held.
+        try:
+            latency, updated_at = self._latency[endpoint]
+        except KeyError:
+            return None
+
+        age = (now - updated_at).total_seconds()
+        return latency * 0.5 ** (max(age, 0) / self.half_life)
+
+    def order(self, endpoints):
+        endpoints = super(EWMASelector, self).order(endpoints)
+        now = timeutils.utcnow()
+
+        with self._lock:
+            return sorted(endpoints,
+                          key=lambda e: self._current(e, now) or 0.0)
+
+    def finished(self, endpoint, elapsed, failed):
+        if failed:
+            elapsed = max(elapsed, self.failure_penalty)
+
+        now = timeutils.utcnow()
+
+        with self._lock:
+            latency = self._current(endpoint, now)
+            if latency is not None:
+                elapsed = self.decay * elapsed + (1 - self.decay) * latency
+            self._latency[endpoint] = (elapsed, now)
+
+    def latency(self, endpoint):
+        """Return the average latency of an endpoint, or None if unknown."""
+        with self._lock:
+            return self._current(endpoint, timeutils.utcnow())
@@ -17,6 +17,8 @@
 #    under the License.
 """OpenStack Client interface. Handles the REST calls and responses."""
 
+import contextlib
+import functools
 import importlib.metadata
 import logging
 import warnings
@@ -52,6 +54,7 @@ except (ImportError, importlib.metadata.PackageNotFoundError):
 
 from keystoneclient import _discover
 from keystoneclient import access
+from keystoneclient import adapter as client_adapter
 from keystoneclient.auth import base
 from keystoneclient import baseclient
 from keystoneclient import exceptions
@@ -144,6 +147,19 @@ class _KeystoneAdapter(adapter.LegacyJsonAdapter):
 
         return None
 
+    def request_items(self, url, method, response_key, chunk_size=65536,
+                      **kwargs):
+        """Make a request and parse the collection in the response lazily.
+
+        See :py:meth:`keystoneclient.adapter.LegacyJsonAdapter.request_items`.
+        """
+        # the request of adapter.Adapter, which does not read the body
+        send = functools.partial(adapter.Adapter.request, self)
+        return client_adapter.request_json_items(send, url, method,
+                                                 response_key,
+                                                 chunk_size=chunk_size,
+                                                 **kwargs)
+
 
 class HTTPClient(baseclient.Client, base.BaseAuthPlugin):
     """HTTP client.
@@ -208,6 +224,12 @@ class HTTPClient(baseclient.Client, base.BaseAuthPlugin):
     :param integer stale_duration: Gap in seconds to determine if token from
                                    keyring is about to expire. default: 30
                                    (optional)
+    :param token_cache: A cache shared between processes to keep the auth_ref
+                        in, used instead of the keyring. It must provide
+                        ``get(key)``, ``set(key, auth_ref)`` and a
+                        ``lock(key)`` context manager, see
+                        :py:class:`keystoneclient.cache.FileTokenCache`.
+                        default: None (optional)
     :param string tenant_name: Tenant name. (optional) The tenant_name keyword
                                argument is deprecated as of the 1.7.0 release
                                in favor of project_name and may be removed in
@@ -251,7 +273,8 @@ class HTTPClient(baseclient.Client, base.BaseAuthPlugin):
                  project_domain_id=None, project_domain_name=None,
                  trust_id=None, session=None, service_name=None,
                  interface='default', endpoint_override=None, auth=None,
-                 user_agent=USER_AGENT, connect_retries=None, **kwargs):
+                 user_agent=USER_AGENT, connect_retries=None, token_cache=None,
+                 **kwargs):
         # set baseline defaults
         self.user_id = None
         self.username = None
@@ -404,11 +427,13 @@ class HTTPClient(baseclient.Client, base.BaseAuthPlugin):
         # to write an adapter to the adapter here. Splitting thing into
         # multiple project isn't always all sunshine and roses.
         self._adapter.include_metadata = kwargs.pop('include_metadata', False)
+        self._adapter.resolution_cache = kwargs.pop('resolution_cache', None)
 
         # keyring setup
         if use_keyring and keyring is None:
             _logger.warning('Failed to load keyring modules.')
         self.use_keyring = use_keyring and keyring is not None
+        self.token_cache = token_cache
         self.force_new_token = force_new_token
         self.stale_duration = stale_duration or access.STALE_TOKEN_DURATION
         self.stale_duration = int(self.stale_duration)
@@ -537,16 +562,20 @@ class HTTPClient(baseclient.Client, base.BaseAuthPlugin):
         :raises keystoneclient.exceptions.ValueError: if insufficient
                                                       parameters are used.
 
-        If keyring is used, token is retrieved from keyring instead.
-        Authentication will only be necessary if any of the following
+        If keyring or a token cache is used, token is retrieved from it
+        instead. Authentication will only be necessary if any of the following
         conditions are met:
 
-        * keyring is not used
-        * if token is not found in keyring
-        * if token retrieved from keyring is expired or about to
-          expired (as determined by stale_duration)
+        * keyring and token cache are not used
+        * if token is not found in keyring or token cache
+        * if token retrieved from keyring or token cache is expired or about
+          to expired (as determined by stale_duration)
         * if force_new_token is true
 
+        When a token cache is used, processes that need a new token for the
+        same credentials at the same time wait for the first of them to
+        authenticate and then use its token.
+
         """
         auth_url = auth_url or self.auth_url
         user_id = user_id or self.user_id
@@ -587,29 +616,45 @@ class HTTPClient(baseclient.Client, base.BaseAuthPlugin):
             'trust_id': trust_id,
         }
         (keyring_key, auth_ref) = self.get_auth_ref_from_keyring(**kwargs)
-        new_token_needed = False
         if auth_ref is None or self.force_new_token:
-            new_token_needed = True
-            kwargs['password'] = password
-            resp = self.get_raw_token_from_identity_service(**kwargs)
+            with self._lock_token_cache(keyring_key):
+                if self.token_cache is not None and not self.force_new_token:
+                    # Another process may have stored a token while we waited
+                    # for the lock.
+                    (keyring_key, auth_ref) = self.get_auth_ref_from_keyring(
+                        **kwargs)
+
+                if auth_ref is None or self.force_new_token:
+                    self._authenticate_new(password, region_name, **kwargs)
+                    self.process_token(region_name=region_name)
+                    self.store_auth_ref_into_keyring(keyring_key)
+                    return True
+
+        self.auth_ref = auth_ref
+        if region_name and self.token_cache is not None:
+            self.auth_ref.service_catalog._region_name = region_name
+        self.process_token(region_name=region_name)
+        return True
 
-            if isinstance(resp, access.AccessInfo):
-                self.auth_ref = resp
-            else:
-                self.auth_ref = access.AccessInfo.factory(*resp)
+    def _authenticate_new(self, password, region_name, **kwargs):
+        kwargs['password'] = password
+        resp = self.get_raw_token_from_identity_service(**kwargs)
 
-            # NOTE(jamielennox): The original client relies on being able to
-            # push the region name into the service catalog but new auth
-            # it in.
-            if region_name:
-                self.auth_ref.service_catalog._region_name = region_name
+        if isinstance(resp, access.AccessInfo):
+            self.auth_ref = resp
         else:
-            self.auth_ref = auth_ref
+            self.auth_ref = access.AccessInfo.factory(*resp)
 
-        self.process_token(region_name=region_name)
-        if new_token_needed:
-            self.store_auth_ref_into_keyring(keyring_key)
-        return True
+        # NOTE(jamielennox): The original client relies on being able to
+        # push the region name into the service catalog but new auth
+        # it in.
+        if region_name:
+            self.auth_ref.service_catalog._region_name = region_name
+
+    def _lock_token_cache(self, keyring_key):
+        if self.token_cache is None or keyring_key is None:
+            return contextlib.nullcontext()
+        return self.token_cache.lock(keyring_key)
 
     def _build_keyring_key(self, **kwargs):
         """Create a unique key for keyring.
@@ -624,16 +669,23 @@ class HTTPClient(baseclient.Client, base.BaseAuthPlugin):
     def get_auth_ref_from_keyring(self, **kwargs):
         """Retrieve auth_ref from keyring.
 
-        If auth_ref is found in keyring, (keyring_key, auth_ref) is returned.
-        Otherwise, (keyring_key, None) is returned.
+        If auth_ref is found in the token cache or keyring,
+        (keyring_key, auth_ref) is returned. Otherwise, (keyring_key, None) is
+        returned.
 
         :returns: (keyring_key, auth_ref) or (keyring_key, None)
-        :returns: or (None, None) if use_keyring is not set in the object
+        :returns: or (None, None) if neither token_cache nor use_keyring is
+                  set in the object
 
         """
         keyring_key = None
         auth_ref = None
-        if self.use_keyring:
+        if self.token_cache is not None:
+            keyring_key = self._build_keyring_key(**kwargs)
+            auth_ref = self.token_cache.get(keyring_key)
+            if auth_ref and auth_ref.will_expire_soon(self.stale_duration):
+                auth_ref = None
+        elif self.use_keyring:
             keyring_key = self._build_keyring_key(**kwargs)
             try:
                 auth_ref = keyring.get_password("keystoneclient_auth",
@@ -650,8 +702,10 @@ class HTTPClient(baseclient.Client, base.BaseAuthPlugin):
         return (keyring_key, auth_ref)
 
     def store_auth_ref_into_keyring(self, keyring_key):
-        """Store auth_ref into keyring."""
-        if self.use_keyring:
+        """Store auth_ref into the token cache or keyring."""
+        if self.token_cache is not None:
+            self.token_cache.set(keyring_key, self.auth_ref)
+        elif self.use_keyring:
             try:
                 keyring.set_password("keystoneclient_auth",
                                      keyring_key,
@@ -0,0 +1,267 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measurements of the requests sent by a session."""
+
+import abc
+import bisect
+import contextlib
+import threading
+import time
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+"""The upper bounds, in seconds, of the buckets of a :py:class:`Histogram`."""
+
+
+class RequestMetrics(object):
+    """The measurements of a single call to Session.request.
+
+    The time spent in each phase of the request is kept in ``timings``, a
+    dict from the name of the phase to a number of seconds. The phases are:
+
+    - ``auth``: fetching the authentication headers and connection
+      parameters from the auth plugin.
+    - ``endpoint``: resolving the endpoint_filter to a URL.
+    - ``encode``: serializing the json body.
+    - ``send``: sending the request and receiving the response, including
+      any redirects and retries.
+    - ``retry_wait``: sleeping between connection retries.
+    - ``reauth``: invalidating the auth plugin and fetching new headers
+      after a 401 response.
+    - ``total``: the whole call.
+
+    A phase that was not reached is absent.
+
+    :ivar str method: The HTTP method of the request.
+    :ivar str url: The URL of the request once resolved.
+    :ivar str service_type: The service_type of the endpoint_filter, if any.
+    :ivar str interface: The interface of the endpoint_filter, if any.
+    :ivar int status_code: The status code of the final response, or None if
+                           no response was received.
+    :ivar int retries: The number of connection retries made.
+    :ivar int redirects: The number of redirects followed.
+    :ivar bool reauthenticated: Whether the request was sent again with new
+                                credentials after a 401 response.
+    :ivar int bytes_sent: The size of the request bodies sent.
+    :ivar int bytes_received: The number of bytes of the final response
+                              body read from the connection, as sent and so
+                              before any decompression. The metrics of a
+                              streamed response are recorded when it is
+                              closed, with the part of the body read by then.
+                              None if the size is unknown.
+    :ivar error: The exception raised by the request, if any.
+    """
+
+    def __init__(self, method, url, service_type=None, interface=None):
+        self.method = method
+        self.url = url
+        self.service_type = service_type
+        self.interface = interface
+        self.status_code = None
+        self.retries = 0
+        self.redirects = 0
+        self.reauthenticated = False
+        self.bytes_sent = 0
+        self.bytes_received = None
+        self.error = None
+        self.timings = {}
+
+    @contextlib.contextmanager
+    def time(self, phase):
+        """Add the time spent in the block to the time of a phase."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self.timings[phase] = self.timings.get(phase, 0.0) + elapsed
+
+
+class Collector(object, metaclass=abc.ABCMeta):
+    """The interface of the objects a session reports its requests to.
+
+    Collectors are given to :py:class:`keystoneclient.session.Session` and
+    are called from the thread that made the request once it completes,
+    successfully or not, so they must be thread safe and should be quick.
+    """
+
+    @abc.abstractmethod
+    def record(self, metrics):
+        """Record the measurements of a request.
+
+        :param metrics: The measurements of the request.
+        :type metrics: :py:class:`RequestMetrics`
+        """
+
+
+class Histogram(object):
+    """A count of values in buckets of increasing upper bounds.
+
+    :param tuple buckets: The sorted upper bounds of the buckets. Values
+                          greater than the last bound are counted in an
+                          extra bucket.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Estimate a percentile of the values.
+
+        :param float percent: The percentile to estimate, between 0 and 100.
+
+        :returns: The upper bound of the bucket holding the percentile, or
+                  the largest value if it falls beyond the last bound. None if
+                  there are no values.
+        """
+        if not self.count:
+            return None
+
+        rank = percent / 100.0 * self.count
+        seen = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max)
+
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count,
+                'sum': self.sum,
+                'min': self.min,
+                'max': self.max,
+                'buckets': list(zip(self.buckets + (float('inf'),),
+                                    self.counts))}
+
+
+class HistogramCollector(Collector):
+    """Keep histograms of the request timings in memory.
+
+    The timings are grouped by service_type, interface and phase, and the
+    requests of each service_type and interface are counted by status code.
+    This can be read periodically with :py:meth:`snapshot` and exported to a
+    metrics system.
+
+    :param tuple buckets: The upper bounds of the histogram buckets in
+                          seconds. (optional)
+    """
+
+    _COUNTERS = ('requests', 'errors', 'retries', 'redirects',
+                 'reauthentications', 'bytes_sent', 'bytes_received')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def record(self, metrics):
+        key = (metrics.service_type, metrics.interface)
+
+        with self._lock:
+            for phase, seconds in metrics.timings.items():
+                try:
+                    histogram = self._histograms[key + (phase,)]
+                except KeyError:
+                    histogram = Histogram(self.buckets)
+                    self._histograms[key + (phase,)] = histogram
+
+                histogram.add(seconds)
+
+            try:
+                counters = self._counters[key]
+            except KeyError:
+                counters = dict.fromkeys(self._COUNTERS, 0)
+                counters['status_codes'] = {}
+                self._counters[key] = counters
+
+            counters['requests'] += 1
+            counters['retries'] += metrics.retries
+            counters['redirects'] += metrics.redirects
+            counters['bytes_sent'] += metrics.bytes_sent
+            counters['bytes_received'] += metrics.bytes_received or 0
+
+            if metrics.error is not None:
+                counters['errors'] += 1
+            if metrics.reauthenticated:
+                counters['reauthentications'] += 1
+            if metrics.status_code is not None:
+                codes = counters['status_codes']
+                codes[metrics.status_code] = codes.get(metrics.status_code,
+                                                       0) + 1
+
+    def percentile(self, percent, phase='total', service_type=None,
+                   interface=None):
+        """Estimate a percentile of the time spent in a phase.
+
+        :param float percent: The percentile to estimate, between 0 and 100.
+        :param str phase: The phase of the requests, see
+                          :py:class:`RequestMetrics`. (optional, defaults to
+                          the whole request)
+        :param str service_type: The service_type of the requests. (optional)
+        :param str interface: The interface of the requests. (optional)
+
+        :returns: The estimated number of seconds, or None if no such request
+                  was recorded.
+        """
+        with self._lock:
+            histogram = self._histograms.get((service_type, interface, phase))
+            if histogram is None:
+                return None
+            return histogram.percentile(percent)
+
+    def snapshot(self):
+        """Return a copy of the data collected so far.
+
+        :returns: A dict with the ``histograms``, a dict from a tuple of
+                  service_type, interface and phase to the count, sum, min,
+                  max and buckets of the timings, and the ``counters``, a dict
+                  from a tuple of service_type and interface to the number of
+                  requests, errors, retries, redirects, reauthentications,
+                  bytes sent and received and responses by status code.
+        :rtype: dict
+        """
+        with self._lock:
+            histograms = dict((key, histogram.to_dict())
+                              for key, histogram in self._histograms.items())
+            counters = {}
+            for key, values in self._counters.items():
+                values = values.copy()
+                values['status_codes'] = values['status_codes'].copy()
+                counters[key] = values
+
+        return {'histograms': histograms, 'counters': counters}
+
+    def reset(self):
+        """Forget the data collected so far."""
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
@@ -62,6 +62,9 @@ class ServiceCatalog(object, metaclass=abc.ABCMeta):
                 DeprecationWarning)
 
         self._region_name = region_name
+        self._endpoint_index = None
+        self._endpoint_index_data = None
+        self._endpoint_lookups = {}
 
     @property
     def region_name(self):
@@ -121,31 +124,55 @@ class ServiceCatalog(object, metaclass=abc.ABCMeta):
         """
         pass  # pragma: no cover
 
-    def get_endpoints(self, service_type=None, endpoint_type=None,
-                      region_name=None, service_name=None):
-        """Fetch and filter endpoints for the specified service(s).
+    def invalidate_endpoint_index(self):
+        """Discard the cached endpoint index.
 
-        Returns endpoints for the specified service (or all) containing
-        the specified type (or all) and region (or all) and service name.
+        The index is rebuilt automatically when the raw catalog is replaced,
+        however modifications made in place to the catalog data will not be
+        noticed and must be followed by a call to this method.
+        """
+        self._endpoint_index = None
+        self._endpoint_index_data = None
+        self._endpoint_lookups = {}
 
-        If there is no name in the service catalog the service_name check will
-        be skipped.  This allows compatibility with services that existed
-        before the name was available in the catalog.
+    def _get_endpoint_index(self):
+        """Return the services of the catalog grouped by service type.
+
+        The index is built on first use and kept until the catalog data it was
+        built from is replaced or it is explicitly invalidated.
         """
-        endpoint_type = self._normalize_endpoint_type(endpoint_type)
-        region_name = region_name or self._region_name
+        data = self.get_data()
 
-        sc = {}
+        if (self._endpoint_index is None or
+                data is not self._endpoint_index_data):
+            index = {}
+
+            for service in (data or []):
+                try:
+                    st = service['type']
+                except KeyError:
+                    continue
+
+                index.setdefault(st, []).append(service)
 
-        for service in (self.get_data() or []):
-            try:
-                st = service['type']
-            except KeyError:
-                continue
+            self._endpoint_index = index
+            self._endpoint_index_data = data
+            self._endpoint_lookups = {}
 
-            if service_type and service_type != st:
-                continue
+        return self._endpoint_index
+
+    def _find_endpoints(self, service_type, endpoint_type, region_name,
+                        service_name):
+        index = self._get_endpoint_index()
+
+        if service_type:
+            services = [(service_type, s) for s in index.get(service_type, [])]
+        else:
+            services = [(st, s) for st, ss in index.items() for s in ss]
+
+        sc = {}
 
+        for st, service in services:
             # NOTE(jamielennox): service_name is different. It is not available
             # in API < v3.3. If it is in the catalog then we enforce it, if it
             # is not then we don't because the name could be correct we just
@@ -174,6 +201,38 @@ class ServiceCatalog(object, metaclass=abc.ABCMeta):
 
         return sc
 
+    def get_endpoints(self, service_type=None, endpoint_type=None,
+                      region_name=None, service_name=None):
+        """Fetch and filter endpoints for the specified service(s).
+
+        Returns endpoints for the specified service (or all) containing
+        the specified type (or all) and region (or all) and service name.
+
+        If there is no name in the service catalog the service_name check will
+        be skipped.  This allows compatibility with services that existed
+        before the name was available in the catalog.
+
+        Results are looked up in an index that is built lazily from the
+        catalog, so repeated lookups do not rescan the whole catalog.
+        """
+        endpoint_type = self._normalize_endpoint_type(endpoint_type)
+        region_name = region_name or self._region_name
+
+        # make sure the index is current before consulting the lookups
+        self._get_endpoint_index()
+
+        key = (service_type, endpoint_type, region_name, service_name)
+
+        try:
+            sc = self._endpoint_lookups[key]
+        except KeyError:
+            sc = self._find_endpoints(service_type, endpoint_type,
+                                      region_name, service_name)
+            self._endpoint_lookups[key] = sc
+
+        # the lists are handed out to callers so don't share the cached ones.
+        return dict((st, list(endpoints)) for st, endpoints in sc.items())
+
     def _get_service_endpoints(self, attr, filter_value, service_type,
                                endpoint_type, region_name, service_name):
         """Fetch the endpoints of a particular service_type.
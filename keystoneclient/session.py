@@ -11,14 +11,21 @@
 # under the License.
 
 import argparse
+import asyncio
+from concurrent import futures
+import email.utils
 import functools
 import hashlib
 import logging
 import os
+import queue
+import random
 import socket
+import threading
 import time
 import urllib.parse
 import warnings
+import weakref
 
 from debtcollector import removals
 from oslo_config import cfg
@@ -26,10 +33,13 @@ from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
 from oslo_utils import importutils
 from oslo_utils import strutils
+from oslo_utils import timeutils
 import requests
+from urllib3 import connectionpool
 
 from keystoneclient import exceptions
 from keystoneclient.i18n import _
+from keystoneclient import metrics as _metrics
 
 osprofiler_web = importutils.try_import("osprofiler.web")
 
@@ -116,6 +126,43 @@ class Session(object):
                               can be followed by a request. Either an integer
                               for a specific count or True/False for
                               forever/never. (optional, default to 30)
+    :param discovery_cache: A cache of the version data fetched by discovery
+                            through this session. (optional, defaults to
+                            None, version data is only cached by the auth
+                            plugins for the life of the session)
+    :type discovery_cache: :py:class:`keystoneclient.cache.DiscoveryCache`
+    :param int pool_connections: The number of hosts to keep a connection
+                                 pool for. (optional, defaults to 10) This is
+                                 ignored if a requests session is provided.
+    :param int pool_maxsize: The maximum number of connections kept open to
+                             each host. Requests made while all of them are in
+                             use open a new connection that is discarded once
+                             the response is read. (optional, defaults to 10)
+                             This is ignored if a requests session is
+                             provided.
+    :param bool pool_block: Whether to wait for a connection to be released
+                            rather than opening one beyond pool_maxsize.
+                            (optional, defaults to False) This is ignored if a
+                            requests session is provided.
+    :param list collectors: Objects the measurements of each request are
+                            reported to, see
+                            :py:class:`keystoneclient.metrics.Collector`.
+                            (optional)
+    :param retry_policy: How failed requests are retried, unless overridden
+                         per request. (optional, defaults to None - requests
+                         are not retried)
+    :type retry_policy: :py:class:`RetryPolicy`
+    :param circuit_breaker: Stops sending requests to a host that repeatedly
+                            failed to respond for a while. (optional)
+    :type circuit_breaker: :py:class:`CircuitBreaker`
+    :param endpoint_selector: Spreads the requests made with an
+                              endpoint_filter across all the matching
+                              endpoints of the catalog, failing over to the
+                              next endpoint on connection errors. (optional,
+                              defaults to None - the first matching endpoint
+                              is always used)
+    :type endpoint_selector:
+        :py:class:`keystoneclient.endpoint_selection.EndpointSelector`
     """
 
     user_agent = None
@@ -134,7 +181,10 @@ class Session(object):
 
     def __init__(self, auth=None, session=None, original_ip=None, verify=True,
                  cert=None, timeout=None, user_agent=None,
-                 redirect=_DEFAULT_REDIRECT_LIMIT):
+                 redirect=_DEFAULT_REDIRECT_LIMIT, discovery_cache=None,
+                 pool_connections=None, pool_maxsize=None, pool_block=None,
+                 collectors=None, retry_policy=None, circuit_breaker=None,
+                 endpoint_selector=None):
         warnings.warn(
             'keystoneclient.session.Session is deprecated as of the 2.1.0 '
             'release in favor of keystoneauth1.session.Session. It will be '
@@ -142,10 +192,18 @@ class Session(object):
             DeprecationWarning)
 
         if not session:
+            pool_kwargs = {}
+            if pool_connections is not None:
+                pool_kwargs['pool_connections'] = pool_connections
+            if pool_maxsize is not None:
+                pool_kwargs['pool_maxsize'] = pool_maxsize
+            if pool_block is not None:
+                pool_kwargs['pool_block'] = pool_block
+
             session = requests.Session()
             # Use TCPKeepAliveAdapter to fix bug 1323862
             for scheme in list(session.adapters):
-                session.mount(scheme, TCPKeepAliveAdapter())
+                session.mount(scheme, TCPKeepAliveAdapter(**pool_kwargs))
 
         self.auth = auth
         self.session = session
@@ -154,6 +212,11 @@ class Session(object):
         self.cert = cert
         self.timeout = None
         self.redirect = redirect
+        self.discovery_cache = discovery_cache
+        self.collectors = list(collectors or [])
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.endpoint_selector = endpoint_selector
 
         if timeout is not None:
             self.timeout = float(timeout)
@@ -259,7 +322,7 @@ class Session(object):
                 endpoint_filter=None, auth=None, requests_auth=None,
                 raise_exc=True, allow_reauth=True, log=True,
                 endpoint_override=None, connect_retries=0, logger=_logger,
-                **kwargs):
+                retry_policy=None, **kwargs):
         """Send an HTTP request with the specified characteristics.
 
         Wrapper around `requests.Session.request` to handle tasks such as
@@ -288,6 +351,12 @@ class Session(object):
         :param int connect_retries: the maximum number of retries that should
                                     be attempted for connection errors.
                                     (optional, defaults to 0 - never retry).
+                                    If given the retry policy of the session
+                                    is not used.
+        :param retry_policy: How to retry this request if it fails. Overrides
+                             connect_retries and the policy of the session.
+                             (optional)
+        :type retry_policy: :py:class:`RetryPolicy`
         :param bool authenticated: True if a token should be attached to this
                                    request, False if not or None for attach if
                                    an auth_plugin is available.
@@ -333,13 +402,79 @@ class Session(object):
 
         :returns: The response to the request.
         """
+        endpoint_filter = endpoint_filter or {}
+        metrics = _metrics.RequestMetrics(
+            method, url,
+            service_type=endpoint_filter.get('service_type'),
+            interface=endpoint_filter.get('interface'))
+
+        try:
+            with metrics.time('total'):
+                resp = self._request(
+                    url, method, metrics, json=json, user_agent=user_agent,
+                    redirect=redirect, authenticated=authenticated,
+                    endpoint_filter=endpoint_filter, auth=auth,
+                    requests_auth=requests_auth, raise_exc=raise_exc,
+                    allow_reauth=allow_reauth, log=log,
+                    endpoint_override=endpoint_override,
+                    connect_retries=connect_retries, logger=logger,
+                    retry_policy=retry_policy, **kwargs)
+        except Exception as e:
+            metrics.error = e
+            self._record_metrics(metrics, logger)
+            raise
+
+        if kwargs.get('stream'):
+            self._record_metrics_on_close(resp, metrics, logger)
+        else:
+            self._record_metrics(metrics, logger)
+
+        return resp
+
+    def _record_metrics_on_close(self, resp, metrics, logger):
+        # The body of a streamed response is read after the request returns,
+        # so the metrics are recorded once the response is closed, or dropped
+        # unclosed, with the size of the body read by then.
+        raw = resp.raw
+        headers = resp.headers
+
+        def record():
+            metrics.bytes_received = self._bytes_read(raw, headers)
+            self._record_metrics(metrics, logger)
+
+        finalizer = weakref.finalize(resp, record)
+        finalizer.atexit = False
+        # a weak reference, as resp holding its own close would be a cycle
+        close = weakref.WeakMethod(resp.close)
+
+        def close_and_record():
+            try:
+                close()()
+            finally:
+                finalizer()
+
+        resp.close = close_and_record
+
+    def _record_metrics(self, metrics, logger):
+        for collector in self.collectors:
+            try:
+                collector.record(metrics)
+            except Exception:
+                logger.exception('Failed to record the metrics of a request '
+                                 'to %s', metrics.url)
+
+    def _request(self, url, method, metrics, json, user_agent, redirect,
+                 authenticated, endpoint_filter, auth, requests_auth,
+                 raise_exc, allow_reauth, log, endpoint_override,
+                 connect_retries, logger, retry_policy, **kwargs):
         headers = kwargs.setdefault('headers', dict())
 
         if authenticated is None:
             authenticated = bool(auth or self.auth)
 
         if authenticated:
-            auth_headers = self.get_auth_headers(auth)
+            with metrics.time('auth'):
+                auth_headers = self.get_auth_headers(auth)
 
             if auth_headers is None:
                 msg = _('No valid authentication is available')
@@ -350,26 +485,106 @@ class Session(object):
         if osprofiler_web:
             headers.update(osprofiler_web.get_trace_id_headers())
 
+        path = url
+        url, endpoints = self._resolve_url(url, auth, endpoint_filter,
+                                           endpoint_override, metrics)
+
+        self._prepare_request(url, method, metrics, headers, json,
+                              user_agent, requests_auth, log, logger, kwargs)
+
+        if redirect is None:
+            redirect = self.redirect
+
+        retry_policy = self._get_retry_policy(retry_policy, connect_retries)
+
+        if endpoints and len(endpoints) > 1:
+            send = functools.partial(self._send_balanced,
+                                     endpoints, path, method, redirect, log,
+                                     logger, retry_policy, metrics)
+        else:
+            send = functools.partial(self._send_request,
+                                     url, method, redirect, log, logger,
+                                     retry_policy, metrics=metrics)
+
+        # NOTE(jamielennox): If we've gotten this far without an auth
+        # plugin then we should be happy with allowing no additional
+        # connection params. This will be the typical case for plugins
+        # anyway.
+        if auth or self.auth:
+            with metrics.time('auth'):
+                connection_params = self.get_auth_connection_params(auth=auth)
+
+            if connection_params:
+                kwargs.update(connection_params)
+
+        resp = send(**kwargs)
+
+        # handle getting a 401 Unauthorized response by invalidating the plugin
+        # and then retrying the request. This is only tried once.
+        if resp.status_code == 401 and authenticated and allow_reauth:
+            with metrics.time('reauth'):
+                if self.invalidate(auth):
+                    auth_headers = self.get_auth_headers(auth)
+                else:
+                    auth_headers = None
+
+            if auth_headers is not None:
+                headers.update(auth_headers)
+                metrics.reauthenticated = True
+                resp = send(**kwargs)
+
+        metrics.status_code = resp.status_code
+        metrics.bytes_received = self._bytes_read(resp.raw, resp.headers)
+
+        if raise_exc and resp.status_code >= 400:
+            logger.debug('Request returned failure status: %s',
+                         resp.status_code)
+            raise exceptions.from_response(resp, method, metrics.url)
+
+        return resp
+
+    def _resolve_url(self, url, auth, endpoint_filter, endpoint_override,
+                     metrics):
+        # Return the URL of a request, and the endpoints to fail over between
+        # in the order of the endpoint selector if there is more than one.
+
         # if we are passed a fully qualified URL and an endpoint_filter we
         # should ignore the filter. This will make it easier for clients who
         # want to overrule the default endpoint_filter data added to all client
         # requests. We check fully qualified here by the presence of a host.
-        if not urllib.parse.urlparse(url).netloc:
-            base_url = None
-
-            if endpoint_override:
-                base_url = endpoint_override
-            elif endpoint_filter:
+        if urllib.parse.urlparse(url).netloc:
+            return url, None
+
+        base_url = None
+        endpoints = None
+
+        if endpoint_override:
+            base_url = endpoint_override
+        elif endpoint_filter and self.endpoint_selector:
+            with metrics.time('endpoint'):
+                endpoints = self.get_endpoints(auth, **endpoint_filter)
+
+            if len(endpoints) > 1:
+                endpoints = self.endpoint_selector.order(endpoints)
+            if endpoints:
+                base_url = endpoints[0]
+        elif endpoint_filter:
+            with metrics.time('endpoint'):
                 base_url = self.get_endpoint(auth, **endpoint_filter)
 
-            if not base_url:
-                service_type = (endpoint_filter or {}).get('service_type',
-                                                           'unknown')
-                msg = _('Endpoint for %s service') % service_type
-                raise exceptions.EndpointNotFound(msg)
+        if not base_url:
+            service_type = endpoint_filter.get('service_type', 'unknown')
+            msg = _('Endpoint for %s service') % service_type
+            raise exceptions.EndpointNotFound(msg)
 
-            url = '%s/%s' % (base_url.rstrip('/'), url.lstrip('/'))
+        url = '%s/%s' % (base_url.rstrip('/'), url.lstrip('/'))
+        metrics.url = url
+        return url, endpoints
 
+    def _prepare_request(self, url, method, metrics, headers, json,
+                         user_agent, requests_auth, log, logger, kwargs):
+        # Apply the settings of the session that are independent of the auth
+        # plugin to the arguments of a request, and log it.
         if self.cert:
             kwargs.setdefault('cert', self.cert)
 
@@ -389,7 +604,8 @@ class Session(object):
 
         if json is not None:
             headers['Content-Type'] = 'application/json'
-            kwargs['data'] = jsonutils.dumps(json)
+            with metrics.time('encode'):
+                kwargs['data'] = jsonutils.dumps(json)
 
         kwargs.setdefault('verify', self.verify)
 
@@ -405,46 +621,62 @@ class Session(object):
         # Force disable requests redirect handling. We will manage this below.
         kwargs['allow_redirects'] = False
 
-        if redirect is None:
-            redirect = self.redirect
-
-        send = functools.partial(self._send_request,
-                                 url, method, redirect, log, logger,
-                                 connect_retries)
+    def _get_retry_policy(self, retry_policy, connect_retries):
+        if retry_policy is not None:
+            return retry_policy
+        if connect_retries or not self.retry_policy:
+            return RetryPolicy._for_connect_retries(connect_retries)
+        return self.retry_policy
 
+    @staticmethod
+    def _bytes_read(raw, headers):
+        # The number of bytes of a response body read from the connection so
+        # far, as sent and so before any decompression. The body is not read
+        # only to measure it, it may be streamed.
         try:
-            connection_params = self.get_auth_connection_params(auth=auth)
-        except exceptions.MissingAuthPlugin:  # nosec(cjschaef)
-            # NOTE(jamielennox): If we've gotten this far without an auth
-            # plugin then we should be happy with allowing no additional
-            # connection params. This will be the typical case for plugins
-            # anyway.
+            return int(raw.tell())
+        except (AttributeError, TypeError, ValueError):
             pass
-        else:
-            if connection_params:
-                kwargs.update(connection_params)
-
-        resp = send(**kwargs)
 
-        # handle getting a 401 Unauthorized response by invalidating the plugin
-        # and then retrying the request. This is only tried once.
-        if resp.status_code == 401 and authenticated and allow_reauth:
-            if self.invalidate(auth):
-                auth_headers = self.get_auth_headers(auth)
-
-                if auth_headers is not None:
-                    headers.update(auth_headers)
-                    resp = send(**kwargs)
+        # a transport that can't tell, the size announced by the server
+        try:
+            return int(headers['Content-Length'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _send_balanced(self, endpoints, path, method, redirect, log, logger,
+                       retry_policy, metrics, **kwargs):
+        # Try the endpoints in the order given by the selector, moving to the
+        # next one only when an endpoint cannot be reached. Any response,
+        # including an error status, is returned as is.
+        selector = self.endpoint_selector
+        last = len(endpoints) - 1
+
+        for i, endpoint in enumerate(endpoints):
+            url = '%s/%s' % (endpoint.rstrip('/'), path.lstrip('/'))
+            metrics.url = url
+            failed = True
+            start = time.monotonic()
+            selector.started(endpoint)
 
-        if raise_exc and resp.status_code >= 400:
-            logger.debug('Request returned failure status: %s',
-                         resp.status_code)
-            raise exceptions.from_response(resp, method, url)
+            try:
+                resp = self._send_request(url, method, redirect, log, logger,
+                                          retry_policy, metrics=metrics,
+                                          **kwargs)
+                failed = False
+                return resp
+            except (exceptions.RequestTimeout,
+                    exceptions.ConnectionRefused) as e:
+                if i == last:
+                    raise
 
-        return resp
+                logger.warning('Failure: %(e)s. Failing over to %(next)s.',
+                               {'e': e, 'next': endpoints[i + 1]})
+            finally:
+                selector.finished(endpoint, time.monotonic() - start, failed)
 
     def _send_request(self, url, method, redirect, log, logger,
-                      connect_retries, connect_retry_delay=0.5, **kwargs):
+                      retry_policy, metrics=None, **kwargs):
         # NOTE(jamielennox): We handle redirection manually because the
         # requests lib follows some browser patterns where it will redirect
         # POSTs as GETs for certain statuses which is not want we want for an
@@ -456,66 +688,132 @@ class Session(object):
         # could be redirects * retries requests. This will be sufficient in
         # most cases and can be fixed properly if there's ever a need.
 
-        try:
+        if metrics is None:
+            metrics = _metrics.RequestMetrics(method, url)
+
+        breaker = self.circuit_breaker
+        start = time.monotonic()
+        retries = 0
+        history = []
+
+        while True:
+            # an open circuit fails the request without retrying
+            if breaker is not None:
+                breaker.before_request(url)
+
+            data = kwargs.get('data')
+            if isinstance(data, (bytes, str)):
+                metrics.bytes_sent += len(data)
+
             try:
-                resp = self.session.request(method, url, **kwargs)
-            except requests.exceptions.SSLError as e:
-                msg = _('SSL exception connecting to %(url)s: '
-                        '%(error)s') % {'url': url, 'error': e}
-                raise exceptions.SSLError(msg)
-            except requests.exceptions.Timeout:
-                msg = _('Request to %s timed out') % url
-                raise exceptions.RequestTimeout(msg)
-            except requests.exceptions.ConnectionError:
-                msg = _('Unable to establish connection to %s') % url
-                raise exceptions.ConnectionRefused(msg)
-        except (exceptions.RequestTimeout, exceptions.ConnectionRefused) as e:
-            if connect_retries <= 0:
-                raise
+                with metrics.time('send'):
+                    resp = self._send_once(url, method, **kwargs)
+            except (exceptions.RequestTimeout,
+                    exceptions.ConnectionRefused) as e:
+                delay = self._delay_after_error(url, method, e, retries,
+                                                start, retry_policy, logger)
+                if delay is None:
+                    raise
+            else:
+                delay, location = self._delay_or_location(
+                    url, method, resp, retries, start, retry_policy,
+                    redirect, log, logger)
+
+                if delay is None:
+                    if not location:
+                        break
+
+                    if not isinstance(redirect, bool):
+                        redirect -= 1
+
+                    metrics.redirects += 1
+                    history.append(resp)
+                    url = location
+                    continue
 
+            with metrics.time('retry_wait'):
+                time.sleep(delay)
+
+            retries += 1
+            metrics.retries += 1
+
+        if history:
+            resp.history = history + list(resp.history)
+
+        return resp
+
+    def _delay_after_error(self, url, method, error, retries, start,
+                           retry_policy, logger):
+        # Return the delay before retrying an attempt that failed to get a
+        # response, or None if it must not be retried.
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure(url)
+
+        delay = retry_policy.get_delay(retries, time.monotonic() - start,
+                                       error=error, method=method)
+        if delay is not None:
             logger.info('Failure: %(e)s. Retrying in %(delay).1fs.',
-                        {'e': e, 'delay': connect_retry_delay})
-            time.sleep(connect_retry_delay)
+                        {'e': error, 'delay': delay})
+        return delay
 
-            return self._send_request(
-                url, method, redirect, log, logger,
-                connect_retries=connect_retries - 1,
-                connect_retry_delay=connect_retry_delay * 2,
-                **kwargs)
+    def _delay_or_location(self, url, method, resp, retries, start,
+                           retry_policy, redirect, log, logger):
+        # Return the delay before retrying the request if the response
+        # should be retried, else the location to be redirected to if any.
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success(url)
 
         if log:
             self._http_log_response(resp, logger)
 
-        if resp.status_code in self._REDIRECT_STATUSES:
-            # be careful here in python True == 1 and False == 0
-            if isinstance(redirect, bool):
-                redirect_allowed = redirect
-            else:
-                redirect -= 1
-                redirect_allowed = redirect >= 0
+        delay = None
+        if resp.status_code in retry_policy.retry_statuses:
+            delay = retry_policy.get_delay(retries, time.monotonic() - start,
+                                           response=resp, method=method)
 
-            if not redirect_allowed:
-                return resp
+        if delay is None:
+            return None, self._redirect_location(resp, redirect, logger)
 
-            try:
-                location = resp.headers['location']
-            except KeyError:
-                logger.warning("Failed to redirect request to %s as new "
-                               "location was not provided.", resp.url)
-            else:
-                # NOTE(jamielennox): We don't pass through connect_retry_delay.
-                # This request actually worked so we can reset the delay count.
-                new_resp = self._send_request(
-                    location, method, redirect, log, logger,
-                    connect_retries=connect_retries,
-                    **kwargs)
-
-                if not isinstance(new_resp.history, list):
-                    new_resp.history = list(new_resp.history)
-                new_resp.history.insert(0, resp)
-                resp = new_resp
+        logger.info('Request to %(url)s returned %(status)s. '
+                    'Retrying in %(delay).1fs.',
+                    {'url': url, 'status': resp.status_code, 'delay': delay})
+        resp.close()
+        return delay, None
 
-        return resp
+    def _send_once(self, url, method, **kwargs):
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.exceptions.SSLError as e:
+            msg = _('SSL exception connecting to %(url)s: '
+                    '%(error)s') % {'url': url, 'error': e}
+            raise exceptions.SSLError(msg)
+        except requests.exceptions.Timeout:
+            msg = _('Request to %s timed out') % url
+            raise exceptions.RequestTimeout(msg)
+        except requests.exceptions.ConnectionError:
+            msg = _('Unable to establish connection to %s') % url
+            raise exceptions.ConnectionRefused(msg)
+
+    def _redirect_location(self, resp, redirect, logger):
+        if resp.status_code not in self._REDIRECT_STATUSES:
+            return None
+
+        # be careful here in python True == 1 and False == 0
+        if isinstance(redirect, bool):
+            redirect_allowed = redirect
+        else:
+            redirect_allowed = redirect - 1 >= 0
+
+        if not redirect_allowed:
+            return None
+
+        try:
+            return resp.headers['location']
+        except KeyError:
+            logger.warning("Failed to redirect request to %s as new "
+                           "location was not provided.", resp.url)
+
+        return None
 
     def head(self, url, **kwargs):
         """Perform a HEAD request.
@@ -565,6 +863,39 @@ class Session(object):
         """
         return self.request(url, 'PATCH', **kwargs)
 
+    def pool_stats(self):
+        """Return the usage of the connection pools of the session.
+
+        Only the pools of the adapters mounted by the session itself are
+        counted, a requests session that was provided is not inspected. The
+        counts are all 0 if the installed urllib3 does not support counting
+        them.
+
+        :returns: A dict with the number of connections ``in_use`` and
+                  ``idle`` now, and the number of ``new_connections`` opened
+                  and of connections ``discarded`` because their pool was
+                  full so far. The same counts for each host are under
+                  ``hosts``, keyed by URL.
+        :rtype: dict
+        """
+        totals = dict.fromkeys(_PoolStats.COUNTERS, 0)
+        hosts = {}
+
+        adapters = set(self.session.adapters.values())
+        for adapter in adapters:
+            if not isinstance(adapter, TCPKeepAliveAdapter):
+                continue
+
+            for host, counts in adapter.pool_stats().items():
+                for name, value in counts.items():
+                    totals[name] += value
+                    host_counts = hosts.setdefault(
+                        host, dict.fromkeys(_PoolStats.COUNTERS, 0))
+                    host_counts[name] += value
+
+        totals['hosts'] = hosts
+        return totals
+
     @classmethod
     def construct(cls, kwargs):
         """Handle constructing a session from both old and new arguments.
@@ -596,7 +927,9 @@ class Session(object):
         params = {}
 
         for attr in ('verify', 'cacert', 'cert', 'key', 'insecure',
-                     'timeout', 'session', 'original_ip', 'user_agent'):
+                     'timeout', 'session', 'original_ip', 'user_agent',
+                     'discovery_cache', 'pool_connections', 'pool_maxsize',
+                     'pool_block'):
             try:
                 params[attr] = kwargs.pop(attr)
             except KeyError:  # nosec(cjschaef): we are brute force
@@ -701,6 +1034,31 @@ class Session(object):
         auth = self._auth_required(auth, msg)
         return auth.get_endpoint(self, **kwargs)
 
+    def get_endpoints(self, auth=None, **kwargs):
+        """Get all the endpoints matching a filter from the auth plugin.
+
+        :param auth: The auth plugin to use for token. Overrides the plugin on
+                     the session. (optional)
+        :type auth: :py:class:`keystoneclient.auth.base.BaseAuthPlugin`
+
+        :raises keystoneclient.exceptions.MissingAuthPlugin: if a plugin is not
+                                                             available.
+
+        :returns: The matching endpoints, which may be empty.
+        :rtype: list
+        """
+        msg = _('An auth plugin is required to determine endpoint URL')
+        auth = self._auth_required(auth, msg)
+
+        try:
+            get_endpoints = auth.get_endpoints
+        except AttributeError:
+            # plugins that don't derive from BaseAuthPlugin
+            endpoint = auth.get_endpoint(self, **kwargs)
+            return [endpoint] if endpoint else []
+
+        return get_endpoints(self, **kwargs)
+
     def get_auth_connection_params(self, auth=None, **kwargs):
         """Return auth connection params as provided by the auth plugin.
 
@@ -816,6 +1174,9 @@ class Session(object):
             :keyfile: The key for the client certificate.
             :insecure: Whether to ignore SSL verification.
             :timeout: The max time to wait for HTTP connections.
+            :pool_connections: The number of hosts to keep connections to.
+            :pool_maxsize: The max number of connections kept to a host.
+            :pool_block: Whether to wait for a connection when all are used.
 
         :param dict deprecated_opts: Deprecated options that should be included
              in the definition of new options. This should be a dict from the
@@ -850,6 +1211,24 @@ class Session(object):
                 cfg.IntOpt('timeout',
                            deprecated_opts=deprecated_opts.get('timeout'),
                            help='Timeout value for http requests'),
+                cfg.IntOpt('pool_connections',
+                           min=1,
+                           deprecated_opts=deprecated_opts.get(
+                               'pool_connections'),
+                           help='Number of hosts to keep a pool of http '
+                                'connections for. Defaults to 10.'),
+                cfg.IntOpt('pool_maxsize',
+                           min=1,
+                           deprecated_opts=deprecated_opts.get(
+                               'pool_maxsize'),
+                           help='Maximum number of http connections kept '
+                                'open to each host. Defaults to 10.'),
+                cfg.BoolOpt('pool_block',
+                            default=False,
+                            deprecated_opts=deprecated_opts.get('pool_block'),
+                            help='Wait for an http connection to be '
+                                 'released rather than opening one beyond '
+                                 'pool_maxsize.'),
                 ]
 
     @classmethod
@@ -862,6 +1241,9 @@ class Session(object):
             :keyfile: The key for the client certificate.
             :insecure: Whether to ignore SSL verification.
             :timeout: The max time to wait for HTTP connections.
+            :pool_connections: The number of hosts to keep connections to.
+            :pool_maxsize: The max number of connections kept to a host.
+            :pool_block: Whether to wait for a connection when all are used.
 
         :param oslo_config.Cfg conf: config object to register with.
         :param string group: The ini group to register options in.
@@ -904,6 +1286,9 @@ class Session(object):
         if c.certfile and c.keyfile:
             kwargs['cert'] = (c.certfile, c.keyfile)
         kwargs['timeout'] = c.timeout
+        kwargs['pool_connections'] = c.pool_connections
+        kwargs['pool_maxsize'] = c.pool_maxsize
+        kwargs['pool_block'] = c.pool_block
 
         return cls._make(**kwargs)
 
@@ -945,6 +1330,25 @@ class Session(object):
                             metavar='<seconds>',
                             help='Set request timeout (in seconds).')
 
+        parser.add_argument('--pool-connections',
+                            type=int,
+                            metavar='<count>',
+                            help='Number of hosts to keep a pool of '
+                                 'connections for. Defaults to 10.')
+
+        parser.add_argument('--pool-maxsize',
+                            type=int,
+                            metavar='<count>',
+                            help='Maximum number of connections kept open '
+                                 'to each host. Defaults to 10.')
+
+        parser.add_argument('--pool-block',
+                            default=False,
+                            action='store_true',
+                            help='Wait for a connection to be released '
+                                 'rather than opening one beyond '
+                                 '--pool-maxsize.')
+
     @classmethod
     def load_from_cli_options(cls, args, **kwargs):
         """Create a :py:class:`.Session` object from CLI arguments.
@@ -962,10 +1366,710 @@ class Session(object):
         if args.os_cert and args.os_key:
             kwargs['cert'] = (args.os_cert, args.os_key)
         kwargs['timeout'] = args.timeout
+        kwargs['pool_connections'] = args.pool_connections
+        kwargs['pool_maxsize'] = args.pool_maxsize
+        kwargs['pool_block'] = args.pool_block
 
         return cls._make(**kwargs)
 
 
+class AsyncSession(object):
+    """A session that can be used from an asyncio event loop.
+
+    The requests library has no asynchronous transport, so every attempt of a
+    request is sent by the wrapped session from a bounded pool of threads
+    owned by this object. The requests go through the requests session,
+    connection pools and settings of the wrapped session - proxies, CA bundle
+    and the environment included - exactly as a :py:meth:`Session.request`
+    would, while the event loop is free to have many of them in flight.
+
+    Redirect handling, retries, endpoint selection with failover and
+    reauthentication on a 401 are driven from the event loop, so waiting
+    between retries does not take up a thread. The auth plugin of the wrapped
+    session is always called from the pool, as it may have to fetch a token or
+    discover versions from the server.
+
+    Responses are read in full, the ``stream`` argument is ignored.
+
+    :param session: The session to send the requests with.
+    :type session: :py:class:`keystoneclient.session.Session`
+    :param int max_workers: The maximum number of requests in flight at once.
+                            This should not exceed the size of the connection
+                            pool of the session. (optional, defaults to 10)
+    """
+
+    def __init__(self, session, max_workers=10):
+        self.session = session
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    async def run_sync(self, func, *args, **kwargs):
+        """Call a blocking function without blocking the event loop.
+
+        This is useful to drive a manager, for example
+        ``await sess.run_sync(client.users.list, domain=domain)``, from a
+        coroutine. The call is made from the pool of this session.
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    def _resolve(self, url, auth, authenticated, endpoint_filter,
+                 endpoint_override, metrics):
+        # Everything a request needs from the auth plugin.
+        session = self.session
+        auth_headers = None
+        connection_params = None
+
+        if authenticated:
+            with metrics.time('auth'):
+                auth_headers = session.get_auth_headers(auth)
+
+            if auth_headers is None:
+                msg = _('No valid authentication is available')
+                raise exceptions.AuthorizationFailure(msg)
+
+        url, endpoints = session._resolve_url(url, auth, endpoint_filter,
+                                              endpoint_override, metrics)
+
+        if auth or session.auth:
+            with metrics.time('auth'):
+                connection_params = session.get_auth_connection_params(
+                    auth=auth)
+
+        return auth_headers, url, endpoints, connection_params
+
+    async def request(self, url, method, json=None, original_ip=None,
+                      user_agent=None, redirect=None, authenticated=None,
+                      endpoint_filter=None, auth=None, requests_auth=None,
+                      raise_exc=True, allow_reauth=True, log=True,
+                      endpoint_override=None, connect_retries=0,
+                      logger=_logger, retry_policy=None, **kwargs):
+        """Send an HTTP request with the specified characteristics.
+
+        The arguments are the same as for :py:meth:`Session.request`.
+
+        :returns: The response to the request.
+        """
+        endpoint_filter = endpoint_filter or {}
+        metrics = _metrics.RequestMetrics(
+            method, url,
+            service_type=endpoint_filter.get('service_type'),
+            interface=endpoint_filter.get('interface'))
+
+        try:
+            with metrics.time('total'):
+                resp = await self._request(
+                    url, method, metrics, json=json, user_agent=user_agent,
+                    redirect=redirect, authenticated=authenticated,
+                    endpoint_filter=endpoint_filter, auth=auth,
+                    requests_auth=requests_auth, raise_exc=raise_exc,
+                    allow_reauth=allow_reauth, log=log,
+                    endpoint_override=endpoint_override,
+                    connect_retries=connect_retries, logger=logger,
+                    retry_policy=retry_policy, **kwargs)
+        except Exception as e:
+            metrics.error = e
+            raise
+        finally:
+            self.session._record_metrics(metrics, logger)
+
+        return resp
+
+    async def _request(self, url, method, metrics, json, user_agent,
+                       redirect, authenticated, endpoint_filter, auth,
+                       requests_auth, raise_exc, allow_reauth, log,
+                       endpoint_override, connect_retries, logger,
+                       retry_policy, **kwargs):
+        # The same steps as Session._request, with the calls that may block
+        # made from the pool.
+        session = self.session
+        headers = kwargs.setdefault('headers', dict())
+        kwargs.pop('stream', None)
+
+        if authenticated is None:
+            authenticated = bool(auth or session.auth)
+
+        path = url
+        auth_headers, url, endpoints, connection_params = (
+            await self.run_sync(self._resolve, url, auth, authenticated,
+                                endpoint_filter, endpoint_override, metrics))
+
+        if auth_headers:
+            headers.update(auth_headers)
+
+        if osprofiler_web:
+            headers.update(osprofiler_web.get_trace_id_headers())
+
+        session._prepare_request(url, method, metrics, headers, json,
+                                 user_agent, requests_auth, log, logger,
+                                 kwargs)
+
+        if redirect is None:
+            redirect = session.redirect
+
+        retry_policy = session._get_retry_policy(retry_policy,
+                                                 connect_retries)
+
+        if endpoints and len(endpoints) > 1:
+            send = functools.partial(self._send_balanced,
+                                     endpoints, path, method, redirect, log,
+                                     logger, retry_policy, metrics)
+        else:
+            send = functools.partial(self._send_request,
+                                     url, method, redirect, log, logger,
+                                     retry_policy, metrics)
+
+        if connection_params:
+            kwargs.update(connection_params)
+
+        resp = await send(**kwargs)
+
+        # handle getting a 401 Unauthorized response by invalidating the plugin
+        # and then retrying the request. This is only tried once.
+        if resp.status_code == 401 and authenticated and allow_reauth:
+            with metrics.time('reauth'):
+                if await self.run_sync(session.invalidate, auth):
+                    auth_headers = await self.run_sync(
+                        session.get_auth_headers, auth)
+                else:
+                    auth_headers = None
+
+            if auth_headers is not None:
+                headers.update(auth_headers)
+                metrics.reauthenticated = True
+                resp = await send(**kwargs)
+
+        metrics.status_code = resp.status_code
+        metrics.bytes_received = session._bytes_read(resp.raw, resp.headers)
+
+        if raise_exc and resp.status_code >= 400:
+            logger.debug('Request returned failure status: %s',
+                         resp.status_code)
+            raise exceptions.from_response(resp, method, metrics.url)
+
+        return resp
+
+    async def _send_balanced(self, endpoints, path, method, redirect, log,
+                             logger, retry_policy, metrics, **kwargs):
+        # The same failover as Session._send_balanced.
+        selector = self.session.endpoint_selector
+        last = len(endpoints) - 1
+
+        for i, endpoint in enumerate(endpoints):
+            url = '%s/%s' % (endpoint.rstrip('/'), path.lstrip('/'))
+            metrics.url = url
+            failed = True
+            start = time.monotonic()
+            selector.started(endpoint)
+
+            try:
+                resp = await self._send_request(url, method, redirect, log,
+                                                logger, retry_policy, metrics,
+                                                **kwargs)
+                failed = False
+                return resp
+            except (exceptions.RequestTimeout,
+                    exceptions.ConnectionRefused) as e:
+                if i == last:
+                    raise
+
+                logger.warning('Failure: %(e)s. Failing over to %(next)s.',
+                               {'e': e, 'next': endpoints[i + 1]})
+            finally:
+                selector.finished(endpoint, time.monotonic() - start, failed)
+
+    async def _send_request(self, url, method, redirect, log, logger,
+                            retry_policy, metrics, **kwargs):
+        # The same loop as Session._send_request, see there for the handling
+        # of redirects and retries.
+        session = self.session
+        breaker = session.circuit_breaker
+        start = time.monotonic()
+        retries = 0
+        history = []
+
+        while True:
+            if breaker is not None:
+                breaker.before_request(url)
+
+            data = kwargs.get('data')
+            if isinstance(data, (bytes, str)):
+                metrics.bytes_sent += len(data)
+
+            try:
+                with metrics.time('send'):
+                    resp = await self.run_sync(session._send_once, url,
+                                               method, **kwargs)
+            except (exceptions.RequestTimeout,
+                    exceptions.ConnectionRefused) as e:
+                delay = session._delay_after_error(url, method, e, retries,
+                                                   start, retry_policy,
+                                                   logger)
+                if delay is None:
+                    raise
+            else:
+                delay, location = session._delay_or_location(
+                    url, method, resp, retries, start, retry_policy,
+                    redirect, log, logger)
+
+                if delay is None:
+                    if not location:
+                        break
+
+                    if not isinstance(redirect, bool):
+                        redirect -= 1
+
+                    metrics.redirects += 1
+                    history.append(resp)
+                    url = location
+                    continue
+
+            with metrics.time('retry_wait'):
+                await asyncio.sleep(delay)
+
+            retries += 1
+            metrics.retries += 1
+
+        if history:
+            resp.history = history + list(resp.history)
+
+        return resp
+
+    async def head(self, url, **kwargs):
+        return await self.request(url, 'HEAD', **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request(url, 'GET', **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request(url, 'POST', **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request(url, 'PUT', **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request(url, 'DELETE', **kwargs)
+
+    async def patch(self, url, **kwargs):
+        return await self.request(url, 'PATCH', **kwargs)
+
+    async def get_auth_headers(self, auth=None, **kwargs):
+        return await self.run_sync(self.session.get_auth_headers, auth,
+                                   **kwargs)
+
+    async def get_token(self, auth=None):
+        return await self.run_sync(self.session.get_token, auth)
+
+    async def get_endpoint(self, auth=None, **kwargs):
+        return await self.run_sync(self.session.get_endpoint, auth, **kwargs)
+
+    async def invalidate(self, auth=None):
+        return await self.run_sync(self.session.invalidate, auth)
+
+    async def get_user_id(self, auth=None):
+        return await self.run_sync(self.session.get_user_id, auth)
+
+    async def get_project_id(self, auth=None):
+        return await self.run_sync(self.session.get_project_id, auth)
+
+    def close(self):
+        """Wait for the requests in flight and release the threads."""
+        self._executor.shutdown(wait=True)
+
+
+class RetryPolicy(object):
+    """How a session retries a request that failed.
+
+    A request is retried if it could not connect or timed out, or if the
+    server responded with one of the retry_statuses. The delay before each
+    retry is picked at random between 0 and an exponentially growing bound,
+    so that clients that failed together do not retry together. A
+    ``Retry-After`` header on the response takes precedence, unless it asks
+    for a longer wait than max_backoff in which case the request is not
+    retried.
+
+    Requests whose method is not one of the retry_methods may already have
+    been processed by the server when they time out or get a 502, 503 or 504
+    response, so they are only retried if the connection could not be
+    established or the server responded with 429.
+
+    :param int max_attempts: The maximum number of times the request is sent,
+                             including the first. (optional, defaults to 4)
+    :param retry_statuses: The response status codes to retry on.
+                           (optional, defaults to 429, 502, 503 and 504)
+    :param retry_methods: The HTTP methods that are safe to send again after
+                          a timeout or any of the retry_statuses. (optional,
+                          defaults to the idempotent methods, None for all
+                          methods)
+    :param bool retry_connection_errors: Whether to retry connection failures
+                                         and timeouts. (optional, defaults to
+                                         True)
+    :param float backoff: The bound of the first delay, doubled for each
+                          following retry. (optional, defaults to 0.5)
+    :param float max_backoff: The largest bound of a delay, and the longest
+                              ``Retry-After`` the request is retried after.
+                              (optional, defaults to 30, None for no limit)
+    :param bool jitter: Whether to pick the delay at random up to the bound
+                        rather than waiting the bound itself. (optional,
+                        defaults to True)
+    :param bool respect_retry_after: Whether to wait as long as a
+                                     ``Retry-After`` response header asks.
+                                     (optional, defaults to True)
+    :param float deadline: The number of seconds after the first attempt
+                           beyond which no retry is started. (optional,
+                           defaults to None - no limit)
+    """
+
+    DEFAULT_RETRY_STATUSES = (429, 502, 503, 504)
+    DEFAULT_RETRY_METHODS = ('DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT',
+                             'TRACE')
+
+    def __init__(self, max_attempts=4, retry_statuses=DEFAULT_RETRY_STATUSES,
+                 retry_connection_errors=True, backoff=0.5, max_backoff=30.0,
+                 jitter=True, respect_retry_after=True, deadline=None,
+                 retry_methods=DEFAULT_RETRY_METHODS):
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be a positive integer')
+
+        self.max_attempts = max_attempts
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_connection_errors = retry_connection_errors
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.respect_retry_after = respect_retry_after
+        self.deadline = deadline
+        self.retry_methods = None
+        if retry_methods is not None:
+            self.retry_methods = frozenset(m.upper() for m in retry_methods)
+
+    @classmethod
+    def _for_connect_retries(cls, connect_retries):
+        # the fixed doubling delays of the connect_retries argument
+        return cls(max_attempts=connect_retries + 1, retry_statuses=(),
+                   max_backoff=None, jitter=False, retry_methods=None)
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:  # nosec: the value may be an HTTP date instead
+            pass
+
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        return max(0.0, when.timestamp() - time.time())
+
+    def _may_resend(self, method, response, error):
+        if method is None or self.retry_methods is None:
+            return True
+        if method.upper() in self.retry_methods:
+            return True
+
+        # the server did not get or did not process the request
+        if response is not None:
+            return response.status_code == 429
+        return isinstance(error, exceptions.ConnectionRefused)
+
+    def get_delay(self, retries, elapsed, response=None, error=None,
+                  method=None):
+        """Return how long to wait before retrying a request.
+
+        :param int retries: The number of retries already made.
+        :param float elapsed: The number of seconds since the first attempt.
+        :param response: The response to retry, if one was received.
+        :type response: requests.Response
+        :param error: The connection error to retry, if any.
+        :param str method: The HTTP method of the request. (optional, if not
+                           provided the request is assumed to be safe to
+                           retry)
+
+        :returns: The number of seconds to wait, or None if the request should
+                  not be retried.
+        :rtype: float
+        """
+        if retries + 1 >= self.max_attempts:
+            return None
+
+        if error is not None and not self.retry_connection_errors:
+            return None
+
+        if not self._may_resend(method, response, error):
+            return None
+
+        delay = self.backoff * 2 ** retries
+        if self.max_backoff is not None:
+            delay = min(delay, self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(0, delay)  # nosec: not used for security
+
+        if response is not None and self.respect_retry_after:
+            retry_after = self._retry_after(response)
+            if retry_after is not None:
+                # retrying earlier than asked would only be refused again
+                if (self.max_backoff is not None and
+                        retry_after > self.max_backoff):
+                    return None
+                delay = retry_after
+
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+
+        return delay
+
+
+class CircuitBreaker(object):
+    """Fail requests to a host that stopped responding without waiting.
+
+    The requests to each host, identified by the scheme and network location
+    of the URL, are tracked separately. After failure_threshold consecutive
+    connection failures or timeouts the circuit of the host opens and
+    requests to it raise
+    :py:class:`keystoneclient.exceptions.ConnectionRefused` at once. Once
+    reset_timeout seconds have passed the circuit is half-open: a single
+    request is let through as a probe, closing the circuit if it gets a
+    response and opening it again if not.
+
+    Any response, including an error status, shows the host is reachable
+    and closes the circuit.
+
+    :param int failure_threshold: The number of consecutive failures that
+                                  open the circuit. (optional, defaults to 5)
+    :param float reset_timeout: The number of seconds a circuit stays open
+                                before a probe is let through. (optional,
+                                defaults to 30)
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        if failure_threshold < 1:
+            raise ValueError('failure_threshold must be a positive integer')
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        # host -> [failures, opened_at, probe_started_at]
+        self._hosts = {}
+
+    @staticmethod
+    def _host(url):
+        parts = urllib.parse.urlparse(url)
+        return '%s://%s' % (parts.scheme, parts.netloc)
+
+    def _cooled_down(self, since):
+        elapsed = timeutils.utcnow() - since
+        return elapsed.total_seconds() >= self.reset_timeout
+
+    def _state(self, host):
+        try:
+            failures, opened_at, probe_started_at = self._hosts[host]
+        except KeyError:
+            return self.CLOSED
+
+        if opened_at is None:
+            return self.CLOSED
+        if probe_started_at is not None or self._cooled_down(opened_at):
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def get_state(self, url):
+        """Return the state of the circuit of the host of a URL.
+
+        :returns: One of :py:attr:`CLOSED`, :py:attr:`OPEN` or
+                  :py:attr:`HALF_OPEN`.
+        :rtype: str
+        """
+        with self._lock:
+            return self._state(self._host(url))
+
+    def states(self):
+        """Return the state of the circuit of every host seen.
+
+        :returns: A dict from the host URL to the state of its circuit.
+        :rtype: dict
+        """
+        with self._lock:
+            return dict((host, self._state(host)) for host in self._hosts)
+
+    def before_request(self, url):
+        """Check that a request may be sent to the host of a URL.
+
+        :raises keystoneclient.exceptions.ConnectionRefused: if the circuit of
+            the host is open, or half-open with a probe already in flight.
+        """
+        host = self._host(url)
+
+        with self._lock:
+            try:
+                entry = self._hosts[host]
+            except KeyError:
+                return
+
+            failures, opened_at, probe_started_at = entry
+            if opened_at is None:
+                return
+
+            # a probe that never reported back is replaced after a while
+            if probe_started_at is None:
+                probe_allowed = self._cooled_down(opened_at)
+            else:
+                probe_allowed = self._cooled_down(probe_started_at)
+
+            if probe_allowed:
+                entry[2] = timeutils.utcnow()
+                return
+
+        msg = _('Circuit open for %s after repeated connection '
+                'failures') % host
+        raise exceptions.ConnectionRefused(msg)
+
+    def record_success(self, url):
+        """Record that a response was received from the host of a URL."""
+        with self._lock:
+            self._hosts.pop(self._host(url), None)
+
+    def record_failure(self, url):
+        """Record a connection failure or timeout on the host of a URL."""
+        host = self._host(url)
+
+        with self._lock:
+            entry = self._hosts.setdefault(host, [0, None, None])
+            entry[0] += 1
+
+            if entry[2] is not None or entry[0] >= self.failure_threshold:
+                if entry[1] is None:
+                    _logger.warning('Opening the circuit for %s after %d '
+                                    'consecutive connection failures',
+                                    host, entry[0])
+                entry[1] = timeutils.utcnow()
+                entry[2] = None
+
+
+class _PoolStats(object):
+    """The connection counters of the pools of an adapter, kept per host."""
+
+    COUNTERS = ('in_use', 'idle', 'new_connections', 'discarded')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._pools = weakref.WeakSet()
+
+    @staticmethod
+    def _host(pool):
+        return '%s://%s:%s' % (pool.scheme, pool.host, pool.port)
+
+    def add_pool(self, pool):
+        with self._lock:
+            self._pools.add(pool)
+
+    def count(self, pool, name, delta=1):
+        host = self._host(pool)
+        with self._lock:
+            counts = self._counts.setdefault(
+                host, dict.fromkeys(self.COUNTERS, 0))
+            counts[name] += delta
+
+    def get(self):
+        with self._lock:
+            stats = dict((host, counts.copy())
+                         for host, counts in self._counts.items())
+            pools = list(self._pools)
+
+        for pool in pools:
+            idle = pool.idle_connections()
+            if idle:
+                counts = stats.setdefault(
+                    self._host(pool), dict.fromkeys(self.COUNTERS, 0))
+                counts['idle'] += idle
+
+        return stats
+
+
+def _counting_pools_supported():
+    # The counting pools hook into methods of the urllib3 connection pools
+    # that are not part of its public API. If the installed version does not
+    # have them the pools are left alone and no usage is reported.
+    pool_class = connectionpool.HTTPConnectionPool
+    queue_class = getattr(pool_class, 'QueueCls', None)
+    return (all(callable(getattr(pool_class, name, None))
+                for name in ('_new_conn', '_get_conn', '_put_conn')) and
+            isinstance(queue_class, type) and
+            issubclass(queue_class, queue.Queue))
+
+
+class _PoolQueue(queue.LifoQueue):
+    """The idle connections of a pool, reporting the ones that don't fit."""
+
+    on_full = None
+
+    def put(self, item, block=True, timeout=None):
+        try:
+            super(_PoolQueue, self).put(item, block=block, timeout=timeout)
+        except queue.Full:
+            if self.on_full and item is not None:
+                self.on_full()
+            raise
+
+
+class _CountingPoolMixin(object):
+    """Count the connections opened, lent out and discarded by a pool."""
+
+    QueueCls = _PoolQueue
+
+    def __init__(self, host, port=None, stats=None, **kwargs):
+        super(_CountingPoolMixin, self).__init__(host, port=port, **kwargs)
+        self._stats = stats
+        if isinstance(getattr(self, 'pool', None), _PoolQueue):
+            self.pool.on_full = functools.partial(stats.count, self,
+                                                  'discarded')
+        stats.add_pool(self)
+
+    def idle_connections(self):
+        pool = getattr(self, 'pool', None)
+        if not isinstance(pool, _PoolQueue):
+            return 0
+
+        with pool.mutex:
+            return sum(1 for conn in pool.queue if conn is not None)
+
+    def _new_conn(self):
+        conn = super(_CountingPoolMixin, self)._new_conn()
+        self._stats.count(self, 'new_connections')
+        return conn
+
+    def _get_conn(self, timeout=None):
+        conn = super(_CountingPoolMixin, self)._get_conn(timeout=timeout)
+        self._stats.count(self, 'in_use')
+        return conn
+
+    def _put_conn(self, conn):
+        try:
+            super(_CountingPoolMixin, self)._put_conn(conn)
+        finally:
+            self._stats.count(self, 'in_use', -1)
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin,
+                                  connectionpool.HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin,
+                                   connectionpool.HTTPSConnectionPool):
+    pass
+
+
 class TCPKeepAliveAdapter(requests.adapters.HTTPAdapter):
     """The custom adapter used to set TCP Keep-Alive on all connections.
 
@@ -1015,3 +2119,32 @@ class TCPKeepAliveAdapter(requests.adapters.HTTPAdapter):
 
             kwargs['socket_options'] = socket_options
         super(TCPKeepAliveAdapter, self).init_poolmanager(*args, **kwargs)
+
+        # count the connections of the pools, see pool_stats()
+        self._pool_stats = _PoolStats()
+        poolmanager = getattr(self, 'poolmanager', None)
+        if poolmanager is None:
+            return
+
+        if not _counting_pools_supported():
+            _logger.debug('The installed urllib3 does not support counting '
+                          'the connections of its pools.')
+        elif hasattr(poolmanager, 'pool_classes_by_scheme'):
+            poolmanager.pool_classes_by_scheme = {
+                'http': functools.partial(_CountingHTTPConnectionPool,
+                                          stats=self._pool_stats),
+                'https': functools.partial(_CountingHTTPSConnectionPool,
+                                           stats=self._pool_stats),
+            }
+
+    def pool_stats(self):
+        """Return the usage of the connection pools of the adapter.
+
+        :returns: A dict from the URL of each host to a dict with the number
+                  of connections ``in_use`` and ``idle`` now, and the number of
+                  ``new_connections`` opened and of connections ``discarded``
+                  because the pool was full so far. It is empty if the
+                  installed urllib3 does not support counting them.
+        :rtype: dict
+        """
+        return self._pool_stats.get()
@@ -17,11 +17,15 @@ import uuid
 
 from keystoneauth1 import fixture
 from keystoneauth1 import plugin
+from oslo_utils import fixture as utils_fixture
 from oslo_utils import timeutils
+import requests
+from testtools import matchers
 
 from keystoneclient import access
 from keystoneclient.auth import base
 from keystoneclient.auth import identity
+from keystoneclient import cache
 from keystoneclient import exceptions
 from keystoneclient import session
 from keystoneclient.tests.unit import utils
@@ -114,6 +118,68 @@ class CommonIdentityTests(object, metaclass=abc.ABCMeta):
         self.assertEqual(200, resp.status_code)
         self.assertEqual(new_body, resp.text)
 
+    def test_get_endpoints(self):
+        a = self.create_auth_plugin()
+        s = session.Session(auth=a)
+
+        self.assertEqual([self.TEST_COMPUTE_ADMIN],
+                         a.get_endpoints(s, service_type='compute',
+                                         interface='admin'))
+        self.assertEqual([self.TEST_URL],
+                         a.get_endpoints(s, interface=base.AUTH_INTERFACE))
+        self.assertEqual([], a.get_endpoints(s))
+        self.assertEqual([], a.get_endpoints(s, service_type='unknown'))
+
+    def _discovery_requests(self):
+        return [r for r in self.requests_mock.request_history
+                if r.url.rstrip('/') == self.TEST_COMPUTE_ADMIN]
+
+    def test_get_endpoints_resolved_once(self):
+        self.stub_url('GET', [], base_url=self.TEST_COMPUTE_ADMIN,
+                      json=self.TEST_DISCOVERY)
+
+        a = self.create_auth_plugin()
+        s = session.Session(auth=a)
+        kwargs = {'service_type': 'compute', 'interface': 'admin',
+                  'version': self.version}
+
+        endpoints = a.get_endpoints(s, **kwargs)
+        self.assertEqual([a.get_endpoint(s, **kwargs)], endpoints)
+        self.assertEqual(endpoints, a.get_endpoints(s, **kwargs))
+        self.assertThat(self._discovery_requests(), matchers.HasLength(1))
+
+    def test_get_endpoints_failed_discovery_is_cached(self):
+        self.requests_mock.get(self.TEST_COMPUTE_ADMIN,
+                               exc=requests.exceptions.ConnectionError())
+        time_fixture = self.useFixture(utils_fixture.TimeFixture())
+
+        a = self.create_auth_plugin()
+        s = session.Session(auth=a)
+        kwargs = {'service_type': 'compute', 'interface': 'admin',
+                  'version': self.version}
+
+        for i in range(2):
+            self.assertEqual([self.TEST_COMPUTE_ADMIN],
+                             a.get_endpoints(s, **kwargs))
+        self.assertThat(self._discovery_requests(), matchers.HasLength(1))
+
+        time_fixture.advance_time_seconds(a.DISCOVERY_RETRY_SECONDS + 1)
+        a.get_endpoints(s, **kwargs)
+        self.assertThat(self._discovery_requests(), matchers.HasLength(2))
+
+    def test_get_endpoints_skips_discovery_of_open_circuit(self):
+        breaker = session.CircuitBreaker(failure_threshold=1)
+        breaker.record_failure(self.TEST_COMPUTE_ADMIN)
+
+        a = self.create_auth_plugin()
+        s = session.Session(auth=a, circuit_breaker=breaker)
+
+        self.assertEqual([self.TEST_COMPUTE_ADMIN],
+                         a.get_endpoints(s, service_type='compute',
+                                         interface='admin',
+                                         version=self.version))
+        self.assertEqual([], self._discovery_requests())
+
     def test_discovery_uses_session_cache(self):
         # register responses such that if the discovery URL is hit more than
         # once then the response will be invalid and not point to COMPUTE_ADMIN
@@ -139,6 +205,25 @@ class CommonIdentityTests(object, metaclass=abc.ABCMeta):
             self.assertEqual(200, resp.status_code)
             self.assertEqual(body, resp.text)
 
+    def test_discovery_uses_session_discovery_cache(self):
+        resps = [{'json': self.TEST_DISCOVERY}, {'status_code': 500}]
+        self.requests_mock.get(self.TEST_COMPUTE_ADMIN, resps)
+
+        body = 'SUCCESS'
+        self.stub_url('GET', ['path'], text=body)
+
+        discovery_cache = cache.DiscoveryCache()
+        for i in range(2):
+            a = self.create_auth_plugin()
+            s = session.Session(auth=a, discovery_cache=discovery_cache)
+            resp = s.get('/path', endpoint_filter={'service_type': 'compute',
+                                                   'interface': 'admin',
+                                                   'version': self.version})
+            self.assertEqual(200, resp.status_code)
+            self.assertEqual(body, resp.text)
+
+        self.assertEqual(1, discovery_cache.stats()['hits'])
+
     def test_discovery_uses_plugin_cache(self):
         # register responses such that if the discovery URL is hit more than
         # once then the response will be invalid and not point to COMPUTE_ADMIN
@@ -220,6 +305,84 @@ class CommonIdentityTests(object, metaclass=abc.ABCMeta):
         s = session.Session(auth=a)
         self.assertIs(expired_auth_ref, a.get_access(s))
 
+    def _create_expiring_auth_plugin(self, minutes, **kwargs):
+        expires = timeutils.utcnow() + datetime.timedelta(minutes=minutes)
+        token = self.get_auth_data(expires=expires)
+        a = self.create_auth_plugin(**kwargs)
+        a.auth_ref = access.AccessInfo.factory(body=token,
+                                               auth_token=uuid.uuid4().hex)
+        return a
+
+    def test_refresh_ahead(self):
+        a = self._create_expiring_auth_plugin(5, refresh_ahead=600)
+        old_auth_ref = a.auth_ref
+        s = session.Session(auth=a)
+
+        # the current token is returned while a new one is fetched
+        self.assertIs(old_auth_ref, a.get_access(s))
+        a._refresh_thread.join()
+
+        new_auth_ref = a.get_access(s)
+        self.assertIsNot(old_auth_ref, new_auth_ref)
+        self.assertFalse(new_auth_ref.will_expire_soon(600))
+        self.assertIsNone(a._refresh_thread)
+
+    def test_refresh_ahead_not_needed(self):
+        a = self._create_expiring_auth_plugin(60, refresh_ahead=600)
+        s = session.Session(auth=a)
+
+        self.assertIsNotNone(a.get_access(s))
+        self.assertIsNone(a._refresh_thread)
+
+    def test_refresh_ahead_failure(self):
+        time_fixture = self.useFixture(utils_fixture.TimeFixture())
+        self.stub_auth(status_code=500)
+        a = self._create_expiring_auth_plugin(5, refresh_ahead=600)
+        old_auth_ref = a.auth_ref
+        s = session.Session(auth=a)
+
+        self.assertIs(old_auth_ref, a.get_access(s))
+        a._refresh_thread.join()
+
+        # the failure is retried only after a delay
+        self.assertIs(old_auth_ref, a.get_access(s))
+        self.assertIsNone(a._refresh_thread)
+        self.assertIsNotNone(a._refresh_failed_at)
+
+        time_fixture.advance_time_seconds(a.REFRESH_RETRY_SECONDS)
+        self.stub_auth_data()
+        self.assertIs(old_auth_ref, a.get_access(s))
+        a._refresh_thread.join()
+        self.assertIsNot(old_auth_ref, a.get_access(s))
+
+    def test_get_access_without_lock(self):
+        a = self.create_auth_plugin()
+        s = session.Session(auth=a)
+        auth_ref = a.get_access(s)
+
+        lock = a._lock
+        a._lock = mock.MagicMock(wraps=lock)
+        self.assertIs(auth_ref, a.get_access(s))
+        self.assertFalse(a._lock.__enter__.called)
+
+        # a token set from outside is checked under the lock once
+        a.auth_ref = self._create_expiring_auth_plugin(60).auth_ref
+        a._lock = lock
+        self.assertIs(a.auth_ref, a.get_access(s))
+        a._lock = mock.MagicMock(wraps=lock)
+        self.assertIs(a.auth_ref, a.get_access(s))
+        self.assertFalse(a._lock.__enter__.called)
+
+    def test_get_access_without_lock_until_expiring(self):
+        time_fixture = self.useFixture(utils_fixture.TimeFixture())
+        a = self._create_expiring_auth_plugin(10)
+        old_auth_ref = a.auth_ref
+        s = session.Session(auth=a)
+
+        self.assertIs(old_auth_ref, a.get_access(s))
+        time_fixture.advance_time_seconds(601 - a.MIN_TOKEN_LIFE_SECONDS)
+        self.assertIsNot(old_auth_ref, a.get_access(s))
+
     def test_invalidate(self):
         a = self.create_auth_plugin()
         s = session.Session(auth=a)
@@ -261,6 +424,23 @@ class V3(CommonIdentityTests, utils.TestCase):
 
         return token
 
+    def test_get_endpoints_from_several_regions(self):
+        other_public = 'http://nova2/novapi/public'
+
+        token = self.get_auth_data()
+        svc = token.add_service('compute')
+        svc.add_standard_endpoints(public=other_public, region='RegionTwo')
+        self.stub_auth(json=token)
+
+        a = self.create_auth_plugin()
+        s = session.Session(auth=a)
+
+        self.assertEqual([self.TEST_COMPUTE_PUBLIC, other_public],
+                         a.get_endpoints(s, service_type='compute'))
+        self.assertEqual([other_public],
+                         a.get_endpoints(s, service_type='compute',
+                                         region_name='RegionTwo'))
+
     def stub_auth(self, subject_token=None, **kwargs):
         if not subject_token:
             subject_token = self.TEST_TOKEN
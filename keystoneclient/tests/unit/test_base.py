@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from unittest import mock
 import uuid
 
 import fixtures
@@ -122,6 +123,63 @@ class BaseTest(utils.TestCase):
         self.assertEqual(r.to_dict(), r_dict)
 
 
+class CompactResourceTest(utils.TestCase):
+
+    def test_attributes(self):
+        info = {'id': 1, 'name': 'joe', 'links': {'self': 'http://x'}}
+        r = base.compact_resource_class(users.User)(None, info, loaded=True)
+
+        self.assertIsInstance(r, users.User)
+        self.assertIsInstance(r, base.CompactResource)
+        self.assertEqual('joe', r.name)
+        self.assertEqual("<User id=1, links={'self': 'http://x'}, name=joe>",
+                         repr(r))
+        self.assertRaises(AttributeError, getattr, r, 'blahblah')
+
+        r.name = 'bob'
+        self.assertEqual('bob', r.name)
+        self.assertEqual('bob', r._info['name'])
+        self.assertRaises(AttributeError, setattr, r, 'human_id', 'x')
+
+    def test_to_dict_copies_containers(self):
+        info = {'id': 1, 'links': {'self': 'http://x'}}
+        r = base.compact_resource_class(base.Resource)(None, info)
+
+        d = r.to_dict()
+        self.assertEqual(info, d)
+        d['links']['self'] = 'http://y'
+        d['id'] = 2
+        self.assertEqual({'id': 1, 'links': {'self': 'http://x'}}, r._info)
+
+    def test_lazy_getattr(self):
+        manager = mock.Mock()
+        manager.get.return_value = base.Resource(None, {'id': 1, 'x': 2})
+        r = base.compact_resource_class(base.Resource)(manager, {'id': 1})
+
+        self.assertEqual(2, r.x)
+        manager.get.assert_called_once_with(1)
+        self.assertRaises(AttributeError, getattr, r, 'blahblah')
+
+    def test_class_reused(self):
+        cls = base.compact_resource_class(users.User)
+        self.assertIs(cls, base.compact_resource_class(users.User))
+        self.assertIs(cls, base.compact_resource_class(cls))
+        self.assertEqual(users.User.__name__, cls.__name__)
+
+    def test_manager_opt_in(self):
+        mgr = users.UserManager(None)
+        self.assertFalse(mgr.compact_resources)
+
+        mgr.compact_resources = True
+        self.assertTrue(mgr.compact_resources)
+        self.assertIs(base.compact_resource_class(users.User),
+                      mgr.resource_class)
+        self.assertIs(users.User, users.UserManager.resource_class)
+
+        mgr.compact_resources = False
+        self.assertIs(users.User, mgr.resource_class)
+
+
 class ManagerTest(utils.TestCase):
     body = {"hello": {"hi": 1}}
     url = "/test-url"
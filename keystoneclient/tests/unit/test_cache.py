@@ -0,0 +1,330 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import os
+import stat
+from unittest import mock
+
+import fixtures
+from keystoneauth1 import fixture as ksa_fixture
+from oslo_utils import fixture as utils_fixture
+from oslo_utils import timeutils
+
+from keystoneclient import access
+from keystoneclient import cache
+from keystoneclient.tests.unit import utils
+from keystoneclient.tests.unit.v2_0 import client_fixtures
+from keystoneclient import utils as client_utils
+
+
+class MemoryCacheTests(utils.TestCase):
+
+    def setUp(self):
+        super(MemoryCacheTests, self).setUp()
+        self.time_fixture = self.useFixture(utils_fixture.TimeFixture())
+
+    def test_get_set(self):
+        c = cache.MemoryCache()
+
+        self.assertIsNone(c.get('a'))
+        c.set('a', 1)
+        self.assertEqual(1, c.get('a'))
+        self.assertEqual(1, len(c))
+
+        stats = c.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+    def test_lru_eviction(self):
+        c = cache.MemoryCache(maxsize=2)
+
+        c.set('a', 1)
+        c.set('b', 2)
+        # touch a so that b is the least recently used
+        c.get('a')
+        c.set('c', 3)
+
+        self.assertEqual(1, c.get('a'))
+        self.assertIsNone(c.get('b'))
+        self.assertEqual(3, c.get('c'))
+        self.assertEqual(1, c.stats()['evictions'])
+
+    def test_ttl(self):
+        c = cache.MemoryCache(ttl=60)
+
+        c.set('a', 1)
+        c.set('b', 2, ttl=10)
+        c.set('c', 3, ttl=120)
+
+        self.time_fixture.advance_time_seconds(30)
+        self.assertEqual(1, c.get('a'))
+        self.assertIsNone(c.get('b'))
+
+        self.time_fixture.advance_time_seconds(31)
+        self.assertIsNone(c.get('a'))
+        # the cache ttl can't be extended per entry
+        self.assertIsNone(c.get('c'))
+        self.assertEqual(3, c.stats()['expirations'])
+
+    def test_expires(self):
+        c = cache.MemoryCache(ttl=60)
+        now = timeutils.utcnow()
+
+        c.set('a', 1, expires=now + datetime.timedelta(seconds=10))
+        c.set('b', 2, expires=now - datetime.timedelta(seconds=10))
+
+        self.assertEqual(1, c.get('a'))
+        self.assertIsNone(c.get('b'))
+        self.assertEqual(1, len(c))
+
+        self.time_fixture.advance_time_seconds(11)
+        self.assertIsNone(c.get('a'))
+
+    def test_delete(self):
+        c = cache.MemoryCache()
+
+        c.set(('a', 1), 1)
+        c.set(('a', 2), 2)
+        c.set(('b', 1), 3)
+
+        c.delete(('b', 1))
+        self.assertIsNone(c.get(('b', 1)))
+
+        self.assertEqual(2, c.delete_if(lambda k: k[0] == 'a'))
+        self.assertEqual(0, len(c))
+
+    def test_pop(self):
+        c = cache.MemoryCache()
+        c.set('a', 1)
+
+        self.assertEqual(1, c.pop('a'))
+        self.assertEqual(0, len(c))
+        self.assertEqual(2, c.pop('a', 2))
+        self.assertEqual({'hits': 0, 'misses': 0},
+                         {k: c.stats()[k] for k in ('hits', 'misses')})
+
+    def test_invalid_maxsize(self):
+        self.assertRaises(ValueError, cache.MemoryCache, maxsize=0)
+
+
+class FileTokenCacheTests(utils.TestCase):
+
+    def setUp(self):
+        super(FileTokenCacheTests, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'tokens')
+        self.cache = cache.FileTokenCache(self.path)
+
+    def test_v3_round_trip(self):
+        token = ksa_fixture.V3Token()
+        token.set_project_scope()
+        s = token.add_service('identity')
+        s.add_standard_endpoints(public='http://public.example.com:5000/v3')
+        auth_ref = access.AccessInfo.factory(body=token,
+                                             auth_token='token-id')
+
+        self.assertIsNone(self.cache.get('key'))
+        self.cache.set('key', auth_ref)
+        cached = self.cache.get('key')
+
+        self.assertIsInstance(cached, access.AccessInfoV3)
+        self.assertEqual('token-id', cached.auth_token)
+        self.assertEqual(auth_ref.project_id, cached.project_id)
+        self.assertEqual(auth_ref.expires, cached.expires)
+        self.assertEqual(
+            'http://public.example.com:5000/v3',
+            cached.service_catalog.url_for(service_type='identity'))
+        self.assertIsNone(self.cache.get('other'))
+
+        mode = stat.S_IMODE(os.stat(self.path).st_mode)
+        self.assertEqual(0o700, mode)
+        for name in os.listdir(self.path):
+            self.assertNotIn('key', name)
+            mode = stat.S_IMODE(os.stat(os.path.join(self.path, name)).st_mode)
+            self.assertEqual(0o600, mode)
+
+    def test_v2_round_trip(self):
+        body = client_fixtures.project_scoped_token()
+        future = timeutils.utcnow() + datetime.timedelta(minutes=30)
+        body['access']['token']['expires'] = client_utils.isotime(future)
+        auth_ref = access.AccessInfo.factory(body=body)
+
+        self.cache.set('key', auth_ref)
+        cached = self.cache.get('key')
+
+        self.assertIsInstance(cached, access.AccessInfoV2)
+        self.assertEqual(auth_ref.auth_token, cached.auth_token)
+        self.assertEqual(auth_ref.username, cached.username)
+
+    def test_expired(self):
+        token = ksa_fixture.V3Token(
+            expires=timeutils.utcnow() - datetime.timedelta(minutes=1))
+        auth_ref = access.AccessInfo.factory(body=token, auth_token='id')
+
+        self.cache.set('key', auth_ref)
+
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_corrupt_and_delete(self):
+        token = ksa_fixture.V3Token()
+        self.cache.set('key', access.AccessInfo.factory(body=token,
+                                                        auth_token='id'))
+        filename = self.cache._filename('key')
+        with open(filename, 'w') as f:
+            f.write('{not json')
+
+        self.assertIsNone(self.cache.get('key'))
+
+        self.cache.delete('key')
+        self.cache.delete('key')
+        self.assertFalse(os.path.exists(filename))
+
+    def test_lock(self):
+        with self.cache.lock('key'):
+            self.assertTrue(os.path.isdir(self.path))
+
+    def test_lock_leaves_no_file_per_key(self):
+        token = ksa_fixture.V3Token()
+        for key in ('a', 'b', 'c'):
+            with self.cache.lock(key):
+                self.cache.set(key, access.AccessInfo.factory(
+                    body=token, auth_token='id'))
+            self.cache.delete(key)
+
+        self.assertEqual(['.lock'], os.listdir(self.path))
+
+    def test_existing_directory_restricted(self):
+        os.makedirs(self.path, mode=0o755)
+        os.chmod(self.path, 0o777)
+
+        token = ksa_fixture.V3Token()
+        self.cache.set('key', access.AccessInfo.factory(body=token,
+                                                        auth_token='id'))
+
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(self.path).st_mode))
+        self.assertEqual('id', self.cache.get('key').auth_token)
+
+    def test_directory_of_another_user_refused(self):
+        token = ksa_fixture.V3Token()
+        self.cache.set('key', access.AccessInfo.factory(body=token,
+                                                        auth_token='id'))
+
+        with mock.patch('os.getuid', return_value=os.getuid() + 1):
+            self.assertIsNone(self.cache.get('key'))
+            self.cache.set('other', access.AccessInfo.factory(
+                body=token, auth_token='id'))
+
+        self.assertIsNone(self.cache.get('other'))
+
+    def test_region_name_round_trip(self):
+        # a region_name in the token data is deprecated by the catalog
+        self.deprecations.expect_deprecations()
+        token = ksa_fixture.V3Token()
+        auth_ref = access.AccessInfo.factory(body=token, auth_token='id',
+                                             region_name='RegionTwo')
+
+        self.cache.set('key', auth_ref)
+        with mock.patch.object(access.AccessInfo, 'factory',
+                               wraps=access.AccessInfo.factory) as factory:
+            cached = self.cache.get('key')
+
+        # the stored key is not passed as the argument of factory
+        self.assertNotIn('region_name', factory.call_args[1])
+        self.assertEqual('RegionTwo', cached['region_name'])
+        self.assertEqual('id', cached.auth_token)
+
+
+class DiscoveryCacheTests(utils.TestCase):
+
+    URL = 'http://keystone.example.com:5000/'
+    DATA = [{'id': 'v3.10', 'status': 'stable',
+             'links': [{'rel': 'self', 'href': URL + 'v3/'}]}]
+
+    def setUp(self):
+        super(DiscoveryCacheTests, self).setUp()
+        self.time_fixture = self.useFixture(utils_fixture.TimeFixture())
+        self.path = self.useFixture(fixtures.TempDir()).path
+
+    def test_memory(self):
+        c = cache.DiscoveryCache(maxsize=1, ttl=60)
+
+        self.assertIsNone(c.get(self.URL))
+        c.set(self.URL, self.DATA)
+        self.assertEqual(self.DATA, c.get(self.URL))
+
+        c.set('http://other', [])
+        self.assertIsNone(c.get(self.URL))
+        self.assertEqual(1, c.stats()['evictions'])
+
+        self.time_fixture.advance_time_seconds(61)
+        self.assertIsNone(c.get('http://other'))
+
+    def test_persisted(self):
+        cache.DiscoveryCache(ttl=60, path=self.path).set(self.URL, self.DATA)
+
+        # a new cache, as in another process, reads the stored data once
+        c = cache.DiscoveryCache(ttl=60, path=self.path)
+        self.assertEqual(self.DATA, c.get(self.URL))
+        self.assertEqual(self.DATA, c.get(self.URL))
+        self.assertEqual(1, c.stats()['hits'])
+
+        # the age of the stored data counts towards the ttl
+        self.time_fixture.advance_time_seconds(61)
+        self.assertIsNone(c.get(self.URL))
+        self.assertIsNone(
+            cache.DiscoveryCache(ttl=60, path=self.path).get(self.URL))
+        self.assertEqual(
+            self.DATA, cache.DiscoveryCache(ttl=None,
+                                            path=self.path).get(self.URL))
+
+    def test_invalidate(self):
+        c = cache.DiscoveryCache(path=self.path)
+        c.set(self.URL, self.DATA)
+        c.set('http://other', self.DATA)
+
+        c.invalidate(self.URL)
+        self.assertIsNone(c.get(self.URL))
+        self.assertIsNone(cache.DiscoveryCache(path=self.path).get(self.URL))
+        self.assertEqual(self.DATA, c.get('http://other'))
+
+        c.invalidate()
+        self.assertIsNone(c.get('http://other'))
+        self.assertEqual([], os.listdir(self.path))
+
+    def test_authenticated_cached_separately(self):
+        c = cache.DiscoveryCache(path=self.path)
+        c.set(self.URL, self.DATA, authenticated=True)
+
+        self.assertIsNone(c.get(self.URL))
+        self.assertIsNone(c.get(self.URL, authenticated=False))
+        self.assertEqual(self.DATA, c.get(self.URL, authenticated=True))
+        self.assertIsNone(cache.DiscoveryCache(path=self.path).get(self.URL))
+
+        c.set(self.URL, [], authenticated=False)
+        c.invalidate(self.URL)
+        for authenticated in (None, True, False):
+            self.assertIsNone(
+                cache.DiscoveryCache(path=self.path).get(
+                    self.URL, authenticated=authenticated))
+
+    def test_invalidate_keeps_token_files(self):
+        tokens = cache.FileTokenCache(self.path)
+        tokens.set('key', access.AccessInfo.factory(
+            body=ksa_fixture.V3Token(), auth_token='id'))
+
+        c = cache.DiscoveryCache(path=self.path)
+        c.set(self.URL, self.DATA)
+        c.invalidate()
+
+        self.assertIsNone(c.get(self.URL))
+        self.assertEqual('id', tokens.get('key').auth_token)
@@ -19,6 +19,7 @@ from testtools import matchers
 
 from keystoneclient import _discover
 from keystoneclient.auth import token_endpoint
+from keystoneclient import cache
 from keystoneclient import client
 from keystoneclient import discover
 from keystoneclient import exceptions
@@ -310,6 +311,36 @@ class AvailableVersionsTests(utils.TestCase):
             else:
                 self.fail("Invalid version found")
 
+    def test_available_versions_many(self):
+        self.requests_mock.get(BASE_URL, status_code=300, text=V3_VERSION_LIST)
+        self.requests_mock.get(V2_URL, status_code=200, text=V2_VERSION_ENTRY)
+        self.requests_mock.get(V3_URL, status_code=500)
+
+        versions = discover.available_versions([BASE_URL, V2_URL, V3_URL],
+                                               timeout=2)
+
+        # v2.0 is offered by two of the URLs but only listed once
+        self.assertEqual(['v3.0', 'v2.0'], [v['id'] for v in versions])
+        self.assertEqual(3, self.requests_mock.call_count)
+        for request in self.requests_mock.request_history:
+            self.assertEqual(2, request.timeout)
+
+    def test_available_versions_many_version(self):
+        self.requests_mock.get(V2_URL, status_code=200, text=V2_VERSION_ENTRY)
+        self.requests_mock.get(V3_URL, status_code=200, text=V3_VERSION_ENTRY)
+
+        versions = discover.available_versions([V2_URL, V3_URL],
+                                               version=(3, 0))
+
+        self.assertEqual(['v3.0'], [v['id'] for v in versions])
+
+    def test_available_versions_many_failed(self):
+        self.requests_mock.get(V2_URL, status_code=500)
+        self.requests_mock.get(V3_URL, status_code=200, text='Not JSON')
+
+        self.assertRaises(exceptions.DiscoveryFailure,
+                          discover.available_versions, [V2_URL, V3_URL])
+
 
 class ClientDiscoveryTests(utils.TestCase):
 
@@ -568,6 +599,46 @@ class ClientDiscoveryTests(utils.TestCase):
         self.assertNotIn('X-Auth-Token',
                          self.requests_mock.last_request.headers)
 
+    def test_discover_many_urls(self):
+        self.requests_mock.get(V2_URL, status_code=200, text=V2_VERSION_ENTRY)
+        self.requests_mock.get(V3_URL, status_code=200, text=V3_VERSION_ENTRY)
+
+        with self.deprecations.expect_deprecations_here():
+            disc = discover.Discover(auth_url=[V2_URL, V3_URL])
+
+        self.assertEqual([(2, 0), (3, 0)],
+                         [v['version'] for v in disc.version_data()])
+        self.assertEqual(V3_URL, disc.url_for('3.0'))
+
+    def test_session_discovery_cache(self):
+        matcher = self.requests_mock.get(BASE_URL, status_code=300,
+                                         text=V3_VERSION_LIST)
+        with self.deprecations.expect_deprecations_here():
+            s = session.Session(discovery_cache=cache.DiscoveryCache())
+
+        first = discover.Discover(s, auth_url=BASE_URL)
+        second = discover.Discover(s, auth_url=BASE_URL)
+
+        self.assertEqual(1, matcher.call_count)
+        self.assertEqual(first.version_data(), second.version_data())
+
+        s.discovery_cache.invalidate(BASE_URL)
+        discover.Discover(s, auth_url=BASE_URL)
+        self.assertEqual(2, matcher.call_count)
+
+    def test_discovery_cache_argument(self):
+        matcher = self.requests_mock.get(BASE_URL, status_code=300,
+                                         text=V3_VERSION_LIST)
+        discovery_cache = cache.DiscoveryCache()
+
+        for i in range(2):
+            with self.deprecations.expect_deprecations_here():
+                versions = discover.available_versions(
+                    BASE_URL, discovery_cache=discovery_cache)
+            self.assertEqual(2, len(versions))
+
+        self.assertEqual(1, matcher.call_count)
+
 
 class DiscoverQueryTests(utils.TestCase):
 
@@ -0,0 +1,124 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_utils import fixture as utils_fixture
+
+from keystoneclient import endpoint_selection
+from keystoneclient.tests.unit import utils
+
+
+ENDPOINTS = ['http://a', 'http://b', 'http://c']
+
+
+class EndpointSelectorTests(utils.TestCase):
+
+    def test_order_is_abstract(self):
+        self.assertRaises(TypeError, endpoint_selection.EndpointSelector)
+
+
+class RoundRobinSelectorTests(utils.TestCase):
+
+    def test_order(self):
+        selector = endpoint_selection.RoundRobinSelector()
+
+        self.assertEqual(['http://a', 'http://b', 'http://c'],
+                         selector.order(ENDPOINTS))
+        self.assertEqual(['http://b', 'http://c', 'http://a'],
+                         selector.order(ENDPOINTS))
+        self.assertEqual(['http://c', 'http://a', 'http://b'],
+                         selector.order(ENDPOINTS))
+        self.assertEqual(['http://a', 'http://b', 'http://c'],
+                         selector.order(ENDPOINTS))
+        self.assertEqual([], selector.order([]))
+
+
+class LeastOutstandingSelectorTests(utils.TestCase):
+
+    def test_order(self):
+        selector = endpoint_selection.LeastOutstandingSelector()
+
+        selector.started('http://a')
+        selector.started('http://a')
+        selector.started('http://b')
+
+        self.assertEqual('http://c', selector.order(ENDPOINTS)[0])
+        self.assertEqual('http://a', selector.order(ENDPOINTS)[-1])
+
+        selector.finished('http://a', 0.1, False)
+        selector.finished('http://a', 0.1, True)
+
+        # a and c are now tied and are taken in turn
+        firsts = set(selector.order(ENDPOINTS)[0] for _ in range(3))
+        self.assertEqual(set(['http://a', 'http://c']), firsts)
+
+
+class EWMASelectorTests(utils.TestCase):
+
+    def setUp(self):
+        super(EWMASelectorTests, self).setUp()
+        self.time_fixture = self.useFixture(utils_fixture.TimeFixture())
+
+    def test_order(self):
+        selector = endpoint_selection.EWMASelector(decay=0.5)
+
+        selector.finished('http://a', 0.4, False)
+        selector.finished('http://b', 0.1, False)
+
+        # c has not been used yet so it is tried first
+        self.assertEqual(['http://c', 'http://b', 'http://a'],
+                         selector.order(ENDPOINTS))
+
+        selector.finished('http://c', 0.2, False)
+        selector.finished('http://a', 0.0, False)
+
+        self.assertEqual(0.2, selector.latency('http://a'))
+        self.assertEqual(['http://b', 'http://c', 'http://a'],
+                         selector.order(ENDPOINTS))
+
+    def test_failure_penalty(self):
+        selector = endpoint_selection.EWMASelector(decay=1,
+                                                   failure_penalty=10)
+
+        selector.finished('http://a', 0.5, True)
+        self.assertEqual(10, selector.latency('http://a'))
+        self.assertIsNone(selector.latency('http://b'))
+
+    def test_failed_endpoint_recovers(self):
+        selector = endpoint_selection.EWMASelector(half_life=10)
+
+        selector.finished('http://a', 0.1, True)
+        for i in range(50):
+            selector.finished('http://b', 0.1, False)
+        self.assertEqual(['http://b', 'http://a'],
+                         selector.order(['http://a', 'http://b'])[:2])
+
+        # the penalty of a fades while b keeps serving the requests, until a
+        # is tried again and wins its traffic back by answering faster
+        for i in range(90):
+            self.time_fixture.advance_time_seconds(1)
+            selector.finished('http://b', 0.1, False)
+        self.assertAlmostEqual(30 * 0.5 ** 9, selector.latency('http://a'))
+        self.assertEqual('http://a', selector.order(['http://a',
+                                                     'http://b'])[0])
+
+        selector.finished('http://a', 0.01, False)
+        for i in range(10):
+            selector.finished('http://a', 0.01, False)
+            selector.finished('http://b', 0.1, False)
+        self.assertEqual('http://a', selector.order(['http://a',
+                                                     'http://b'])[0])
+
+    def test_invalid_decay(self):
+        self.assertRaises(ValueError, endpoint_selection.EWMASelector,
+                          decay=0)
+        self.assertRaises(ValueError, endpoint_selection.EWMASelector,
+                          half_life=0)
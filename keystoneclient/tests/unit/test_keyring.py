@@ -10,12 +10,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
 import datetime
 from unittest import mock
 
+import fixtures
 from oslo_utils import timeutils
 
 from keystoneclient import access
+from keystoneclient import cache
 from keystoneclient import httpclient
 from keystoneclient.tests.unit import utils
 from keystoneclient.tests.unit.v2_0 import client_fixtures
@@ -199,3 +202,67 @@ class KeyringTest(utils.TestCase):
         self.assertEqual(new_auth_ref['token'],
                          PROJECT_SCOPED_TOKEN['access']['token'])
         self.assertEqual(new_auth_ref.username, USERNAME)
+
+
+class TokenCacheTest(utils.TestCase):
+
+    def setUp(self):
+        super(TokenCacheTest, self).setUp()
+        self.token_cache = cache.FileTokenCache(
+            self.useFixture(fixtures.TempDir()).path)
+
+    def _client(self, token_cache=None):
+        # Creating a HTTPClient not using session is deprecated.
+        with self.deprecations.expect_deprecations_here():
+            return httpclient.HTTPClient(
+                username=USERNAME, password=PASSWORD, project_id=TENANT_ID,
+                auth_url=AUTH_URL, token_cache=token_cache or self.token_cache)
+
+    def _token(self, minutes):
+        token = copy.deepcopy(PROJECT_SCOPED_TOKEN)
+        expires = timeutils.utcnow() + datetime.timedelta(minutes=minutes)
+        token['access']['token']['expires'] = client_utils.isotime(expires)
+        return token
+
+    def test_shared_between_clients(self):
+        method = 'get_raw_token_from_identity_service'
+        cl = self._client()
+        with mock.patch.object(cl, method) as meth:
+            meth.return_value = (True, self._token(30))
+            self.assertTrue(cl.authenticate())
+            self.assertEqual(1, meth.call_count)
+
+        # a second client, as in another process, reuses the stored token
+        other = self._client()
+        with mock.patch.object(other, method) as meth:
+            self.assertTrue(other.authenticate())
+            self.assertEqual(0, meth.call_count)
+
+        self.assertEqual(TOKEN, other.auth_token)
+        self.assertEqual(USERNAME, other.auth_ref.username)
+        self.assertEqual(cl.management_url, other.management_url)
+
+    def test_stale_token_not_used(self):
+        method = 'get_raw_token_from_identity_service'
+        for minutes, calls in ((0.25, 1), (30, 1), (30, 0)):
+            cl = self._client()
+            with mock.patch.object(cl, method) as meth:
+                meth.return_value = (True, self._token(minutes))
+                self.assertTrue(cl.authenticate())
+                self.assertEqual(calls, meth.call_count)
+
+    def test_stored_while_waiting_for_lock(self):
+        auth_ref = access.AccessInfo.factory(body=self._token(30))
+        token_cache = mock.MagicMock()
+        token_cache.get.side_effect = [None, auth_ref]
+
+        cl = self._client(token_cache=token_cache)
+        method = 'get_raw_token_from_identity_service'
+        with mock.patch.object(cl, method) as meth:
+            self.assertTrue(cl.authenticate())
+            self.assertEqual(0, meth.call_count)
+
+        self.assertEqual(1, token_cache.lock.call_count)
+        self.assertEqual(2, token_cache.get.call_count)
+        self.assertFalse(token_cache.set.called)
+        self.assertIs(auth_ref, cl.auth_ref)
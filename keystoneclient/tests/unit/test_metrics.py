@@ -0,0 +1,88 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from keystoneclient import metrics
+from keystoneclient.tests.unit import utils
+
+
+class HistogramTests(utils.TestCase):
+
+    def test_histogram(self):
+        histogram = metrics.Histogram(buckets=(0.1, 1.0))
+        self.assertIsNone(histogram.percentile(50))
+
+        for value in (0.05, 0.1, 0.5, 0.7, 3.0):
+            histogram.add(value)
+
+        self.assertEqual(5, histogram.count)
+        self.assertEqual(0.05, histogram.min)
+        self.assertEqual(3.0, histogram.max)
+        self.assertEqual([(0.1, 2), (1.0, 2), (float('inf'), 1)],
+                         histogram.to_dict()['buckets'])
+
+        self.assertEqual(0.1, histogram.percentile(40))
+        self.assertEqual(1.0, histogram.percentile(80))
+        self.assertEqual(3.0, histogram.percentile(99))
+
+
+class CollectorTests(utils.TestCase):
+
+    def test_record_is_abstract(self):
+        self.assertRaises(TypeError, metrics.Collector)
+
+
+class HistogramCollectorTests(utils.TestCase):
+
+    def _metrics(self, service_type='identity', **kwargs):
+        m = metrics.RequestMetrics('GET', 'http://keystone/v3/users',
+                                   service_type=service_type,
+                                   interface='public')
+        m.status_code = 200
+        m.timings = {'send': 0.02, 'total': 0.03}
+        for name, value in kwargs.items():
+            setattr(m, name, value)
+        return m
+
+    def test_record(self):
+        collector = metrics.HistogramCollector()
+
+        collector.record(self._metrics(bytes_received=100))
+        collector.record(self._metrics(status_code=None, retries=2,
+                                       error=RuntimeError()))
+        collector.record(self._metrics(service_type='compute'))
+
+        snapshot = collector.snapshot()
+        counters = snapshot['counters'][('identity', 'public')]
+        self.assertEqual(2, counters['requests'])
+        self.assertEqual(1, counters['errors'])
+        self.assertEqual(2, counters['retries'])
+        self.assertEqual(100, counters['bytes_received'])
+        self.assertEqual({200: 1}, counters['status_codes'])
+
+        send = snapshot['histograms'][('identity', 'public', 'send')]
+        self.assertEqual(2, send['count'])
+        # the bucket bound of 0.025 is capped by the largest value
+        self.assertEqual(0.02, collector.percentile(50, phase='send',
+                                                    service_type='identity',
+                                                    interface='public'))
+        self.assertIsNone(collector.percentile(50, service_type='image'))
+
+    def test_reset(self):
+        collector = metrics.HistogramCollector()
+        collector.record(self._metrics())
+
+        snapshot = collector.snapshot()
+        collector.reset()
+
+        self.assertEqual({'histograms': {}, 'counters': {}},
+                         collector.snapshot())
+        self.assertEqual(1, len(snapshot['counters']))
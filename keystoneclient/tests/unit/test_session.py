@@ -13,22 +13,31 @@
 # under the License.
 
 import argparse
+import asyncio
+import email.utils
 from io import StringIO
 import itertools
 import logging
+import socket
+import threading
+import time
 from unittest import mock
 import uuid
 
 from oslo_config import cfg
 from oslo_config import fixture as config
 from oslo_serialization import jsonutils
+from oslo_utils import fixture as utils_fixture
 import requests
+import requests_mock
 from testtools import matchers
 
 from keystoneclient import adapter
 from keystoneclient.auth import base
+from keystoneclient import endpoint_selection
 from keystoneclient import exceptions
 from keystoneclient.i18n import _
+from keystoneclient import metrics
 from keystoneclient import session as client_session
 from keystoneclient.tests.unit import utils
 
@@ -282,7 +291,215 @@ class SessionTests(utils.TestCase):
         self.assertThat(self.requests_mock.request_history,
                         matchers.HasLength(retries + 1))
 
-    def test_uses_tcp_keepalive_by_default(self):
+    def test_retry_policy(self):
+        self.stub_url('GET', response_list=[{'status_code': 503},
+                                            {'status_code': 502},
+                                            {'text': 'response'}])
+
+        policy = client_session.RetryPolicy(max_attempts=3)
+        session = client_session.Session(retry_policy=policy)
+
+        with mock.patch('time.sleep') as m:
+            resp = session.get(self.TEST_URL)
+
+        self.assertEqual('response', resp.text)
+        self.assertEqual(3, self.requests_mock.call_count)
+
+        # the delays are picked at random up to 0.5 then 1.0
+        delays = [call[0][0] for call in m.call_args_list]
+        self.assertEqual(2, len(delays))
+        for delay, bound in zip(delays, (0.5, 1.0)):
+            self.assertThat(delay, matchers.GreaterThan(-0.0001))
+            self.assertThat(delay, matchers.LessThan(bound + 0.0001))
+
+    def test_retry_policy_max_attempts(self):
+        self.stub_url('GET', status_code=503)
+
+        policy = client_session.RetryPolicy(max_attempts=2)
+        session = client_session.Session(retry_policy=policy)
+
+        with mock.patch('time.sleep'):
+            self.assertRaises(exceptions.ServiceUnavailable,
+                              session.get, self.TEST_URL)
+
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_retry_policy_retry_after(self):
+        self.stub_url('GET', response_list=[
+            {'status_code': 429, 'headers': {'Retry-After': '7'}},
+            {'text': 'response'}])
+
+        session = client_session.Session(
+            retry_policy=client_session.RetryPolicy())
+
+        with mock.patch('time.sleep') as m:
+            session.get(self.TEST_URL)
+
+        m.assert_called_once_with(7.0)
+
+    def test_retry_policy_non_idempotent_method(self):
+        self.stub_url('POST', status_code=503)
+
+        session = client_session.Session(
+            retry_policy=client_session.RetryPolicy())
+
+        with mock.patch('time.sleep') as m:
+            self.assertRaises(exceptions.ServiceUnavailable,
+                              session.post, self.TEST_URL)
+
+        self.assertFalse(m.called)
+        self.assertEqual(1, self.requests_mock.call_count)
+
+        self.stub_url('POST', response_list=[{'status_code': 429},
+                                             {'text': 'response'}])
+
+        with mock.patch('time.sleep') as m:
+            resp = session.post(self.TEST_URL)
+
+        self.assertEqual('response', resp.text)
+        self.assertEqual(1, m.call_count)
+
+    def test_retry_policy_deadline(self):
+        self.stub_url('GET', status_code=503, headers={'Retry-After': '30'})
+
+        policy = client_session.RetryPolicy(deadline=10)
+        session = client_session.Session(retry_policy=policy)
+
+        with mock.patch('time.sleep') as m:
+            self.assertRaises(exceptions.ServiceUnavailable,
+                              session.get, self.TEST_URL)
+
+        self.assertFalse(m.called)
+        self.assertEqual(1, self.requests_mock.call_count)
+
+    def test_retry_policy_per_request(self):
+        self.stub_url('GET', response_list=[{'status_code': 500},
+                                            {'text': 'response'}])
+
+        session = client_session.Session(
+            retry_policy=client_session.RetryPolicy())
+        policy = client_session.RetryPolicy(retry_statuses=[500],
+                                            jitter=False)
+
+        with mock.patch('time.sleep') as m:
+            resp = session.get(self.TEST_URL, retry_policy=policy)
+
+        self.assertEqual('response', resp.text)
+        m.assert_called_once_with(0.5)
+
+    def test_retry_policy_connection_errors(self):
+
+        def _connection_error(request, context):
+            raise requests.exceptions.ConnectionError()
+
+        self.stub_url('GET', text=_connection_error)
+
+        policy = client_session.RetryPolicy(max_attempts=3,
+                                            retry_connection_errors=False)
+        session = client_session.Session(retry_policy=policy)
+
+        self.assertRaises(exceptions.ConnectionRefused,
+                          session.get, self.TEST_URL)
+        self.assertEqual(1, self.requests_mock.call_count)
+
+    def test_connect_retries_metrics(self):
+
+        def _timeout_error(request, context):
+            raise requests.exceptions.Timeout()
+
+        self.stub_url('GET', text=_timeout_error)
+
+        collector = mock.Mock()
+        session = client_session.Session(collectors=[collector])
+
+        with mock.patch('time.sleep'):
+            self.assertRaises(exceptions.RequestTimeout,
+                              session.get,
+                              self.TEST_URL, connect_retries=2)
+
+        metrics = collector.record.call_args[0][0]
+        self.assertEqual(2, metrics.retries)
+        self.assertIsNone(metrics.status_code)
+        self.assertIsInstance(metrics.error, exceptions.RequestTimeout)
+        self.assertIn('retry_wait', metrics.timings)
+
+    def test_collectors(self):
+        collector = mock.Mock()
+        session = client_session.Session(collectors=[collector])
+        self.stub_url('POST', text='response')
+
+        session.post(self.TEST_URL, json={'hello': 'world'})
+
+        metrics = collector.record.call_args[0][0]
+        self.assertEqual('POST', metrics.method)
+        self.assertEqual(self.TEST_URL, metrics.url)
+        self.assertEqual(200, metrics.status_code)
+        self.assertEqual(len('{"hello": "world"}'), metrics.bytes_sent)
+        self.assertEqual(len('response'), metrics.bytes_received)
+        self.assertIsNone(metrics.error)
+        self.assertEqual({'encode', 'send', 'total'}, set(metrics.timings))
+
+    def test_collectors_streamed(self):
+        collector = mock.Mock()
+        session = client_session.Session(collectors=[collector])
+        self.stub_url('GET', text='response')
+
+        resp = session.get(self.TEST_URL, stream=True)
+
+        # the body is not read to measure it, the metrics wait for it
+        self.assertFalse(resp._content_consumed)
+        self.assertFalse(collector.record.called)
+
+        self.assertEqual('response', resp.text)
+        resp.close()
+        resp.close()
+
+        collector.record.assert_called_once_with(mock.ANY)
+        metrics = collector.record.call_args[0][0]
+        self.assertEqual(len('response'), metrics.bytes_received)
+        self.assertEqual(200, metrics.status_code)
+
+    def test_collectors_streamed_not_closed(self):
+        collector = mock.Mock()
+        session = client_session.Session(collectors=[collector])
+        self.stub_url('GET', text='response')
+
+        resp = session.get(self.TEST_URL, stream=True)
+        next(resp.iter_content(chunk_size=4))
+        del resp
+
+        metrics = collector.record.call_args[0][0]
+        self.assertEqual(4, metrics.bytes_received)
+
+    def test_bytes_read_without_transport_count(self):
+        # a transport that can't tell gives the announced size, if any
+        self.assertEqual(8, client_session.Session._bytes_read(
+            None, {'Content-Length': '8'}))
+        self.assertIsNone(client_session.Session._bytes_read(None, {}))
+
+    def test_collectors_error(self):
+        collector = mock.Mock()
+        session = client_session.Session(collectors=[collector])
+        self.stub_url('GET', status_code=500)
+
+        self.assertRaises(exceptions.InternalServerError,
+                          session.get, self.TEST_URL)
+
+        metrics = collector.record.call_args[0][0]
+        self.assertEqual(500, metrics.status_code)
+        self.assertIsInstance(metrics.error, exceptions.InternalServerError)
+
+    def test_failing_collector(self):
+        collector = mock.Mock()
+        collector.record.side_effect = RuntimeError()
+        session = client_session.Session(collectors=[collector])
+        self.stub_url('GET', text='response')
+
+        resp = session.get(self.TEST_URL)
+
+        self.assertEqual('response', resp.text)
+        self.assertIn('Failed to record the metrics', self.logger.output)
+
         session = client_session.Session()
         requests_session = session.session
         self.assertIsInstance(requests_session.adapters['http://'],
@@ -295,6 +512,56 @@ class SessionTests(utils.TestCase):
         client_session.Session(session=mock_session)
         self.assertFalse(mock_session.mount.called)
 
+    def test_pool_options(self):
+        session = client_session.Session(pool_connections=2, pool_maxsize=20,
+                                         pool_block=True)
+
+        for http_adapter in session.session.adapters.values():
+            poolmanager = http_adapter.poolmanager
+            self.assertEqual(2, poolmanager.pools._maxsize)
+            self.assertEqual(20, poolmanager.connection_pool_kw['maxsize'])
+            self.assertTrue(poolmanager.connection_pool_kw['block'])
+
+    def test_pool_stats(self):
+        session = client_session.Session(pool_maxsize=1)
+        http_adapter = session.session.adapters['http://']
+        pool = http_adapter.poolmanager.connection_from_url(self.TEST_URL)
+        host = '%s://%s:%s' % (pool.scheme, pool.host, pool.port)
+
+        conns = [pool._get_conn(), pool._get_conn()]
+        stats = session.pool_stats()
+        self.assertEqual(2, stats['in_use'])
+        self.assertEqual(2, stats['new_connections'])
+        self.assertEqual(0, stats['idle'])
+
+        # only one connection fits in the pool, the other is discarded
+        for conn in conns:
+            pool._put_conn(conn)
+
+        expected = {'in_use': 0, 'idle': 1, 'new_connections': 2,
+                    'discarded': 1}
+        stats = session.pool_stats()
+        self.assertEqual(expected, stats.pop('hosts')[host])
+        self.assertEqual(expected, stats)
+
+        pool._get_conn()
+        self.assertEqual(2, session.pool_stats()['new_connections'])
+
+    def test_pool_stats_unsupported(self):
+        with mock.patch.object(client_session, '_counting_pools_supported',
+                               return_value=False):
+            session = client_session.Session()
+
+        http_adapter = session.session.adapters['http://']
+        pool = http_adapter.poolmanager.connection_from_url(self.TEST_URL)
+        self.assertNotIsInstance(pool, client_session._CountingPoolMixin)
+
+        pool._put_conn(pool._get_conn())
+        stats = session.pool_stats()
+        self.assertEqual({}, stats.pop('hosts'))
+        self.assertEqual(dict.fromkeys(client_session._PoolStats.COUNTERS, 0),
+                         stats)
+
     def test_ssl_error_message(self):
         error = uuid.uuid4().hex
 
@@ -345,6 +612,185 @@ class SessionTests(utils.TestCase):
         self.assertEqual(1, logger.debug.call_count)
 
 
+class RetryPolicyTests(utils.TestCase):
+
+    def test_get_delay(self):
+        policy = client_session.RetryPolicy(max_attempts=4, backoff=1.0,
+                                            max_backoff=3.0, jitter=False)
+
+        self.assertEqual(1.0, policy.get_delay(0, 0))
+        self.assertEqual(2.0, policy.get_delay(1, 0))
+        self.assertEqual(3.0, policy.get_delay(2, 0))
+        self.assertIsNone(policy.get_delay(3, 0))
+
+    def test_get_delay_jitter(self):
+        policy = client_session.RetryPolicy(backoff=1.0)
+
+        with mock.patch('random.uniform', return_value=0.25) as m:
+            self.assertEqual(0.25, policy.get_delay(2, 0))
+
+        m.assert_called_once_with(0, 4.0)
+
+    def test_get_delay_retry_after_date(self):
+        policy = client_session.RetryPolicy()
+        retry_after = email.utils.formatdate(time.time() + 60, usegmt=True)
+        response = utils.test_response(status_code=503,
+                                       headers={'Retry-After': retry_after})
+
+        policy = client_session.RetryPolicy(max_backoff=120)
+        delay = policy.get_delay(0, 0, response=response)
+        self.assertThat(delay, matchers.GreaterThan(55))
+        self.assertThat(delay, matchers.LessThan(61))
+
+        # waiting as asked would go beyond the deadline
+        policy = client_session.RetryPolicy(max_backoff=120, deadline=30)
+        self.assertIsNone(policy.get_delay(0, 0, response=response))
+
+    def test_get_delay_retry_after_over_max_backoff(self):
+        policy = client_session.RetryPolicy(max_backoff=30)
+        response = utils.test_response(status_code=429,
+                                       headers={'Retry-After': '3600'})
+        self.assertIsNone(policy.get_delay(0, 0, response=response))
+
+        response = utils.test_response(status_code=429,
+                                       headers={'Retry-After': '30'})
+        self.assertEqual(30.0, policy.get_delay(0, 0, response=response))
+
+        policy = client_session.RetryPolicy(max_backoff=None)
+        response = utils.test_response(status_code=429,
+                                       headers={'Retry-After': '3600'})
+        self.assertEqual(3600.0, policy.get_delay(0, 0, response=response))
+
+    def test_get_delay_retry_methods(self):
+        policy = client_session.RetryPolicy(jitter=False)
+        unavailable = utils.test_response(status_code=503)
+        throttled = utils.test_response(status_code=429)
+        refused = exceptions.ConnectionRefused()
+        timeout = exceptions.RequestTimeout()
+
+        for method in ('GET', 'put', 'DELETE', 'HEAD'):
+            self.assertEqual(0.5, policy.get_delay(0, 0, method=method,
+                                                   response=unavailable))
+            self.assertEqual(0.5, policy.get_delay(0, 0, method=method,
+                                                   error=timeout))
+
+        # a POST or PATCH may have been processed already
+        for method in ('POST', 'PATCH'):
+            self.assertIsNone(policy.get_delay(0, 0, method=method,
+                                               response=unavailable))
+            self.assertIsNone(policy.get_delay(0, 0, method=method,
+                                               error=timeout))
+            self.assertEqual(0.5, policy.get_delay(0, 0, method=method,
+                                                   response=throttled))
+            self.assertEqual(0.5, policy.get_delay(0, 0, method=method,
+                                                   error=refused))
+
+        policy = client_session.RetryPolicy(jitter=False, retry_methods=None)
+        self.assertEqual(0.5, policy.get_delay(0, 0, method='POST',
+                                               response=unavailable))
+
+
+class CircuitBreakerTests(utils.TestCase):
+
+    TEST_URL = 'http://keystone.example.com:5000/v3'
+    OTHER_URL = 'http://keystone2.example.com:5000/v3'
+    HOST = 'http://keystone.example.com:5000'
+
+    def setUp(self):
+        super(CircuitBreakerTests, self).setUp()
+        self.deprecations.expect_deprecations()
+        self.time_fixture = self.useFixture(utils_fixture.TimeFixture())
+
+        self.breaker = client_session.CircuitBreaker(failure_threshold=2,
+                                                     reset_timeout=10)
+        self.session = client_session.Session(circuit_breaker=self.breaker)
+
+    def stub_failure(self):
+        def _connection_error(request, context):
+            raise requests.exceptions.ConnectionError()
+
+        self.stub_url('GET', text=_connection_error)
+
+    def open_circuit(self):
+        self.stub_failure()
+
+        for i in range(2):
+            self.assertRaises(exceptions.ConnectionRefused,
+                              self.session.get, self.TEST_URL)
+
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_opens_after_consecutive_failures(self):
+        self.assertEqual('closed', self.breaker.get_state(self.TEST_URL))
+        self.open_circuit()
+        self.assertEqual('open', self.breaker.get_state(self.TEST_URL))
+        self.assertEqual({self.HOST: 'open'}, self.breaker.states())
+
+        # requests fail without being sent
+        self.assertRaises(exceptions.ConnectionRefused,
+                          self.session.get, self.TEST_URL + '/users')
+        self.assertEqual(2, self.requests_mock.call_count)
+
+        # other hosts are not affected
+        self.stub_url('GET', base_url=self.OTHER_URL, text='response')
+        self.assertEqual('response', self.session.get(self.OTHER_URL).text)
+
+    def test_response_resets_failures(self):
+        self.stub_url('GET', response_list=[
+            {'exc': requests.exceptions.ConnectTimeout},
+            {'status_code': 500},
+            {'exc': requests.exceptions.ConnectTimeout},
+            {'text': 'response'}])
+
+        self.assertRaises(exceptions.RequestTimeout,
+                          self.session.get, self.TEST_URL)
+        self.assertRaises(exceptions.InternalServerError,
+                          self.session.get, self.TEST_URL)
+        self.assertRaises(exceptions.RequestTimeout,
+                          self.session.get, self.TEST_URL)
+
+        self.assertEqual('closed', self.breaker.get_state(self.TEST_URL))
+        self.assertEqual('response', self.session.get(self.TEST_URL).text)
+
+    def test_half_open_probe_closes(self):
+        self.open_circuit()
+        self.time_fixture.advance_time_seconds(11)
+        self.assertEqual('half-open', self.breaker.get_state(self.TEST_URL))
+
+        self.stub_url('GET', text='response')
+        self.assertEqual('response', self.session.get(self.TEST_URL).text)
+        self.assertEqual('closed', self.breaker.get_state(self.TEST_URL))
+        self.assertEqual({}, self.breaker.states())
+
+    def test_half_open_single_probe(self):
+        self.open_circuit()
+        self.time_fixture.advance_time_seconds(11)
+
+        # the first caller is let through as the probe, the others fail
+        self.breaker.before_request(self.TEST_URL)
+        self.assertRaises(exceptions.ConnectionRefused,
+                          self.breaker.before_request, self.TEST_URL)
+
+        # the probe fails and the circuit opens for another reset_timeout
+        self.breaker.record_failure(self.TEST_URL)
+        self.assertEqual('open', self.breaker.get_state(self.TEST_URL))
+        self.time_fixture.advance_time_seconds(5)
+        self.assertRaises(exceptions.ConnectionRefused,
+                          self.session.get, self.TEST_URL)
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_open_circuit_is_not_retried(self):
+        self.stub_failure()
+        breaker = client_session.CircuitBreaker(failure_threshold=1)
+        session = client_session.Session(circuit_breaker=breaker)
+
+        with mock.patch('time.sleep'):
+            self.assertRaises(exceptions.ConnectionRefused,
+                              session.get, self.TEST_URL, connect_retries=3)
+
+        self.assertEqual(1, self.requests_mock.call_count)
+
+
 class TCPKeepAliveAdapter(utils.TestCase):
 
     @mock.patch.object(client_session, 'socket')
@@ -451,7 +897,19 @@ class RedirectTests(utils.TestCase):
             self.assertEqual(resp.url, self.REDIRECT_CHAIN[i])
             self.assertEqual(resp.text, self.DEFAULT_REDIRECT_BODY)
 
-    def test_history_matches_requests(self):
+    def test_redirect_metrics(self):
+        collector = mock.Mock()
+        session = client_session.Session(redirect=True,
+                                         collectors=[collector])
+        self.setup_redirects()
+
+        session.get(self.REDIRECT_CHAIN[0])
+
+        metrics = collector.record.call_args[0][0]
+        self.assertEqual(len(self.REDIRECT_CHAIN) - 1, metrics.redirects)
+        self.assertEqual(200, metrics.status_code)
+        self.assertEqual(len(self.DEFAULT_RESP_BODY), metrics.bytes_received)
+
         self.setup_redirects(status_code=301)
         session = client_session.Session(redirect=True)
         req_resp = requests.get(self.REDIRECT_CHAIN[0],
@@ -565,6 +1023,14 @@ class CalledAuthPlugin(base.BaseAuthPlugin):
         return self._invalidate
 
 
+class MultiEndpointAuthPlugin(AuthPlugin):
+
+    ENDPOINTS = ['http://compute-a:2222/v1.0', 'http://compute-b:2222/v1.0']
+
+    def get_endpoints(self, session, **kwargs):
+        return list(self.ENDPOINTS)
+
+
 class SessionAuthTests(utils.TestCase):
 
     TEST_URL = 'http://127.0.0.1:5000/'
@@ -722,7 +1188,33 @@ class SessionAuthTests(utils.TestCase):
         self.assertEqual('Hello', resp.text)
         self.assertTrue(auth.invalidate_called)
 
-    def test_reauth_not_called(self):
+    def test_reauth_metrics(self):
+        collector = metrics.HistogramCollector()
+        sess = client_session.Session(auth=AuthPlugin(),
+                                      collectors=[collector])
+
+        self.stub_service_url(service_type='compute', interface='public',
+                              path='/',
+                              response_list=[{'status_code': 401},
+                                             {'text': 'Hello'}])
+
+        resp = sess.get('/', endpoint_filter={'service_type': 'compute',
+                                              'interface': 'public'})
+        self.assertEqual('Hello', resp.text)
+
+        snapshot = collector.snapshot()
+        counters = snapshot['counters'][('compute', 'public')]
+        self.assertEqual(1, counters['requests'])
+        self.assertEqual(1, counters['reauthentications'])
+        self.assertEqual({200: 1}, counters['status_codes'])
+
+        phases = set(phase for (st, iface, phase) in snapshot['histograms'])
+        self.assertEqual({'auth', 'endpoint', 'send', 'reauth', 'total'},
+                         phases)
+        self.assertIsNotNone(collector.percentile(99, phase='send',
+                                                  service_type='compute',
+                                                  interface='public'))
+
         auth = CalledAuthPlugin(invalidate=True)
         sess = client_session.Session(auth=auth)
 
@@ -775,6 +1267,87 @@ class SessionAuthTests(utils.TestCase):
         self.assertTrue(auth.get_token_called)
         self.assertFalse(auth.get_endpoint_called)
 
+    def test_endpoint_selector_spreads_requests(self):
+        auth = MultiEndpointAuthPlugin()
+        selector = endpoint_selection.RoundRobinSelector()
+        sess = client_session.Session(auth=auth, endpoint_selector=selector)
+
+        for endpoint in auth.ENDPOINTS:
+            self.requests_mock.get(endpoint + '/path', text=endpoint)
+
+        texts = [sess.get('path',
+                          endpoint_filter={'service_type': 'compute'}).text
+                 for i in range(4)]
+
+        self.assertEqual(auth.ENDPOINTS * 2, texts)
+
+    def test_endpoint_selector_fails_over(self):
+        auth = MultiEndpointAuthPlugin()
+        selector = endpoint_selection.LeastOutstandingSelector()
+        sess = client_session.Session(auth=auth, endpoint_selector=selector)
+        first, second = auth.ENDPOINTS
+
+        self.requests_mock.get(first + '/path',
+                               exc=requests.exceptions.ConnectionError())
+        self.requests_mock.get(second + '/path', text='ok')
+
+        resp = sess.get('path', endpoint_filter={'service_type': 'compute'})
+
+        self.assertEqual('ok', resp.text)
+        self.assertEqual(second + '/path', self.requests_mock.last_request.url)
+        self.assertEqual({}, selector._outstanding)
+
+    def test_endpoint_selector_all_endpoints_fail(self):
+        auth = MultiEndpointAuthPlugin()
+        selector = endpoint_selection.RoundRobinSelector()
+        sess = client_session.Session(auth=auth, endpoint_selector=selector)
+
+        for endpoint in auth.ENDPOINTS:
+            self.requests_mock.get(endpoint + '/path',
+                                   exc=requests.exceptions.ConnectionError())
+
+        self.assertRaises(exceptions.ConnectionRefused, sess.get, 'path',
+                          endpoint_filter={'service_type': 'compute'})
+        self.assertEqual(2, self.requests_mock.call_count)
+
+    def test_endpoint_selector_skips_open_circuit(self):
+        auth = MultiEndpointAuthPlugin()
+        selector = endpoint_selection.RoundRobinSelector()
+        breaker = client_session.CircuitBreaker(failure_threshold=1)
+        sess = client_session.Session(auth=auth, endpoint_selector=selector,
+                                      circuit_breaker=breaker)
+        first, second = auth.ENDPOINTS
+
+        self.requests_mock.get(first + '/path',
+                               exc=requests.exceptions.ConnectionError())
+        self.requests_mock.get(second + '/path', text='ok')
+
+        for i in range(4):
+            resp = sess.get('path',
+                            endpoint_filter={'service_type': 'compute'})
+            self.assertEqual('ok', resp.text)
+
+        # the first endpoint was only tried before its circuit opened
+        self.assertEqual(5, self.requests_mock.call_count)
+        self.assertEqual(client_session.CircuitBreaker.OPEN,
+                         breaker.get_state(first))
+
+    def test_endpoint_selector_single_endpoint(self):
+        auth = AuthPlugin()
+        selector = endpoint_selection.RoundRobinSelector()
+        sess = client_session.Session(auth=auth, endpoint_selector=selector)
+        url = auth.SERVICE_URLS['compute']['public'] + '/path'
+
+        self.requests_mock.get(url, text='ok')
+
+        resp = sess.get('path', endpoint_filter={'service_type': 'compute',
+                                                 'interface': 'public'})
+
+        self.assertEqual('ok', resp.text)
+        self.assertEqual([auth.SERVICE_URLS['compute']['public']],
+                         sess.get_endpoints(service_type='compute',
+                                            interface='public'))
+
     def test_user_and_project_id(self):
         auth = AuthPlugin()
         sess = client_session.Session(auth=auth)
@@ -888,6 +1461,26 @@ class AdapterTest(utils.TestCase):
         self.assertEqual(resp.text, response)
         self.assertEqual(val, body[key])
 
+    def test_legacy_request_items(self):
+        key = uuid.uuid4().hex
+        items = [{'id': uuid.uuid4().hex} for i in range(3)]
+        links = {'next': None}
+
+        self.stub_url('GET', json={key: items, 'links': links})
+
+        auth = CalledAuthPlugin()
+        sess = client_session.Session(auth=auth)
+        adpt = adapter.LegacyJsonAdapter(sess,
+                                         service_type=self.SERVICE_TYPE,
+                                         user_agent=self.USER_AGENT)
+
+        resp, reader = adpt.request_items('/', 'GET', key, chunk_size=8)
+        self.assertEqual(self.SERVICE_TYPE,
+                         auth.endpoint_arguments['service_type'])
+        self.assertEqual(items, list(reader))
+        self.assertEqual({'links': links}, reader.body)
+        self.assertRequestHeaderEqual('Accept', 'application/json')
+
     def test_legacy_binding_non_json_resp(self):
         response = uuid.uuid4().hex
         self.stub_url('GET', text=response,
@@ -1009,6 +1602,351 @@ class AdapterTest(utils.TestCase):
         self.assertNotIn(list(response.values())[0], self.logger.output)
 
 
+class AsyncServer(object):
+    """An HTTP server on the running event loop for the async tests.
+
+    Each response is a tuple of the status, headers and body to send, the
+    last one is repeated. Every response is held for delay seconds.
+    """
+
+    def __init__(self, *responses, delay=0):
+        self.responses = list(responses) or [(200, {}, b'')]
+        self.delay = delay
+        self.requests = []
+        self.connections = 0
+        self._writers = []
+        self._handlers = []
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1',
+                                                  0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = 'http://127.0.0.1:%d/' % port
+        return self
+
+    async def __aexit__(self, *args):
+        self._server.close()
+        for writer in self._writers:
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.append(writer)
+        self._handlers.append(asyncio.current_task())
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+
+                method, path, version = line.decode().split(' ')
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line == b'\r\n':
+                        break
+                    name, value = line.decode().split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length)
+                self.requests.append((method, path, headers, body))
+
+                if len(self.responses) > 1:
+                    status, resp_headers, resp_body = self.responses.pop(0)
+                else:
+                    status, resp_headers, resp_body = self.responses[0]
+
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+
+                resp_headers = dict(resp_headers)
+                if 'Transfer-Encoding' not in resp_headers:
+                    resp_headers['Content-Length'] = str(len(resp_body))
+                lines = ['HTTP/1.1 %d Status' % status]
+                lines.extend('%s: %s' % h for h in resp_headers.items())
+                head = '\r\n'.join(lines) + '\r\n\r\n'
+                writer.write(head.encode() + resp_body)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class AsyncSessionTests(utils.TestCase):
+
+    def setUp(self):
+        super(AsyncSessionTests, self).setUp()
+        self.deprecations.expect_deprecations()
+        # the requests go to a real server on the event loop
+        self.requests_mock.register_uri(requests_mock.ANY, requests_mock.ANY,
+                                        real_http=True)
+
+    def _create_session(self, auth=None, **kwargs):
+        sess = client_session.AsyncSession(
+            client_session.Session(auth=auth, **kwargs))
+        self.addCleanup(sess.close)
+        return sess
+
+    def test_methods(self):
+        sess = self._create_session()
+
+        async def run():
+            async with AsyncServer() as server:
+                for method in ['get', 'head', 'post', 'put', 'patch',
+                               'delete']:
+                    resp = await getattr(sess, method)(server.url)
+                    self.assertTrue(resp.ok)
+                    self.assertEqual(method.upper(), server.requests[-1][0])
+
+                # all the requests were sent on the same connection
+                self.assertEqual(1, server.connections)
+
+        asyncio.run(run())
+
+    def test_json(self):
+        sess = self._create_session()
+        body = jsonutils.dumps({'hello': 'world'}).encode()
+
+        async def run():
+            async with AsyncServer((200, {'Content-Type': 'application/json'},
+                                    body)) as server:
+                resp = await sess.post(server.url, json={'a': 1},
+                                       params={'b': 2})
+                return resp, server.requests[-1]
+
+        resp, (method, path, headers, data) = asyncio.run(run())
+
+        self.assertEqual({'hello': 'world'}, resp.json())
+        self.assertEqual('/?b=2', path)
+        self.assertEqual('application/json', headers['content-type'])
+        self.assertEqual({'a': 1}, jsonutils.loads(data))
+        self.assertEqual(client_session.USER_AGENT, headers['user-agent'])
+
+    def test_many_requests(self):
+        sess = self._create_session(auth=AuthPlugin())
+
+        async def run():
+            async with AsyncServer((200, {}, b'hello'),
+                                   delay=0.05) as server:
+                responses = await asyncio.gather(*[sess.get(server.url)
+                                                   for i in range(10)])
+                return responses, server
+
+        responses, server = asyncio.run(run())
+
+        self.assertEqual(['hello'] * 10, [r.text for r in responses])
+        self.assertThat(server.requests, matchers.HasLength(10))
+        for method, path, headers, body in server.requests:
+            self.assertEqual(AuthPlugin.TEST_TOKEN, headers['x-auth-token'])
+        # the requests were in flight at the same time
+        self.assertGreater(server.connections, 1)
+
+    def test_chunked_response(self):
+        sess = self._create_session()
+        body = b'5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n'
+
+        async def run():
+            async with AsyncServer((200, {'Transfer-Encoding': 'chunked'},
+                                    body)) as server:
+                first = await sess.get(server.url)
+                second = await sess.get(server.url)
+                return first, second, server.connections
+
+        first, second, connections = asyncio.run(run())
+
+        self.assertEqual('hello world', first.text)
+        self.assertEqual('hello world', second.text)
+        self.assertEqual(1, connections)
+
+    def test_redirect(self):
+        sess = self._create_session()
+
+        async def run():
+            async with AsyncServer() as server:
+                server.responses = [(302, {'Location': server.url + 'b'}, b''),
+                                    (200, {}, b'done')]
+                resp = await sess.get(server.url + 'a')
+                return resp, [r[1] for r in server.requests]
+
+        resp, paths = asyncio.run(run())
+
+        self.assertEqual('done', resp.text)
+        self.assertEqual(['/a', '/b'], paths)
+        self.assertThat(resp.history, matchers.HasLength(1))
+
+    def test_reauth_called(self):
+        auth = CalledAuthPlugin(invalidate=True)
+        sess = self._create_session(auth=auth)
+
+        async def run():
+            async with AsyncServer((401, {}, b'Failed'),
+                                   (200, {}, b'Hello')) as server:
+                return await sess.get(server.url, authenticated=True)
+
+        resp = asyncio.run(run())
+
+        self.assertEqual('Hello', resp.text)
+        self.assertTrue(auth.invalidate_called)
+
+    def test_raises_exc(self):
+        sess = self._create_session()
+
+        async def run():
+            async with AsyncServer((404, {}, b'')) as server:
+                await sess.get(server.url)
+
+        self.assertRaises(exceptions.NotFound, asyncio.run, run())
+
+    def test_connection_refused(self):
+        sess = self._create_session()
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        url = 'http://127.0.0.1:%d/' % sock.getsockname()[1]
+        sock.close()
+
+        self.assertRaises(exceptions.ConnectionRefused,
+                          asyncio.run, sess.get(url))
+
+    def test_timeout(self):
+        sess = self._create_session(timeout=0.05)
+
+        async def run():
+            async with AsyncServer(delay=1) as server:
+                await sess.get(server.url)
+
+        self.assertRaises(exceptions.RequestTimeout, asyncio.run, run())
+
+    def test_requests_session_settings(self):
+        sess = self._create_session()
+        sess.session.session.headers['X-Default'] = 'default'
+        sess.session.session.cookies.set('name', 'value')
+
+        async def run():
+            async with AsyncServer() as server:
+                await sess.get(server.url)
+                return server.requests[-1]
+
+        method, path, headers, body = asyncio.run(run())
+
+        self.assertEqual('default', headers['x-default'])
+        self.assertEqual('name=value', headers['cookie'])
+
+    def test_auth_plugin_called_from_pool(self):
+        threads = []
+
+        class ThreadAuthPlugin(AuthPlugin):
+
+            def get_token(self, session):
+                threads.append(threading.current_thread())
+                return super(ThreadAuthPlugin, self).get_token(session)
+
+        sess = self._create_session(auth=ThreadAuthPlugin())
+
+        async def run():
+            async with AsyncServer() as server:
+                await sess.get(server.url)
+
+        asyncio.run(run())
+
+        self.assertThat(threads, matchers.HasLength(1))
+        self.assertIsNot(threading.main_thread(), threads[0])
+
+    def test_endpoint_selector_fails_over(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        refused = 'http://127.0.0.1:%d/v1.0' % sock.getsockname()[1]
+        sock.close()
+
+        async def run():
+            async with AsyncServer((200, {}, b'ok')) as server:
+                auth = MultiEndpointAuthPlugin()
+                auth.ENDPOINTS = [refused, server.url + 'v1.0']
+                selector = endpoint_selection.LeastOutstandingSelector()
+                sess = self._create_session(auth=auth,
+                                            endpoint_selector=selector)
+                resp = await sess.get(
+                    'path', endpoint_filter={'service_type': 'compute'})
+                return resp, server.requests, selector
+
+        resp, requests, selector = asyncio.run(run())
+
+        self.assertEqual('ok', resp.text)
+        self.assertEqual(['/v1.0/path'], [r[1] for r in requests])
+        self.assertEqual({}, selector._outstanding)
+
+    def test_run_sync(self):
+        sess = self._create_session()
+
+        result = asyncio.run(sess.run_sync(dict, a=1))
+        self.assertEqual({'a': 1}, result)
+
+    def test_auth_methods(self):
+        auth = AuthPlugin()
+        sess = self._create_session(auth=auth)
+
+        self.assertEqual(auth.TEST_TOKEN, asyncio.run(sess.get_token()))
+        self.assertEqual(auth.TEST_USER_ID, asyncio.run(sess.get_user_id()))
+        self.assertEqual(auth.TEST_PROJECT_ID,
+                         asyncio.run(sess.get_project_id()))
+        self.assertEqual(AuthPlugin.SERVICE_URLS['compute']['public'],
+                         asyncio.run(sess.get_endpoint(service_type='compute',
+                                                       interface='public')))
+
+
+class AsyncAdapterTest(utils.TestCase):
+
+    SERVICE_TYPE = uuid.uuid4().hex
+    USER_AGENT = uuid.uuid4().hex
+
+    def setUp(self):
+        super(AsyncAdapterTest, self).setUp()
+        self.deprecations.expect_deprecations()
+        self.requests_mock.register_uri(requests_mock.ANY, requests_mock.ANY,
+                                        real_http=True)
+
+        self.auth = CalledAuthPlugin()
+        sess = client_session.AsyncSession(client_session.Session())
+        self.addCleanup(sess.close)
+        self.adpt = adapter.AsyncAdapter(sess,
+                                         auth=self.auth,
+                                         service_type=self.SERVICE_TYPE,
+                                         user_agent=self.USER_AGENT)
+
+    def test_setting_variables_on_request(self):
+        response = uuid.uuid4().hex
+
+        async def run():
+            async with AsyncServer((200, {}, response.encode())) as server:
+                self.auth.ENDPOINT = server.url
+                resp = await self.adpt.get('/path')
+                return resp, server.requests[-1]
+
+        resp, (method, path, headers, body) = asyncio.run(run())
+
+        self.assertEqual(response, resp.text)
+        self.assertEqual('/path', path)
+        self.assertEqual(self.SERVICE_TYPE,
+                         self.auth.endpoint_arguments['service_type'])
+        self.assertTrue(self.auth.get_token_called)
+        self.assertEqual(self.USER_AGENT, headers['user-agent'])
+
+    def test_get_endpoint(self):
+        url = asyncio.run(self.adpt.get_endpoint())
+
+        self.assertEqual(CalledAuthPlugin.ENDPOINT, url)
+        self.assertEqual(self.SERVICE_TYPE,
+                         self.auth.endpoint_arguments['service_type'])
+
+    def test_get_token_and_invalidate(self):
+        self.assertEqual(self.TEST_TOKEN, asyncio.run(self.adpt.get_token()))
+        self.assertTrue(asyncio.run(self.adpt.invalidate()))
+        self.assertTrue(self.auth.invalidate_called)
+
+
 class ConfLoadingTests(utils.TestCase):
 
     GROUP = 'sessiongroup'
@@ -1038,6 +1976,15 @@ class ConfLoadingTests(utils.TestCase):
         self.assertFalse(s.verify)
         self.assertEqual(5, s.timeout)
 
+    def test_pool_options(self):
+        self.config(pool_connections=2, pool_maxsize=20, pool_block=True)
+        s = self.get_session()
+
+        poolmanager = s.session.adapters['https://'].poolmanager
+        self.assertEqual(2, poolmanager.pools._maxsize)
+        self.assertEqual(20, poolmanager.connection_pool_kw['maxsize'])
+        self.assertTrue(poolmanager.connection_pool_kw['block'])
+
     def test_client_certs(self):
         cert = '/path/to/certfile'
         key = '/path/to/keyfile'
@@ -1060,7 +2007,8 @@ class ConfLoadingTests(utils.TestCase):
         def new_deprecated():
             return cfg.DeprecatedOpt(uuid.uuid4().hex, group=uuid.uuid4().hex)
 
-        opt_names = ['cafile', 'certfile', 'keyfile', 'insecure', 'timeout']
+        opt_names = ['cafile', 'certfile', 'keyfile', 'insecure', 'timeout',
+                     'pool_connections', 'pool_maxsize', 'pool_block']
         depr = dict([(n, [new_deprecated()]) for n in opt_names])
         opts = client_session.Session.get_conf_options(deprecated_opts=depr)
 
@@ -1088,6 +2036,15 @@ class CliLoadingTests(utils.TestCase):
         self.assertFalse(s.verify)
         self.assertEqual(5.5, s.timeout)
 
+    def test_pool_options(self):
+        s = self.get_session('--pool-connections 2 --pool-maxsize 20 '
+                             '--pool-block')
+
+        poolmanager = s.session.adapters['https://'].poolmanager
+        self.assertEqual(2, poolmanager.pools._maxsize)
+        self.assertEqual(20, poolmanager.connection_pool_kw['maxsize'])
+        self.assertTrue(poolmanager.connection_pool_kw['block'])
+
     def test_client_certs(self):
         cert = '/path/to/certfile'
         key = '/path/to/keyfile'
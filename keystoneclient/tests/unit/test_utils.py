@@ -11,6 +11,7 @@
 #    under the License.
 
 from keystoneauth1 import exceptions as ksa_exceptions
+from oslo_serialization import jsonutils
 import testresources
 from testtools import matchers
 
@@ -97,6 +98,109 @@ class FindResourceTestCase(test_utils.TestCase):
                           9999)
 
 
+class MapConcurrentlyTestCase(test_utils.TestCase):
+
+    def test_results_in_order(self):
+        def func(item):
+            if item == 3:
+                raise ValueError(item)
+            return item * 2
+
+        results = utils.map_concurrently(func, range(6), max_workers=2)
+
+        self.assertEqual([0, 2, 4], results[:3])
+        self.assertIsInstance(results[3], ValueError)
+        self.assertEqual([8, 10], results[4:])
+
+    def test_empty(self):
+        self.assertEqual([], utils.map_concurrently(str, []))
+
+    def test_consumes_items_lazily(self):
+        consumed = []
+
+        def items():
+            for i in range(10):
+                consumed.append(i)
+                yield i
+
+        seen = {}
+
+        def func(item):
+            seen[item] = len(consumed)
+            return item
+
+        results = utils.map_concurrently(func, items(), max_workers=2)
+
+        self.assertEqual(list(range(10)), results)
+        self.assertLessEqual(seen[0], 3)
+
+
+class JsonCollectionReaderTestCase(test_utils.TestCase):
+
+    def chunks(self, doc, size=3):
+        data = jsonutils.dump_as_bytes(doc)
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_items_and_body(self):
+        items = [{'id': i, 'name': u'\u2603 %d' % i, 'ratio': 1.5e10}
+                 for i in range(20)]
+        doc = {'links': {'next': 'http://x/?page=2'}, 'users': items,
+               'truncated': False}
+
+        reader = utils.JsonCollectionReader(self.chunks(doc), 'users')
+
+        self.assertEqual(items[0], next(reader))
+        self.assertEqual(items[1:], list(reader))
+        self.assertEqual({'links': doc['links'], 'truncated': False},
+                         reader.body)
+
+    def test_values_form(self):
+        items = [{'id': 1}, {'id': 2}]
+        doc = {'users': {'links': {}, 'values': items}}
+
+        reader = utils.JsonCollectionReader(self.chunks(doc, size=1),
+                                            'users')
+
+        self.assertEqual(items, list(reader))
+
+    def test_empty_and_closed(self):
+        closed = []
+        reader = utils.JsonCollectionReader([b'{"users": []}'], 'users',
+                                            close=lambda: closed.append(1))
+
+        self.assertEqual([], list(reader))
+        self.assertEqual([1], closed)
+
+    def test_closed_before_reading(self):
+        closed = []
+        reader = utils.JsonCollectionReader([b'{"users": [1, 2]}'], 'users',
+                                            close=lambda: closed.append(1))
+
+        reader.close()
+        reader.close()
+        self.assertEqual([1], closed)
+        self.assertRaises(StopIteration, next, reader)
+
+    def test_context_manager(self):
+        closed = []
+        reader = utils.JsonCollectionReader([b'{"users": [1, 2]}'], 'users',
+                                            close=lambda: closed.append(1))
+
+        with reader:
+            self.assertEqual(1, next(reader))
+            self.assertEqual([], closed)
+
+        self.assertEqual([1], closed)
+
+    def test_number_split_across_chunks(self):
+        reader = utils.JsonCollectionReader([b'{"a": [12', b'34]}'], 'a')
+        self.assertEqual([1234], list(reader))
+
+    def test_truncated(self):
+        reader = utils.JsonCollectionReader([b'{"a": [1, 2'], 'a')
+        self.assertRaises(ValueError, list, reader)
+
+
 class FakeObject(object):
     def __init__(self, name):
         self.name = name
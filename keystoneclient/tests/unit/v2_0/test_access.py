@@ -181,6 +181,27 @@ class AccessInfoTest(utils.TestCase, testresources.ResourcedTestCase):
 
         self.assertEqual(trust_id, token['access']['trust']['id'])
 
+    def test_properties_cached_until_modified(self):
+        token = fixture.V2Token()
+        token.set_scope()
+        token.add_role(name='admin')
+
+        auth_ref = access.AccessInfo.factory(body=token)
+
+        self.assertEqual(['admin'], auth_ref.role_names)
+        self.assertTrue(auth_ref.project_scoped)
+        self.assertFalse(auth_ref.will_expire_soon())
+
+        expires = timeutils.utcnow() + datetime.timedelta(seconds=10)
+        auth_ref['token'] = dict(auth_ref['token'],
+                                 expires=expires.isoformat())
+        self.assertTrue(auth_ref.will_expire_soon())
+
+        del auth_ref['token']['tenant']
+        auth_ref.update(user=dict(auth_ref['user'], roles=[]))
+        self.assertEqual([], auth_ref.role_names)
+        self.assertFalse(auth_ref.project_scoped)
+
     def test_override_auth_token(self):
         token = fixture.V2Token()
         token.set_scope()
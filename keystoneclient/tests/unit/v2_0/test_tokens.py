@@ -16,6 +16,7 @@ from keystoneauth1 import exceptions
 from keystoneauth1 import fixture
 
 from keystoneclient import access
+from keystoneclient import cache
 from keystoneclient.tests.unit.v2_0 import utils
 from keystoneclient.v2_0 import client
 from keystoneclient.v2_0 import tokens
@@ -178,6 +179,48 @@ class TokenTests(utils.ClientTestCase):
         self.assertIsInstance(token_ref, tokens.Token)
         self.assertEqual(id_, token_ref.id)
 
+    def test_validate_token_cached(self):
+        id_ = uuid.uuid4().hex
+        token_fixture = fixture.V2Token(token_id=id_)
+        m = self.stub_url('GET', ['tokens', id_], json=token_fixture)
+        self.stub_url('DELETE', ['tokens', id_], status_code=204)
+
+        self.client.tokens.cache = cache.MemoryCache()
+
+        token_ref = self.client.tokens.validate(id_)
+        self.assertIsInstance(token_ref, tokens.Token)
+        self.assertEqual(id_, token_ref.id)
+
+        access_info = self.client.tokens.validate_access_info(id_)
+        self.assertEqual(id_, access_info.auth_token)
+        self.assertEqual(1, m.call_count)
+
+        self.client.tokens.delete(id_)
+        self.assertEqual(0, len(self.client.tokens.cache))
+
+        self.client.tokens.validate(id_)
+        self.assertEqual(2, m.call_count)
+
+    def test_validate_token_cache_purged_after_delete(self):
+        id_ = uuid.uuid4().hex
+        token_fixture = fixture.V2Token(token_id=id_)
+        m = self.stub_url('GET', ['tokens', id_], json=token_fixture)
+
+        def delete(request, context):
+            # a validation that completes before the server deletes the token
+            self.client.tokens.validate(id_)
+            context.status_code = 204
+
+        self.stub_url('DELETE', ['tokens', id_], text=delete)
+
+        self.client.tokens.cache = cache.MemoryCache()
+
+        self.client.tokens.delete(id_)
+        self.assertEqual(0, len(self.client.tokens.cache))
+
+        self.client.tokens.validate(id_)
+        self.assertEqual(2, m.call_count)
+
     def test_validate_token_invalid_token(self):
         # If the token is invalid, typically a NotFound is raised.
 
@@ -203,6 +203,33 @@ class AccessInfoTest(utils.TestCase):
                                              auth_token=new_auth_token)
         self.assertEqual(new_auth_token, auth_ref.auth_token)
 
+    def test_properties_cached_until_modified(self):
+        token = fixture.V3Token()
+        token.set_project_scope()
+        token.add_role(name='admin')
+
+        auth_ref = access.AccessInfo.factory(body=token)
+        expires = auth_ref.expires
+
+        self.assertIs(expires, auth_ref.expires)
+        self.assertEqual(['admin'], auth_ref.role_names)
+
+        # the returned list is a copy and doesn't alter the cached value
+        auth_ref.role_names.append('member')
+        self.assertEqual(['admin'], auth_ref.role_names)
+
+        new_expires = timeutils.utcnow() + datetime.timedelta(hours=2)
+        auth_ref['expires_at'] = new_expires.isoformat()
+        self.assertEqual(timeutils.normalize_time(new_expires),
+                         timeutils.normalize_time(auth_ref.expires))
+
+        auth_ref['roles'] = [{'id': uuid.uuid4().hex, 'name': 'member'}]
+        self.assertEqual(['member'], auth_ref.role_names)
+
+        auth_ref.pop('project')
+        self.assertFalse(auth_ref.project_scoped)
+        self.assertIsNone(auth_ref.project_id)
+
     def test_federated_property_standard_token(self):
         """Check if is_federated property returns expected value."""
         token = fixture.V3Token()
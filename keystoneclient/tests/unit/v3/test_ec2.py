@@ -99,6 +99,21 @@ class EC2Tests(utils.ClientTestCase):
         self.assertEqual(cred.access, 'access')
         self.assertEqual(cred.secret, 'secret')
 
+    def test_find(self):
+        user_id = 'usr'
+        resp_body = {
+            "credentials": [
+                {"access": "access", "secret": "secret"},
+                {"access": "another", "secret": "key"},
+            ]
+        }
+        self.stub_url('GET', ['users', user_id, 'credentials',
+                              'OS-EC2'], json=resp_body)
+
+        cred = self.client.ec2.find(user_id=user_id, access='another')
+        self.assertIsInstance(cred, ec2.EC2)
+        self.assertEqual(cred.secret, 'key')
+
     def test_delete(self):
         user_id = 'usr'
         access = 'access'
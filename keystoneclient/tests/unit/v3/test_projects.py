@@ -14,9 +14,13 @@ import fixtures
 import uuid
 
 from keystoneauth1 import exceptions as ksa_exceptions
+from oslo_utils import fixture
 
+from keystoneclient import base
+from keystoneclient import cache
 from keystoneclient import exceptions as ksc_exceptions
 from keystoneclient.tests.unit.v3 import utils
+from keystoneclient import utils as client_utils
 from keystoneclient.v3 import projects
 
 
@@ -63,6 +67,219 @@ class ProjectTests(utils.ClientTestCase, utils.CrudTests):
 
         self.assertQueryStringIs('domain_id=%s' % domain_id)
 
+    def test_list_projects_stream(self):
+        ref_list = [self.new_ref(), self.new_ref()]
+        domain_id = uuid.uuid4().hex
+
+        self.stub_entity('GET', [self.collection_key], entity=ref_list)
+
+        returned_list = list(self.manager.list(domain=domain_id, stream=True))
+        self.assertEqual(len(ref_list), len(returned_list))
+        [self.assertIsInstance(r, self.model) for r in returned_list]
+        [self.assertEqual([], r.tags) for r in returned_list]
+
+        self.assertQueryStringIs('domain_id=%s' % domain_id)
+
+    def _tree_refs(self, domain_id):
+        root = self.new_ref(domain_id=domain_id, parent_id=domain_id)
+        child = self.new_ref(domain_id=domain_id, parent_id=root['id'])
+        grandchild = self.new_ref(domain_id=domain_id,
+                                  parent_id=child['id'])
+        other = self.new_ref(domain_id=domain_id, parent_id=domain_id)
+        return [grandchild, root, other, child]
+
+    def test_tree(self):
+        domain_id = uuid.uuid4().hex
+        grandchild, root, other, child = self._tree_refs(domain_id)
+        self.stub_entity('GET', [self.collection_key],
+                         entity=[grandchild, root, other, child])
+
+        tree = self.manager.tree(domain=domain_id)
+
+        self.assertQueryStringIs('domain_id=%s' % domain_id)
+        self.assertEqual(4, len(tree))
+        self.assertIn(child['id'], tree)
+        self.assertEqual(sorted([root['id'], other['id']]),
+                         [p.id for p in tree.roots()])
+        self.assertEqual([child['id'], root['id']],
+                         [p.id for p in tree.ancestors(grandchild['id'])])
+        self.assertEqual(2, tree.depth(grandchild['id']))
+        self.assertEqual(0, tree.depth(root['id']))
+        self.assertIsNone(tree.parent(root['id']))
+        self.assertEqual(root['id'], tree.parent(child['id']).id)
+        self.assertEqual([child['id']],
+                         [p.id for p in tree.children(root['id'])])
+        self.assertEqual([child['id'], grandchild['id']],
+                         [p.id for p in tree.descendants(root['id'])])
+        self.assertEqual([child['id']],
+                         [p.id for p in tree.descendants(root['id'],
+                                                         max_depth=1)])
+        self.assertRaises(ksa_exceptions.NotFound,
+                          tree.ancestors, uuid.uuid4().hex)
+
+    def test_tree_cycle(self):
+        first_id = uuid.uuid4().hex
+        second_id = uuid.uuid4().hex
+        self.stub_entity('GET', [self.collection_key], entity=[
+            self.new_ref(id=first_id, parent_id=second_id),
+            self.new_ref(id=second_id, parent_id=first_id)])
+
+        tree = self.manager.tree()
+
+        self.assertEqual([], tree.roots())
+        self.assertEqual([second_id], [p.id for p in tree.ancestors(first_id)])
+        self.assertEqual([first_id], [p.id for p in tree.ancestors(second_id)])
+
+    def test_tree_refresh(self):
+        domain_id = uuid.uuid4().hex
+        grandchild, root, other, child = self._tree_refs(domain_id)
+        moved = dict(child, parent_id=other['id'])
+        renamed = dict(grandchild, name=uuid.uuid4().hex)
+        url = self.TEST_URL + '/' + self.collection_key
+        self.requests_mock.get(url, [
+            {'json': {self.collection_key: [grandchild, root, other,
+                                            child]}},
+            {'json': {self.collection_key: [renamed, other, moved]}}])
+        time_fixture = self.useFixture(fixture.TimeFixture())
+
+        tree = self.manager.tree(domain=domain_id, refresh_interval=60)
+        requests = len(self.requests_mock.request_history)
+        self.assertEqual(2, tree.depth(grandchild['id']))
+        self.assertEqual(requests, len(self.requests_mock.request_history))
+
+        time_fixture.advance_time_seconds(61)
+        self.assertEqual([child['id'], other['id']],
+                         [p.id for p in tree.ancestors(grandchild['id'])])
+        self.assertEqual(renamed['name'], tree.get(grandchild['id']).name)
+        self.assertNotIn(root['id'], tree)
+        self.assertEqual(requests + 1,
+                         len(self.requests_mock.request_history))
+
+        self.assertEqual((0, 0, 0), tree.refresh())
+
+    def test_tree_refresh_does_not_block_readers(self):
+        domain_id = uuid.uuid4().hex
+        grandchild, root, other, child = self._tree_refs(domain_id)
+        self.stub_entity('GET', [self.collection_key],
+                         entity=[grandchild, root, other, child])
+        time_fixture = self.useFixture(fixture.TimeFixture())
+
+        tree = self.manager.tree(domain=domain_id, refresh_interval=60)
+        self.assertEqual(4, len(tree))
+        requests = len(self.requests_mock.request_history)
+
+        # while another thread is reloading the tree the previous one is used
+        time_fixture.advance_time_seconds(61)
+        with tree._refresh_lock:
+            self.assertEqual(2, tree.depth(grandchild['id']))
+            self.assertEqual(4, len(tree))
+        self.assertEqual(requests, len(self.requests_mock.request_history))
+
+        self.assertEqual(2, tree.depth(grandchild['id']))
+        self.assertEqual(requests + 1,
+                         len(self.requests_mock.request_history))
+
+    def test_list_projects_compact(self):
+        ref_list = [self.new_ref(), self.new_ref(tags=['a'])]
+        self.stub_entity('GET', [self.collection_key], entity=ref_list)
+
+        self.manager.compact_resources = True
+        returned_list = self.manager.list()
+
+        [self.assertIsInstance(r, self.model) for r in returned_list]
+        [self.assertIsInstance(r, base.CompactResource)
+         for r in returned_list]
+        self.assertEqual([[], ['a']], [r.tags for r in returned_list])
+        self.assertEqual(ref_list[1], returned_list[1].to_dict())
+
+    def test_find_resource_cached(self):
+        self.manager.client.resolution_cache = cache.MemoryCache()
+        ref = self.new_ref()
+        self.stub_entity('GET', id=ref['name'], status_code=404)
+        find = self.stub_entity('GET', entity=[ref])
+
+        for name_or_id in (ref['name'], ref['name'], ref['id']):
+            returned = client_utils.find_resource(self.manager, name_or_id)
+            self.assertIsInstance(returned, self.model)
+            self.assertEqual(ref['id'], returned.id)
+
+        self.assertEqual(1, find.call_count)
+
+    def test_list_populates_resolution_cache(self):
+        self.manager.client.resolution_cache = cache.MemoryCache()
+        unique = self.new_ref()
+        same = [self.new_ref(name='dup'), self.new_ref(name='dup')]
+        self.stub_entity('GET', entity=[unique] + same)
+
+        self.manager.list()
+        requests = len(self.requests_mock.request_history)
+
+        for name_or_id in (unique['name'], unique['id'], same[0]['id']):
+            client_utils.find_resource(self.manager, name_or_id)
+        self.assertEqual(requests, len(self.requests_mock.request_history))
+
+        self.stub_entity('GET', id='dup', status_code=404)
+        self.assertRaises(ksc_exceptions.CommandError,
+                          client_utils.find_resource, self.manager, 'dup')
+
+    def test_filtered_list_only_caches_ids(self):
+        self.manager.client.resolution_cache = cache.MemoryCache()
+        ref = self.new_ref()
+        self.stub_entity('GET', entity=[ref])
+
+        self.manager.list(domain=ref['domain_id'])
+        self.assertIsNone(self.manager._get_resolution(ref['name']))
+        self.assertEqual(ref['id'],
+                         self.manager._get_resolution(ref['id']).id)
+
+    def test_update_clears_resolution_cache(self):
+        self.manager.client.resolution_cache = cache.MemoryCache()
+        ref = self.new_ref()
+        self.stub_entity('GET', entity=[ref])
+        self.stub_entity('PATCH', id=ref['id'], entity=ref)
+
+        self.manager.list()
+        self.manager.update(ref['id'], name=uuid.uuid4().hex)
+
+        self.assertIsNone(self.manager._get_resolution(ref['name']))
+        self.assertIsNone(self.manager._get_resolution(ref['id']))
+
+    def test_write_only_clears_affected_resolutions(self):
+        self.manager.client.resolution_cache = cache.MemoryCache()
+        ref, other = self.new_ref(), self.new_ref()
+        created = self.new_ref(name=other['name'])
+        self.stub_entity('GET', entity=[ref, other])
+        self.stub_entity('DELETE', id=ref['id'], status_code=204)
+        self.stub_entity('POST', entity=created, status_code=201)
+
+        self.manager.list()
+        self.manager.delete(ref['id'])
+
+        self.assertIsNone(self.manager._get_resolution(ref['name']))
+        self.assertIsNone(self.manager._get_resolution(ref['id']))
+        self.assertEqual(other['id'],
+                         self.manager._get_resolution(other['name']).id)
+
+        # the name of the new project is no longer unique
+        self.manager.create(name=created['name'],
+                            domain=created['domain_id'])
+        self.assertIsNone(self.manager._get_resolution(other['name']))
+        self.assertEqual(other['id'],
+                         self.manager._get_resolution(other['id']).id)
+
+    def test_resolution_cache_holds_copies(self):
+        self.manager.client.resolution_cache = cache.MemoryCache()
+        ref = self.new_ref(tags=['a'])
+        self.stub_entity('GET', entity=[ref])
+
+        listed = self.manager.list()[0]
+        listed.tags.append('b')
+
+        resolved = self.manager._get_resolution(ref['id'])
+        self.assertEqual(['a'], resolved.tags)
+        resolved.tags.append('c')
+        self.assertEqual(['a'], self.manager._get_resolution(ref['id']).tags)
+
     def test_list_projects_for_parent(self):
         ref_list = [self.new_ref(), self.new_ref()]
         parent_id = uuid.uuid4().hex
@@ -394,6 +611,59 @@ class ProjectTests(utils.ClientTestCase, utils.CrudTests):
                       status_code=404)
         self.assertFalse(self.manager.check_tag(ref['id'], no_tag))
 
+    def test_change_tags_many(self):
+        untouched = self.new_ref(tags=['blue', 'green'])
+        single = self.new_ref(tags=['blue'])
+        several = self.new_ref(tags=['orange', 'red'])
+        self.stub_entity('GET', [self.collection_key],
+                         entity=[untouched, single, several])
+        add_tag = self.stub_url(
+            'PUT', parts=[self.collection_key, single['id'], 'tags', 'green'],
+            status_code=201)
+        update = self.stub_url(
+            'PUT', parts=[self.collection_key, several['id'], 'tags'],
+            json={'tags': ['blue', 'green', 'orange']})
+
+        results = self.manager.change_tags_many(add=['blue', 'green'],
+                                                remove=['red', 'white'],
+                                                tags_any='blue,orange')
+
+        self.assertEqual(3, len(results))
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual([['blue', 'green'], ['blue', 'green'],
+                          ['blue', 'green', 'orange']],
+                         [r.result for r in results])
+        self.assertEqual(1, add_tag.call_count)
+        self.assertEqual(1, update.call_count)
+        self.assertEqual({'tags': ['blue', 'green', 'orange']},
+                         update.last_request.json())
+        list_request = [r for r in self.requests_mock.request_history
+                        if r.method == 'GET'][-1]
+        self.assertEqual({'tags-any': ['blue,orange']}, list_request.qs)
+
+    def test_change_tags_many_by_id(self):
+        ref = self.new_ref()
+        self.stub_url('GET', parts=[self.collection_key, ref['id'], 'tags'],
+                      json={'tags': ['red']})
+        delete_tag = self.stub_url(
+            'DELETE', parts=[self.collection_key, ref['id'], 'tags', 'red'],
+            status_code=204)
+
+        results = self.manager.change_tags_many(remove=['red'],
+                                                projects=[ref['id']])
+
+        self.assertEqual([[]], [r.result for r in results])
+        self.assertEqual(1, delete_tag.call_count)
+
+    def test_change_tags_many_invalid(self):
+        self.assertRaises(ksc_exceptions.ValidationError,
+                          self.manager.change_tags_many,
+                          add=['blue'], remove=['blue'])
+        self.assertRaises(ksc_exceptions.ValidationError,
+                          self.manager.change_tags_many,
+                          add=['blue'], projects=[uuid.uuid4().hex],
+                          tags='red')
+
     def _build_project_response(self, tags):
         project_id = uuid.uuid4().hex
         ret = {"projects": [
@@ -10,6 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import uuid
+
+from oslo_utils import fixture
+
 from keystoneclient import exceptions
 from keystoneclient.tests.unit.v3 import utils
 from keystoneclient.v3 import role_assignments
@@ -332,3 +336,152 @@ class RoleAssignmentsTests(utils.ClientTestCase, utils.CrudTests):
     def test_find(self):
         # Find not supported for role assignments
         self.assertRaises(exceptions.MethodNotImplemented, self.manager.find)
+
+    def test_index(self):
+        self.stub_entity('GET',
+                         [self.collection_key, '?effective=True'],
+                         entity=self.TEST_ALL_RESPONSE_LIST)
+
+        index = self.manager.index()
+
+        self.assertEqual(5, len(index))
+        self.assertQueryStringIs('effective=True')
+        self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                       user=self.TEST_USER_ID,
+                                       project=self.TEST_TENANT_ID))
+        self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                       user=self.TEST_USER_ID,
+                                       system='all'))
+        self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                       user=uuid.uuid4().hex,
+                                       groups=[self.TEST_GROUP_ID],
+                                       project=self.TEST_TENANT_ID))
+        self.assertFalse(index.has_role(self.TEST_ROLE_ID,
+                                        user=self.TEST_USER_ID,
+                                        project=uuid.uuid4().hex))
+        self.assertFalse(index.has_role(uuid.uuid4().hex,
+                                        user=self.TEST_USER_ID,
+                                        project=self.TEST_TENANT_ID))
+
+        self.assertEqual(3, len(index.assignments(user=self.TEST_USER_ID)))
+        self.assertEqual(
+            {role_assignments.Assignment('user', self.TEST_USER_ID,
+                                         'domain', self.TEST_DOMAIN_ID,
+                                         self.TEST_ROLE_ID, False)},
+            index.assignments(user=self.TEST_USER_ID,
+                              domain=self.TEST_DOMAIN_ID,
+                              role=self.TEST_ROLE_ID))
+
+    def test_index_inherited_and_names(self):
+        parent_id = uuid.uuid4().hex
+        child_id = uuid.uuid4().hex
+        role_name = uuid.uuid4().hex
+        refs = [{'user': {'id': self.TEST_USER_ID},
+                 'role': {'id': self.TEST_ROLE_ID, 'name': role_name},
+                 'scope': {'project': {'id': parent_id},
+                           'OS-INHERIT:inherited_to': 'projects'}}]
+        self.stub_entity('GET', [self.collection_key], entity=refs)
+        projects = [
+            self.client.projects.resource_class(
+                None, {'id': parent_id, 'parent_id': self.TEST_DOMAIN_ID,
+                       'domain_id': self.TEST_DOMAIN_ID}),
+            self.client.projects.resource_class(
+                None, {'id': child_id, 'parent_id': parent_id,
+                       'domain_id': self.TEST_DOMAIN_ID})]
+
+        index = self.manager.index(effective=False, include_names=True,
+                                   projects=projects)
+
+        self.assertQueryStringIs('include_names=True')
+        self.assertTrue(index.has_role(role_name, user=self.TEST_USER_ID,
+                                       project=child_id))
+        self.assertFalse(index.has_role(role_name, user=self.TEST_USER_ID,
+                                        project=parent_id))
+
+    def test_index_refresh_does_not_block_readers(self):
+        url = self.TEST_URL + '/' + self.collection_key
+        self.requests_mock.get(
+            url,
+            [{'json': {self.collection_key: self.TEST_USER_PROJECT_LIST}},
+             {'json': {self.collection_key: self.TEST_USER_DOMAIN_LIST}}])
+        time_fixture = self.useFixture(fixture.TimeFixture())
+
+        index = self.manager.index(refresh_interval=60)
+        self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                       user=self.TEST_USER_ID,
+                                       project=self.TEST_TENANT_ID))
+        requests = len(self.requests_mock.request_history)
+
+        # while another thread is reloading the index the previous one is used
+        time_fixture.advance_time_seconds(61)
+        with index._refresh_lock:
+            self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                           user=self.TEST_USER_ID,
+                                           project=self.TEST_TENANT_ID))
+        self.assertEqual(requests, len(self.requests_mock.request_history))
+
+        self.assertFalse(index.has_role(self.TEST_ROLE_ID,
+                                        user=self.TEST_USER_ID,
+                                        project=self.TEST_TENANT_ID))
+        self.assertEqual(requests + 1,
+                         len(self.requests_mock.request_history))
+
+    def test_index_refresh_scope(self):
+        url = self.TEST_URL + '/' + self.collection_key
+        self.requests_mock.get(
+            url,
+            [{'json': {self.collection_key: self.TEST_ALL_RESPONSE_LIST}},
+             {'json': {self.collection_key: []}}])
+
+        index = self.manager.index()
+        self.assertEqual(5, len(index))
+
+        result = index.refresh_scope(user=self.TEST_USER_ID,
+                                     project=self.TEST_TENANT_ID)
+
+        self.assertEqual((0, 1), result)
+        self.assertEqual({'user.id': [self.TEST_USER_ID],
+                          'scope.project.id': [self.TEST_TENANT_ID],
+                          'effective': ['true']},
+                         self.requests_mock.last_request.qs)
+        self.assertFalse(index.has_role(self.TEST_ROLE_ID,
+                                        user=self.TEST_USER_ID,
+                                        project=self.TEST_TENANT_ID))
+        # the assignments outside of the scope are kept
+        self.assertEqual(4, len(index))
+        self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                       group=self.TEST_GROUP_ID,
+                                       project=self.TEST_TENANT_ID))
+        self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                       user=self.TEST_USER_ID,
+                                       domain=self.TEST_DOMAIN_ID))
+
+    def test_index_refresh_scope_requires_filter(self):
+        self.stub_entity('GET', [self.collection_key],
+                         entity=self.TEST_ALL_RESPONSE_LIST)
+        index = self.manager.index()
+
+        self.assertRaises(exceptions.ValidationError, index.refresh_scope)
+
+    def test_index_refresh(self):
+        url = self.TEST_URL + '/' + self.collection_key
+        self.requests_mock.get(
+            url,
+            [{'json': {self.collection_key: self.TEST_USER_PROJECT_LIST}},
+             {'json': {self.collection_key: self.TEST_USER_DOMAIN_LIST}}])
+        time_fixture = self.useFixture(fixture.TimeFixture())
+
+        index = self.manager.index(refresh_interval=60)
+        self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                       user=self.TEST_USER_ID,
+                                       project=self.TEST_TENANT_ID))
+
+        time_fixture.advance_time_seconds(61)
+        self.assertFalse(index.has_role(self.TEST_ROLE_ID,
+                                        user=self.TEST_USER_ID,
+                                        project=self.TEST_TENANT_ID))
+        self.assertTrue(index.has_role(self.TEST_ROLE_ID,
+                                       user=self.TEST_USER_ID,
+                                       domain=self.TEST_DOMAIN_ID))
+        self.assertEqual(
+            set(), index.assignments(project=self.TEST_TENANT_ID))
@@ -15,6 +15,7 @@
 import uuid
 
 from keystoneclient import exceptions
+from keystoneclient import session as client_session
 from keystoneclient.tests.unit.v3 import utils
 from keystoneclient.v3 import roles
 from testtools import matchers
@@ -409,6 +410,109 @@ class RoleTests(utils.ClientTestCase, utils.CrudTests):
 
         self.manager.grant(role=ref['id'], project=project_id, user=user_id)
 
+    def test_grant_many(self):
+        user_id = uuid.uuid4().hex
+        group_id = uuid.uuid4().hex
+        project_id = uuid.uuid4().hex
+        domain_id = uuid.uuid4().hex
+        ref = self.new_ref()
+
+        user_grant = self.stub_url(
+            'PUT', ['projects', project_id, 'users', user_id,
+                    self.collection_key, ref['id']],
+            response_list=[{'status_code': 503}, {'status_code': 204}])
+        group_grant = self.stub_url(
+            'PUT', ['domains', domain_id, 'groups', group_id,
+                    self.collection_key, ref['id']],
+            status_code=403)
+
+        grants = [{'role': ref['id'], 'user': user_id, 'project': project_id},
+                  {'role': ref['id'], 'group': group_id, 'domain': domain_id}]
+        report = self.manager.grant_many(grants, retry_delay=0)
+
+        self.assertEqual([True, False], [r.ok for r in report])
+        self.assertEqual([2, 1], [r.attempts for r in report])
+        self.assertEqual(grants, [r.request for r in report])
+        self.assertIsInstance(report[1].error, exceptions.Forbidden)
+        self.assertEqual(2, user_grant.call_count)
+        self.assertEqual(1, group_grant.call_count)
+
+    def test_grant_many_gives_up_retrying(self):
+        user_id = uuid.uuid4().hex
+        project_id = uuid.uuid4().hex
+        ref = self.new_ref()
+
+        grant = self.stub_url('PUT',
+                              ['projects', project_id, 'users', user_id,
+                               self.collection_key, ref['id']],
+                              status_code=503)
+
+        report = self.manager.grant_many(
+            [{'role': ref['id'], 'user': user_id, 'project': project_id}],
+            retries=1, retry_delay=0)
+
+        self.assertFalse(report[0].ok)
+        self.assertEqual(2, report[0].attempts)
+        self.assertEqual(2, grant.call_count)
+
+    def test_grant_many_leaves_retries_to_session(self):
+        user_id = uuid.uuid4().hex
+        project_id = uuid.uuid4().hex
+        ref = self.new_ref()
+
+        grant = self.stub_url('PUT',
+                              ['projects', project_id, 'users', user_id,
+                               self.collection_key, ref['id']],
+                              status_code=503)
+
+        # the retries of the session policy are not repeated by grant_many
+        self.client.session.retry_policy = client_session.RetryPolicy(
+            max_attempts=1)
+        report = self.manager.grant_many(
+            [{'role': ref['id'], 'user': user_id, 'project': project_id}],
+            retries=2, retry_delay=0)
+
+        self.assertFalse(report[0].ok)
+        self.assertEqual(1, report[0].attempts)
+        self.assertEqual(1, grant.call_count)
+
+    def test_grant_many_validates_first(self):
+        user_id = uuid.uuid4().hex
+        project_id = uuid.uuid4().hex
+        ref = self.new_ref()
+
+        grant = self.stub_url('PUT',
+                              ['projects', project_id, 'users', user_id,
+                               self.collection_key, ref['id']],
+                              status_code=204)
+
+        grants = [{'role': ref['id'], 'user': user_id, 'project': project_id},
+                  {'role': ref['id'], 'user': user_id,
+                   'group': uuid.uuid4().hex, 'project': project_id}]
+        self.assertRaises(exceptions.ValidationError,
+                          self.manager.grant_many, grants)
+        self.assertRaises(exceptions.ValidationError,
+                          self.manager.grant_many,
+                          [{'user': user_id, 'project': project_id}])
+        self.assertEqual(0, grant.call_count)
+
+    def test_revoke_many(self):
+        group_id = uuid.uuid4().hex
+        project_id = uuid.uuid4().hex
+        refs = [self.new_ref(), self.new_ref()]
+
+        for ref in refs:
+            self.stub_url('DELETE',
+                          ['projects', project_id, 'groups', group_id,
+                           self.collection_key, ref['id']],
+                          status_code=204)
+
+        report = self.manager.revoke_many(
+            [{'role': ref['id'], 'group': group_id, 'project': project_id}
+             for ref in refs])
+
+        self.assertTrue(all(r.ok for r in report))
+
     def test_project_group_role_grant(self):
         group_id = uuid.uuid4().hex
         project_id = uuid.uuid4().hex
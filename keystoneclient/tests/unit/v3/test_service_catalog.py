@@ -226,6 +226,52 @@ class ServiceCatalogTest(utils.TestCase):
                           service_type='compute', service_name='NotExist',
                           endpoint_type='public')
 
+    def test_service_catalog_index_reused(self):
+        auth_ref = access.AccessInfo.factory(None, self.AUTH_RESPONSE_BODY)
+        sc = auth_ref.service_catalog
+
+        endpoints = sc.get_endpoints(service_type='image', region_name='North')
+        index = sc._endpoint_index
+
+        # modifying the returned lists must not affect later lookups
+        endpoints['image'].pop()
+
+        endpoints = sc.get_endpoints(service_type='image', region_name='North')
+        self.assertEqual(3, len(endpoints['image']))
+        self.assertIs(index, sc._endpoint_index)
+
+    def test_service_catalog_index_rebuilt_on_new_catalog(self):
+        auth_ref = access.AccessInfo.factory(None, self.AUTH_RESPONSE_BODY)
+        sc = auth_ref.service_catalog
+
+        self.assertEqual('http://glance.north.host/glanceapi/public',
+                         sc.url_for(service_type='image', region_name='North',
+                                    endpoint_type='public'))
+
+        auth_ref['catalog'] = [s for s in auth_ref['catalog']
+                               if s['type'] != 'image']
+
+        self.assertRaises(exceptions.EndpointNotFound, sc.url_for,
+                          service_type='image', region_name='North',
+                          endpoint_type='public')
+
+    def test_service_catalog_index_invalidate(self):
+        auth_ref = access.AccessInfo.factory(None, self.AUTH_RESPONSE_BODY)
+        sc = auth_ref.service_catalog
+
+        endpoints = sc.get_endpoints(service_type='compute',
+                                     region_name='North')
+        self.assertEqual(3, len(endpoints['compute']))
+
+        for service in auth_ref['catalog']:
+            if service['type'] == 'compute':
+                service['endpoints'] = []
+
+        sc.invalidate_endpoint_index()
+        endpoints = sc.get_endpoints(service_type='compute',
+                                     region_name='North')
+        self.assertEqual([], endpoints['compute'])
+
 
 class ServiceCatalogV3Test(ServiceCatalogTest):
 
@@ -13,9 +13,11 @@
 import uuid
 
 from keystoneauth1 import exceptions
+from oslo_utils import fixture as utils_fixture
 import testresources
 
 from keystoneclient import access
+from keystoneclient import cache
 from keystoneclient.tests.unit import client_fixtures
 from keystoneclient.tests.unit.v3 import utils
 
@@ -95,6 +97,146 @@ class TokenTests(utils.ClientTestCase, testresources.ResourcedTestCase):
         self.assertIsInstance(access_info, access.AccessInfoV3)
         self.assertEqual(token_id, access_info.auth_token)
 
+    def test_validate_token_cached(self):
+        token_id = uuid.uuid4().hex
+        token_ref = self.examples.TOKEN_RESPONSES[
+            self.examples.v3_UUID_TOKEN_DEFAULT]
+        m = self.stub_url('GET', ['auth', 'tokens'],
+                          headers={'X-Subject-Token': token_id, },
+                          json=token_ref)
+
+        self.client.tokens.cache = cache.MemoryCache()
+
+        for _ in range(3):
+            access_info = self.client.tokens.validate(token_id)
+            self.assertEqual(token_id, access_info.auth_token)
+
+        self.assertEqual(1, m.call_count)
+
+        # the variants are cached separately
+        self.client.tokens.validate(token_id, include_catalog=False)
+        self.client.tokens.validate(token_id, include_catalog=False)
+        self.assertEqual(2, m.call_count)
+        self.assertQueryStringIs('nocatalog')
+
+        stats = self.client.tokens.cache.stats()
+        self.assertEqual(3, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+
+    def test_validate_token_cache_purged_on_revoke(self):
+        token_id = uuid.uuid4().hex
+        token_ref = self.examples.TOKEN_RESPONSES[
+            self.examples.v3_UUID_TOKEN_DEFAULT]
+        m = self.stub_url('GET', ['auth', 'tokens'],
+                          headers={'X-Subject-Token': token_id, },
+                          json=token_ref)
+        self.stub_url('DELETE', ['auth', 'tokens'], status_code=204)
+
+        self.client.tokens.cache = cache.MemoryCache()
+
+        self.client.tokens.validate(token_id)
+        self.client.tokens.validate(token_id, allow_expired=True)
+        self.assertEqual(2, len(self.client.tokens.cache))
+
+        self.client.tokens.revoke_token(token_id)
+        self.assertEqual(0, len(self.client.tokens.cache))
+
+        self.client.tokens.validate(token_id)
+        self.assertEqual(3, m.call_count)
+
+    def test_validate_token_cache_purged_after_revoke(self):
+        token_id = uuid.uuid4().hex
+        token_ref = self.examples.TOKEN_RESPONSES[
+            self.examples.v3_UUID_TOKEN_DEFAULT]
+        m = self.stub_url('GET', ['auth', 'tokens'],
+                          headers={'X-Subject-Token': token_id, },
+                          json=token_ref)
+
+        def revoke(request, context):
+            # a validation that completes before the server revokes the token
+            self.client.tokens.validate(token_id)
+            context.status_code = 204
+
+        self.stub_url('DELETE', ['auth', 'tokens'], text=revoke)
+
+        self.client.tokens.cache = cache.MemoryCache()
+
+        self.client.tokens.revoke_token(token_id)
+        self.assertEqual(0, len(self.client.tokens.cache))
+
+        self.client.tokens.validate(token_id)
+        self.assertEqual(2, m.call_count)
+
+    def test_validate_token_cache_allow_expired_lifetime(self):
+        time_fixture = self.useFixture(utils_fixture.TimeFixture())
+        token_id = uuid.uuid4().hex
+        token_ref = self.examples.TOKEN_RESPONSES[
+            self.examples.v3_UUID_TOKEN_DEFAULT]
+        m = self.stub_url('GET', ['auth', 'tokens'],
+                          headers={'X-Subject-Token': token_id, },
+                          json=token_ref)
+
+        self.client.tokens.cache = cache.MemoryCache()
+
+        self.client.tokens.validate(token_id, allow_expired=True)
+        self.client.tokens.validate(token_id, allow_expired=True)
+        self.assertEqual(1, m.call_count)
+
+        time_fixture.advance_time_seconds(
+            self.client.tokens.ALLOW_EXPIRED_CACHE_SECONDS + 1)
+        self.client.tokens.validate(token_id, allow_expired=True)
+        self.assertEqual(2, m.call_count)
+
+    def test_get_token_data_cached_copy(self):
+        token_id = uuid.uuid4().hex
+        token_ref = self.examples.TOKEN_RESPONSES[
+            self.examples.v3_UUID_TOKEN_DEFAULT]
+        self.stub_url('GET', ['auth', 'tokens'],
+                      headers={'X-Subject-Token': token_id, },
+                      json=token_ref)
+
+        self.client.tokens.cache = cache.MemoryCache()
+
+        body = self.client.tokens.get_token_data(token_id)
+        body['token']['roles'].append({'id': 'admin', 'name': 'admin'})
+        body['token']['user'] = None
+
+        self.assertEqual(token_ref,
+                         self.client.tokens.get_token_data(token_id))
+
+    def test_validate_many(self):
+        token_ref = self.examples.TOKEN_RESPONSES[
+            self.examples.v3_UUID_TOKEN_DEFAULT]
+        valid_ids = [uuid.uuid4().hex for _ in range(3)]
+        invalid_id = uuid.uuid4().hex
+
+        for token_id in valid_ids:
+            self.stub_url('GET', ['auth', 'tokens'],
+                          request_headers={'X-Subject-Token': token_id},
+                          headers={'X-Subject-Token': token_id},
+                          json=token_ref)
+        self.stub_url('GET', ['auth', 'tokens'],
+                      request_headers={'X-Subject-Token': invalid_id},
+                      status_code=404)
+
+        tokens = valid_ids + [invalid_id, valid_ids[0]]
+        results = self.client.tokens.validate_many(tokens, max_workers=3)
+
+        self.assertEqual(5, len(results))
+        for token_id, result in zip(valid_ids, results):
+            self.assertIsInstance(result, access.AccessInfoV3)
+            self.assertEqual(token_id, result.auth_token)
+
+        self.assertIsInstance(results[3], exceptions.NotFound)
+        self.assertIs(results[0], results[4])
+
+        requests = [r for r in self.requests_mock.request_history
+                    if r.method == 'GET' and r.path.endswith('/auth/tokens')]
+        self.assertEqual(4, len(requests))
+
+    def test_validate_many_empty(self):
+        self.assertEqual([], self.client.tokens.validate_many([]))
+
     def test_validate_token_invalid(self):
         # When the token is invalid the server typically returns a 404.
         token_id = uuid.uuid4().hex
@@ -15,6 +15,9 @@
 from unittest import mock
 import uuid
 
+import requests
+import requests_mock
+
 from keystoneclient import exceptions
 from keystoneclient.tests.unit.v3 import utils
 from keystoneclient.v3 import users
@@ -62,6 +65,169 @@ class UserTests(utils.ClientTestCase, utils.CrudTests):
         self.assertEqual(len(ref_list), len(returned_list))
         [self.assertIsInstance(r, self.model) for r in returned_list]
 
+    def test_list_stream_follows_next_link(self):
+        domain_id = uuid.uuid4().hex
+        first_page = [self.new_ref(), self.new_ref()]
+        second_page = [self.new_ref()]
+        url = self.TEST_URL + '/' + self.collection_key
+        next_url = url + '?domain_id=%s&page=2' % domain_id
+
+        first = self.requests_mock.get(
+            url, json={self.collection_key: first_page,
+                       'links': {'next': next_url}})
+        second = self.requests_mock.get(
+            next_url, json={self.collection_key: second_page,
+                            'links': {'next': None}})
+
+        returned = self.manager.list(domain=domain_id, stream=True)
+        self.assertEqual(0, first.call_count)
+
+        self.assertEqual(first_page[0]['id'], next(returned).id)
+        self.assertEqual(1, first.call_count)
+        self.assertEqual(0, second.call_count)
+        self.assertEqual({'domain_id': [domain_id]}, first.last_request.qs)
+
+        rest = list(returned)
+        self.assertEqual([r['id'] for r in first_page[1:] + second_page],
+                         [r.id for r in rest])
+        [self.assertIsInstance(r, self.model) for r in rest]
+        self.assertEqual(1, second.call_count)
+
+    def test_iter_list_with_marker(self):
+        refs = [self.new_ref() for i in range(3)]
+        matcher = self.requests_mock.get(
+            self.TEST_URL + '/' + self.collection_key,
+            [{'json': {self.collection_key: refs[:2]}},
+             {'json': {self.collection_key: refs[2:]}}])
+
+        returned = list(self.manager.iter_list(page_size=2))
+
+        self.assertEqual([r['id'] for r in refs], [r.id for r in returned])
+        self.assertEqual(2, matcher.call_count)
+        self.assertEqual({'limit': ['2']},
+                         matcher.request_history[0].qs)
+        self.assertEqual({'limit': ['2'], 'marker': [refs[1]['id']]},
+                         matcher.request_history[1].qs)
+
+    def test_iter_list_marker_ignored(self):
+        refs = [self.new_ref(), self.new_ref()]
+        matcher = self.requests_mock.get(
+            self.TEST_URL + '/' + self.collection_key,
+            json={self.collection_key: refs})
+
+        returned = list(self.manager.iter_list(page_size=2))
+
+        self.assertEqual([r['id'] for r in refs], [r.id for r in returned])
+        self.assertEqual(2, matcher.call_count)
+
+    def test_iter_list_stopped_early_releases_response(self):
+        refs = [self.new_ref() for i in range(3)]
+        self.requests_mock.get(self.TEST_URL + '/' + self.collection_key,
+                               json={self.collection_key: refs})
+
+        with mock.patch.object(requests.Response, 'close',
+                               autospec=True) as close:
+            returned = self.manager.iter_list()
+            self.assertEqual(refs[0]['id'], next(returned).id)
+            closed = close.call_count
+
+            returned.close()
+            self.assertEqual(closed + 1, close.call_count)
+
+    def test_find_filters_unsupported_locally(self):
+        ref_list = [self.new_ref(name='joe', email='a@example.com'),
+                    self.new_ref(name='joe', email='b@example.com')]
+        self.stub_entity('GET', entity=ref_list)
+
+        returned = self.manager.find(name='joe', email='b@example.com')
+
+        self.assertEqual(ref_list[1]['id'], returned.id)
+        self.assertQueryStringIs('name=joe')
+
+    def test_find_stops_after_second_match(self):
+        ref_list = [self.new_ref(name='joe'), self.new_ref(name='joe')]
+        url = self.TEST_URL + '/' + self.collection_key
+        next_url = url + '?name=joe&page=2'
+
+        self.requests_mock.get(
+            url, json={self.collection_key: ref_list,
+                       'links': {'next': next_url}})
+        second = self.requests_mock.get(
+            next_url, json={self.collection_key: [self.new_ref()]})
+
+        self.assertRaises(exceptions.NoUniqueMatch,
+                          self.manager.find, name='joe')
+        self.assertEqual(0, second.call_count)
+
+    def test_find_follows_pages(self):
+        ref = self.new_ref(name='joe', email='b@example.com')
+        url = self.TEST_URL + '/' + self.collection_key
+        next_url = url + '?name=joe&page=2'
+
+        self.requests_mock.get(
+            url, json={self.collection_key: [self.new_ref(name='joe')],
+                       'links': {'next': next_url}})
+        self.requests_mock.get(next_url, json={self.collection_key: [ref]})
+
+        returned = self.manager.find(name='joe', email='b@example.com')
+        self.assertEqual(ref['id'], returned.id)
+
+    def _stub_reconcile(self, group_id, members):
+        self.stub_entity('GET', ['groups', group_id, self.collection_key],
+                         entity=members)
+        add = self.requests_mock.put(
+            requests_mock.ANY, status_code=204)
+        remove = self.requests_mock.delete(
+            requests_mock.ANY, status_code=204)
+        return add, remove
+
+    def test_reconcile_group(self):
+        group_id = uuid.uuid4().hex
+        kept, extra = self.new_ref(), self.new_ref()
+        new_id = uuid.uuid4().hex
+        add, remove = self._stub_reconcile(group_id, [kept, extra])
+
+        report = self.manager.reconcile_group(group_id,
+                                              [kept['id'], new_id])
+
+        self.assertEqual(1, report.unchanged)
+        self.assertEqual([{'user': new_id, 'group': group_id}],
+                         [r.request for r in report.added])
+        self.assertEqual([{'user': extra['id'], 'group': group_id}],
+                         [r.request for r in report.removed])
+        self.assertEqual([], report.failed)
+        self.assertGreaterEqual(report.elapsed, 0)
+
+        self.assertEqual(1, add.call_count)
+        self.assertTrue(add.last_request.path.endswith(
+            '/groups/%s/users/%s' % (group_id, new_id)))
+        self.assertEqual(1, remove.call_count)
+        self.assertTrue(remove.last_request.path.endswith(
+            '/groups/%s/users/%s' % (group_id, extra['id'])))
+
+    def test_reconcile_group_dry_run(self):
+        group_id = uuid.uuid4().hex
+        member = self.new_ref()
+        add, remove = self._stub_reconcile(group_id, [member])
+
+        report = self.manager.reconcile_group(group_id, [uuid.uuid4().hex],
+                                              dry_run=True)
+
+        self.assertEqual(1, len(report.added))
+        self.assertEqual(1, len(report.removed))
+        self.assertEqual(0, report.unchanged)
+        self.assertEqual(0, add.call_count)
+        self.assertEqual(0, remove.call_count)
+
+        # the changes are reported as planned, neither made nor failed
+        self.assertTrue(report.dry_run)
+        for result in report.added + report.removed:
+            self.assertTrue(result.planned)
+            self.assertFalse(result.ok)
+            self.assertEqual(0, result.attempts)
+            self.assertIn('planned', repr(result))
+        self.assertEqual([], report.failed)
+
     def test_check_user_in_group(self):
         group_id = uuid.uuid4().hex
         ref = self.new_ref()
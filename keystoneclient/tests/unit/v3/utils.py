@@ -220,7 +220,7 @@ class CrudTests(object):
 
             parts.append(id)
 
-        self.stub_url(method, parts=parts, **kwargs)
+        return self.stub_url(method, parts=parts, **kwargs)
 
     def assertEntityRequestBodyIs(self, entity):
         self.assertRequestBodyIs(json=self.encode(entity))
@@ -10,9 +10,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import abc
+import codecs
+import collections
+from concurrent import futures
+import datetime
 import getpass
 import hashlib
+import json
 import sys
+import threading
 
 from keystoneauth1 import exceptions as ksa_exceptions
 from oslo_utils import timeutils
@@ -21,7 +28,26 @@ from keystoneclient import exceptions as ksc_exceptions
 
 
 def find_resource(manager, name_or_id):
-    """Helper for the _find_* methods."""
+    """Helper for the _find_* methods.
+
+    If the manager has a ``resolution_cache`` the resources found are cached
+    by name and ID and later lookups are answered from it.
+    """
+    cache = getattr(manager, 'resolution_cache', None)
+    if cache is not None:
+        resource = manager._get_resolution(name_or_id)
+        if resource is not None:
+            return resource
+
+    resource = _find_resource(manager, name_or_id)
+
+    if cache is not None:
+        manager._set_resolution(resource, name_or_id)
+
+    return resource
+
+
+def _find_resource(manager, name_or_id):
     # first try the entity as a string
     try:
         return manager.get(name_or_id)
@@ -45,6 +71,276 @@ def find_resource(manager, name_or_id):
         raise ksc_exceptions.CommandError(msg)
 
 
+def map_concurrently(func, items, max_workers=10):
+    """Call func for each item using a bounded pool of threads.
+
+    The items are consumed as calls complete, so a generator, such as a
+    streamed listing, is not read far ahead of the calls.
+
+    :param func: A callable taking a single item.
+    :param items: An iterable of the items to call func with.
+    :param int max_workers: The maximum number of calls in flight at once.
+
+    :returns: A list holding, in the order of items, the value returned by
+              each call or the exception it raised.
+    :rtype: list
+    """
+    def call(item):
+        try:
+            return func(item)
+        except Exception as e:
+            return e
+
+    max_workers = max(1, max_workers)
+    results = []
+    pending = collections.deque()
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for item in items:
+            if len(pending) >= max_workers:
+                results.append(pending.popleft().result())
+            pending.append(executor.submit(call, item))
+
+        while pending:
+            results.append(pending.popleft().result())
+
+    return results
+
+
+class RefreshingSnapshot(object, metaclass=abc.ABCMeta):
+    """Base class of in-memory views of data loaded from the server.
+
+    The view is held in a snapshot that is never modified once built. A
+    refresh builds a new snapshot without holding any lock the readers need
+    and then swaps it in, so readers are never blocked by a reload and keep
+    answering from the previous snapshot until the new one is ready. Readers
+    should fetch the snapshot once with :py:meth:`_snapshot` and answer from
+    it alone.
+
+    :param int refresh_interval: the number of seconds after which the view
+                                 is reloaded the next time it is used.
+                                 (optional)
+    """
+
+    def __init__(self, refresh_interval=None):
+        self.refresh_interval = refresh_interval
+        self.loaded_at = None
+        self._current = None
+        self._refresh_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _build(self, previous):
+        """Load the data and build a new snapshot.
+
+        :param previous: the current snapshot, or None on the first load. It
+                         must not be modified.
+
+        :returns: a tuple of the new snapshot and the value that
+                  :py:meth:`refresh` returns.
+        """
+
+    def refresh(self):
+        """Reload the view."""
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        snapshot, result = self._build(self._current)
+        self._current = snapshot
+        self.loaded_at = timeutils.utcnow()
+        return result
+
+    def _amend(self, amend):
+        # Swap in a snapshot derived from the current one by amend, which
+        # returns it along with a result as _build does. The next full reload
+        # is due at the same time as before.
+        with self._refresh_lock:
+            if self._current is None:
+                return self._refresh()
+            snapshot, result = amend(self._current)
+            self._current = snapshot
+            return result
+
+    def _stale(self):
+        if self.refresh_interval is None:
+            return False
+        age = datetime.timedelta(seconds=self.refresh_interval)
+        return timeutils.utcnow() >= self.loaded_at + age
+
+    def _snapshot(self):
+        snapshot = self._current
+
+        if snapshot is None:
+            # there is nothing to answer from until the first load is done
+            with self._refresh_lock:
+                if self._current is None:
+                    self._refresh()
+                return self._current
+
+        # only one reader reloads a stale view, the others don't wait for it
+        if self._stale() and self._refresh_lock.acquire(blocking=False):
+            try:
+                if self._stale():
+                    self._refresh()
+            finally:
+                self._refresh_lock.release()
+            return self._current
+
+        return snapshot
+
+
+class JsonCollectionReader(object):
+    """Yield the items of a JSON collection from a stream of chunks.
+
+    Only the list under ``response_key`` is parsed item by item, the other top
+    level members are decoded as a whole and collected into ``body``. Keystone
+    may wrap the list as ``{'values': [...]}``, which is unwrapped the same way
+    as :py:meth:`keystoneclient.base.Manager._list` does.
+
+    :param chunks: An iterable of the bytes of the document.
+    :param str response_key: The key of the list to yield the items of.
+    :param close: An optional callable invoked once the document is read or
+                  the reader is closed, whichever comes first.
+
+    A reader that is not read to the end should be closed, which it is when
+    used as a context manager, so that the response is released.
+    """
+
+    _WHITESPACE = ' \t\n\r'
+
+    def __init__(self, chunks, response_key, close=None):
+        self.body = {}
+        self._chunks = iter(chunks)
+        self._response_key = response_key
+        self._close = close
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self._items = self._parse()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop reading the document and release the response."""
+        self._items.close()
+        # the generator only runs its cleanup if it was started
+        self._release()
+
+    def _release(self):
+        close, self._close = self._close, None
+        if close:
+            close()
+
+    def _fill(self):
+        if self._eof:
+            return False
+
+        # drop what has already been consumed before growing the buffer
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+
+        for chunk in self._chunks:
+            text = self._text.decode(chunk)
+            if text:
+                self._buf += text
+                return True
+
+        self._buf += self._text.decode(b'', final=True)
+        self._eof = True
+        return True
+
+    def _peek(self):
+        while True:
+            while (self._pos < len(self._buf) and
+                   self._buf[self._pos] in self._WHITESPACE):
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON document')
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars:
+            raise ValueError('Expecting one of %r at position %d, found %r' %
+                             (chars, self._pos, char))
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+
+            # a number running to the end of the buffer may be incomplete
+            if end == len(self._buf) and not self._eof:
+                self._fill()
+                continue
+
+            self._pos = end
+            return value
+
+    def _members(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+    def _list_items(self):
+        if self._peek() == '{':
+            # the {'values': [...]} form, anything else is skipped
+            for key in self._members():
+                if key == 'values' and self._peek() == '[':
+                    yield from self._list_items()
+                else:
+                    self._value()
+            return
+
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+            if self._expect(',]') == ']':
+                return
+
+    def _parse(self):
+        try:
+            for key in self._members():
+                if key == self._response_key:
+                    yield from self._list_items()
+                else:
+                    self.body[key] = self._value()
+        finally:
+            self._release()
+
+
 def hash_signed_token(signed_text, mode='md5'):
     hash_ = hashlib.new(mode)
     hash_.update(signed_text)
@@ -74,6 +74,14 @@ class Client(httpclient.HTTPClient):
                           with a previously captured auth_reference (token)
     :param boolean debug: Enables debug logging of all request and responses
                           to keystone. default False (option)
+    :param token_cache: A cache used to store the results of token
+                        validation. (optional)
+    :type token_cache: keystoneclient.cache.MemoryCache
+    :param resolution_cache: A cache shared by the managers of the client in
+                             which resources found by name or ID through
+                             :py:func:`keystoneclient.utils.find_resource`
+                             or listed are kept. (optional)
+    :type resolution_cache: keystoneclient.cache.MemoryCache
 
     .. warning::
 
@@ -161,7 +169,8 @@ class Client(httpclient.HTTPClient):
         self.extensions = extensions.ExtensionManager(self._adapter)
         self.roles = roles.RoleManager(self._adapter)
         self.services = services.ServiceManager(self._adapter)
-        self.tokens = tokens.TokenManager(self._adapter)
+        self.tokens = tokens.TokenManager(
+            self._adapter, cache=kwargs.get('token_cache'))
         self.users = users.UserManager(self._adapter, self.roles)
 
         self.tenants = tenants.TenantManager(self._adapter,
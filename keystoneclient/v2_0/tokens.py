@@ -10,8 +10,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+
 from keystoneauth1 import exceptions
 from keystoneauth1 import plugin
+from oslo_utils import timeutils
 
 from keystoneclient import access
 from keystoneclient import base
@@ -37,8 +40,26 @@ class Token(base.Resource):
 
 
 class TokenManager(base.Manager):
+    """Manager class for manipulating Identity tokens.
+
+    :param client: The adapter used to talk to the identity server.
+    :param cache: An optional cache in which the results of token validation
+                  are kept. Entries never outlive the token they describe and
+                  are removed when the token is deleted through this manager.
+    :type cache: :py:class:`keystoneclient.cache.MemoryCache`
+
+    """
+
     resource_class = Token
 
+    def __init__(self, client, cache=None):
+        super(TokenManager, self).__init__(client)
+        self.cache = cache
+
+    def _purge_cache(self, token_id):
+        if self.cache is not None:
+            self.cache.delete_if(lambda key: key[0] == token_id)
+
     def authenticate(self, username=None, tenant_id=None, tenant_name=None,
                      password=None, token=None, return_raw=False):
         if token:
@@ -69,7 +90,13 @@ class TokenManager(base.Manager):
         return token_ref
 
     def delete(self, token):
-        return self._delete("/tokens/%s" % base.getid(token))
+        token_id = base.getid(token)
+        try:
+            return self._delete("/tokens/%s" % token_id)
+        finally:
+            # purged once the server has answered, so that a validation that
+            # completed while the request was in flight is not kept
+            self._purge_cache(token_id)
 
     def endpoints(self, token):
         return self._get("/tokens/%s/endpoints" % base.getid(token), "token")
@@ -82,7 +109,11 @@ class TokenManager(base.Manager):
         :rtype: :py:class:`.Token`
 
         """
-        return self._get('/tokens/%s' % base.getid(token), 'access')
+        if self.cache is None or self.client.include_metadata:
+            return self._get('/tokens/%s' % base.getid(token), 'access')
+
+        body = self.get_token_data(base.getid(token))
+        return self.resource_class(self, body['access'], loaded=True)
 
     def get_token_data(self, token):
         """Fetch the data about a token from the identity server.
@@ -91,8 +122,21 @@ class TokenManager(base.Manager):
 
         :rtype: dict
         """
+        cache_key = (token, )
+
+        if self.cache is not None:
+            body = self.cache.get(cache_key)
+            if body is not None:
+                return copy.deepcopy(body)
+
         url = '/tokens/%s' % token
         resp, body = self.client.get(url)
+
+        if self.cache is not None:
+            expires = timeutils.normalize_time(
+                timeutils.parse_isotime(body['access']['token']['expires']))
+            self.cache.set(cache_key, copy.deepcopy(body), expires=expires)
+
         return body
 
     def validate_access_info(self, token):
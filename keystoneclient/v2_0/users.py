@@ -36,6 +36,7 @@ class UserManager(base.ManagerWithFind):
     """Manager class for manipulating Keystone users."""
 
     resource_class = User
+    list_filters = ('tenant_id',)
 
     def __init__(self, client, role_manager):
         super(UserManager, self).__init__(client)
@@ -91,6 +91,14 @@ class Client(httpclient.HTTPClient):
                             instantiation. (optional)
     :param integer timeout: Allows customization of the timeout for client
                             http requests. (optional)
+    :param token_cache: A cache used to store the results of token
+                        validation. (optional)
+    :type token_cache: keystoneclient.cache.MemoryCache
+    :param resolution_cache: A cache shared by the managers of the client in
+                             which resources found by name or ID through
+                             :py:func:`keystoneclient.utils.find_resource`
+                             or listed are kept. (optional)
+    :type resolution_cache: keystoneclient.cache.MemoryCache
 
     .. warning::
 
@@ -257,7 +265,8 @@ class Client(httpclient.HTTPClient):
         self.inference_rules = roles.InferenceRuleManager(self._adapter)
         self.services = services.ServiceManager(self._adapter)
         self.simple_cert = simple_cert.SimpleCertManager(self._adapter)
-        self.tokens = tokens.TokenManager(self._adapter)
+        self.tokens = tokens.TokenManager(
+            self._adapter, cache=kwargs.get('token_cache'))
         self.trusts = trusts.TrustManager(self._adapter)
         self.users = users.UserManager(self._adapter)
 
@@ -38,6 +38,7 @@ class CredentialManager(base.CrudManager):
     resource_class = Credential
     collection_key = 'credentials'
     key = 'credential'
+    server_filters = ('user_id', 'type')
 
     def create(self, user, type, blob, project=None, **kwargs):
         """Create a credential.
@@ -37,6 +37,7 @@ class DomainManager(base.CrudManager):
     resource_class = Domain
     collection_key = 'domains'
     key = 'domain'
+    server_filters = ('name', 'enabled')
 
     def create(self, name, description=None, enabled=True, **kwargs):
         """Create a domain.
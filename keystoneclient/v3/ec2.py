@@ -33,6 +33,7 @@ class EC2(base.Resource):
 class EC2Manager(base.ManagerWithFind):
 
     resource_class = EC2
+    list_filters = ('user_id',)
 
     def create(self, user_id, project_id):
         """Create a new access/secret pair.
@@ -45,6 +45,7 @@ class EndpointManager(base.CrudManager):
     resource_class = Endpoint
     collection_key = 'endpoints'
     key = 'endpoint'
+    server_filters = ('interface', 'service_id', 'region_id')
 
     def _validate_interface(self, interface):
         if interface is not None and interface not in VALID_INTERFACES:
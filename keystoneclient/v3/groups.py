@@ -50,6 +50,7 @@ class GroupManager(base.CrudManager):
     resource_class = Group
     collection_key = 'groups'
     key = 'group'
+    server_filters = ('name', 'domain_id')
 
     def create(self, name, domain=None, description=None, **kwargs):
         """Create a group.
@@ -48,6 +48,7 @@ class PolicyManager(base.CrudManager):
     resource_class = Policy
     collection_key = 'policies'
     key = 'policy'
+    server_filters = ('type',)
 
     def create(self, blob, type='application/json', **kwargs):
         """Create a policy.
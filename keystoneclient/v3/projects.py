@@ -14,11 +14,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import urllib.parse
 
 from keystoneclient import base
 from keystoneclient import exceptions
 from keystoneclient.i18n import _
+from keystoneclient import utils
 
 
 class Project(base.Resource):
@@ -73,12 +75,227 @@ class Project(base.Resource):
         return self.manager.check_tag(self, tag)
 
 
+_TreeSnapshot = collections.namedtuple('_TreeSnapshot',
+                                       ['projects', 'children', 'chains'])
+
+
+class ProjectTree(utils.RefreshingSnapshot):
+    """An in-memory view of a project hierarchy.
+
+    The tree is loaded with a single streamed ``list()`` of the projects of a
+    domain and answers hierarchy questions such as the ancestors, descendants
+    or depth of a project without further requests. The chain of ancestors of
+    every project is computed once when the tree is loaded.
+
+    Only the projects returned by the listing are part of the tree, so a
+    project whose parent is not listed, such as a top level project whose
+    parent is its domain, is a root of the tree.
+
+    :param manager: the manager to list projects with.
+    :type manager: :py:class:`ProjectManager`
+    :param domain: the domain whose projects are loaded. (optional)
+    :type domain: str or :class:`keystoneclient.v3.domains.Domain`
+    :param int refresh_interval: the number of seconds after which the tree
+                                 is reloaded the next time it is used. Until
+                                 the reload completes the previous tree is
+                                 used. (optional)
+    :param kwargs: any other attribute provided will filter the projects
+                   loaded.
+    """
+
+    def __init__(self, manager, domain=None, refresh_interval=None, **kwargs):
+        super(ProjectTree, self).__init__(refresh_interval=refresh_interval)
+        self.manager = manager
+        self.domain = domain
+        self.filters = kwargs
+
+    @staticmethod
+    def _parent_id(projects, project):
+        parent_id = getattr(project, 'parent_id', None)
+        if parent_id in projects and parent_id != project.id:
+            return parent_id
+        return None
+
+    def _chain(self, projects, project_id, chains):
+        # Walk up until a project whose chain is already known, then unwind
+        # the path. A project seen twice means the hierarchy has a cycle.
+        path = []
+        seen = set()
+        current = project_id
+        while current is not None and current not in chains:
+            if current in seen:
+                break
+            seen.add(current)
+            path.append(current)
+            current = self._parent_id(projects, projects[current])
+
+        if current in seen:
+            # Each project of the cycle has the others as its ancestors.
+            start = path.index(current)
+            cycle = path[start:]
+            for i, pid in enumerate(cycle):
+                chains[pid] = tuple(cycle[i + 1:] + cycle[:i])
+            path = path[:start]
+        chain = ()
+        if current is not None:
+            chain = (current,) + chains[current]
+        for pid in reversed(path):
+            chains[pid] = chain
+            chain = (pid,) + chain
+        return chains[project_id]
+
+    def _build(self, previous):
+        projects = self.manager.list(domain=self.domain, stream=True,
+                                     **self.filters)
+        projects = dict((p.id, p) for p in projects)
+
+        old = previous.projects if previous else {}
+        old_chains = previous.chains if previous else {}
+        added = set(projects) - set(old)
+        removed = set(old) - set(projects)
+        changed = set(pid for pid in set(projects) & set(old)
+                      if projects[pid] != old[pid])
+        moved = set(pid for pid in changed
+                    if getattr(projects[pid], 'parent_id', None) !=
+                    getattr(old[pid], 'parent_id', None))
+
+        children = collections.defaultdict(set)
+        for project in projects.values():
+            parent_id = self._parent_id(projects, project)
+            if parent_id:
+                children[parent_id].add(project.id)
+
+        # The chains of the projects that were added or moved, or whose
+        # parent was removed or added, are stale along with those of their
+        # descendants. All other chains are kept.
+        stale = added | moved
+        reparented = added | removed
+        stale.update(pid for pid, p in projects.items()
+                     if getattr(p, 'parent_id', None) in reparented)
+        stale = set(self._walk(children, stale))
+
+        chains = dict((pid, chain) for pid, chain in old_chains.items()
+                      if pid in projects and pid not in stale)
+        for pid in stale:
+            self._chain(projects, pid, chains)
+
+        snapshot = _TreeSnapshot(projects, children, chains)
+        return snapshot, (len(added), len(removed), len(changed))
+
+    def refresh(self):
+        """Reload the tree, recomputing only the changed part of it.
+
+        The new tree is built while the previous one keeps being used.
+
+        :returns: the number of projects added, removed and changed.
+        :rtype: tuple
+        """
+        return super(ProjectTree, self).refresh()
+
+    @staticmethod
+    def _walk(children, project_ids, max_depth=None):
+        queue = collections.deque((pid, 0) for pid in project_ids)
+        seen = set()
+        while queue:
+            pid, depth = queue.popleft()
+            if pid in seen:
+                continue
+            seen.add(pid)
+            yield pid
+            if max_depth is None or depth < max_depth:
+                queue.extend((child, depth + 1)
+                             for child in sorted(children.get(pid, ())))
+
+    @staticmethod
+    def _id(snapshot, project):
+        project_id = base.getid(project)
+        if project_id not in snapshot.projects:
+            msg = _('No project with an ID of %s in the tree') % project_id
+            raise exceptions.NotFound(404, msg)
+        return project_id
+
+    def get(self, project):
+        """Return a project of the tree.
+
+        :raises keystoneclient.exceptions.NotFound: if the project is not in
+            the tree.
+        :rtype: :class:`keystoneclient.v3.projects.Project`
+        """
+        snapshot = self._snapshot()
+        return snapshot.projects[self._id(snapshot, project)]
+
+    def parent(self, project):
+        """Return the parent of a project, or None for a root project."""
+        snapshot = self._snapshot()
+        chain = snapshot.chains[self._id(snapshot, project)]
+        return snapshot.projects[chain[0]] if chain else None
+
+    def children(self, project):
+        """Return the projects directly below a project.
+
+        :rtype: list of :class:`keystoneclient.v3.projects.Project`
+        """
+        snapshot = self._snapshot()
+        children = snapshot.children.get(self._id(snapshot, project), ())
+        return [snapshot.projects[pid] for pid in sorted(children)]
+
+    def ancestors(self, project):
+        """Return the ancestors of a project, from its parent to the root.
+
+        :rtype: list of :class:`keystoneclient.v3.projects.Project`
+        """
+        snapshot = self._snapshot()
+        return [snapshot.projects[pid]
+                for pid in snapshot.chains[self._id(snapshot, project)]]
+
+    def descendants(self, project, max_depth=None):
+        """Return the projects below a project, breadth first.
+
+        :param project: the project whose subtree is returned.
+        :type project: str or :class:`keystoneclient.v3.projects.Project`
+        :param int max_depth: the number of levels below the project to
+                              return. (optional)
+
+        :rtype: list of :class:`keystoneclient.v3.projects.Project`
+        """
+        snapshot = self._snapshot()
+        walk = self._walk(snapshot.children, [self._id(snapshot, project)],
+                          max_depth=max_depth)
+        next(walk)
+        return [snapshot.projects[pid] for pid in walk]
+
+    def depth(self, project):
+        """Return the number of ancestors of a project, 0 for a root."""
+        snapshot = self._snapshot()
+        return len(snapshot.chains[self._id(snapshot, project)])
+
+    def roots(self):
+        """Return the projects of the tree that have no parent in it.
+
+        :rtype: list of :class:`keystoneclient.v3.projects.Project`
+        """
+        snapshot = self._snapshot()
+        return [snapshot.projects[pid] for pid in sorted(snapshot.projects)
+                if not snapshot.chains[pid]]
+
+    def __contains__(self, project):
+        return base.getid(project) in self._snapshot().projects
+
+    def __iter__(self):
+        return iter(list(self._snapshot().projects.values()))
+
+    def __len__(self):
+        return len(self._snapshot().projects)
+
+
 class ProjectManager(base.CrudManager):
     """Manager class for manipulating Identity projects."""
 
     resource_class = Project
     collection_key = 'projects'
     key = 'project'
+    server_filters = ('name', 'domain_id', 'enabled', 'parent_id', 'is_domain',
+                      'tags', 'tags_any', 'not_tags', 'not_tags_any')
 
     def create(self, name, domain, description=None,
                enabled=True, parent=None, **kwargs):
@@ -141,6 +358,9 @@ class ProjectManager(base.CrudManager):
             fallback_to_auth=True,
             **kwargs)
 
+        if kwargs.get('stream'):
+            return self._with_tags(projects)
+
         base_response = None
         list_data = projects
         if self.client.include_metadata:
@@ -156,6 +376,23 @@ class ProjectManager(base.CrudManager):
 
         return base_response if self.client.include_metadata else list_data
 
+    def _with_tags(self, projects):
+        for p in projects:
+            p.tags = getattr(p, 'tags', [])
+            yield p
+
+    def tree(self, domain=None, refresh_interval=None, **kwargs):
+        """Load the project hierarchy of a domain into memory.
+
+        See :py:class:`ProjectTree` for the arguments.
+
+        :rtype: :py:class:`ProjectTree`
+        """
+        tree = ProjectTree(self, domain=domain,
+                           refresh_interval=refresh_interval, **kwargs)
+        tree.refresh()
+        return tree
+
     def _check_not_parents_as_ids_and_parents_as_list(self, parents_as_ids,
                                                       parents_as_list):
         if parents_as_ids and parents_as_list:
@@ -287,9 +524,7 @@ class ProjectManager(base.CrudManager):
 
         """
         url = "/projects/%s/tags" % base.getid(project)
-        for tag in tags:
-            tag = urllib.parse.quote(tag)
-        resp, body = self.client.put(url, body={"tags": tags})
+        resp, body = self.client.put(url, body={"tags": list(tags)})
         return self._prepare_return_value(resp, body['tags'])
 
     def delete_tag(self, project, tag):
@@ -333,3 +568,90 @@ class ProjectManager(base.CrudManager):
         except exceptions.HttpError as ex:
             # return false with request_id if include_metadata=True
             return self._prepare_return_value(ex.response, False)
+
+    def _change_tags(self, project, add, remove):
+        current = getattr(project, 'tags', None)
+        if current is None:
+            url = "/projects/%s/tags" % base.getid(project)
+            resp, body = self.client.get(url)
+            current = body['tags']
+
+        current = set(current)
+        to_add = add - current
+        to_remove = remove & current
+        tags = sorted((current | to_add) - to_remove)
+
+        # A single tag is changed on its own, which leaves any tag set on the
+        # project concurrently alone. Anything more is replaced in one PUT.
+        if len(to_add) + len(to_remove) == 1:
+            if to_add:
+                self.add_tag(project, to_add.pop())
+            else:
+                self.delete_tag(project, to_remove.pop())
+        elif to_add or to_remove:
+            self.update_tags(project, tags)
+
+        return tags
+
+    def change_tags_many(self, add=None, remove=None, projects=None,
+                         domain=None, max_workers=10, retries=2,
+                         retry_delay=0.5, **kwargs):
+        """Add and remove tags on many projects concurrently.
+
+        For each project only the tags it is missing are added and only the
+        tags it has are removed. A project that needs a single change is
+        changed with one tag request, one that needs more has its tag list
+        replaced with one :py:meth:`update_tags` request, and one that needs
+        none is not requested at all.
+
+        When no projects are given, the projects are selected with a streamed
+        :py:meth:`list`, so that they are changed while later pages of the
+        listing are still being read.
+
+        :param add: the tags to add.
+        :type add: list of str
+        :param remove: the tags to remove.
+        :type remove: list of str
+        :param projects: the projects to change. The current tags of projects
+                         given by ID are requested first. (optional)
+        :type projects: iterable of str or
+                        :class:`keystoneclient.v3.projects.Project`
+        :param domain: the domain of the projects to select when no projects
+                       are given. (optional)
+        :type domain: str or :class:`keystoneclient.v3.domains.Domain`
+        :param int max_workers: the maximum number of projects changed at
+                                once.
+        :param int retries: the number of times a project that failed with a
+                            transient error is attempted again.
+        :param float retry_delay: the bound of the random delay before the
+                                  first retry, doubled for each one after.
+        :param kwargs: any other attribute provided selects the projects when
+                       no projects are given, such as ``tags``, ``tags_any``,
+                       ``not_tags`` and ``not_tags_any``.
+
+        :raises keystoneclient.exceptions.ValidationError: if a tag is both
+            added and removed, or if projects are given along with filters.
+
+        :returns: a :py:class:`keystoneclient.base.BulkResult` for each
+                  project, in order, whose result is the resulting list of
+                  tags of the project.
+        :rtype: list
+        """
+        add = set(add or [])
+        remove = set(remove or [])
+        if add & remove:
+            msg = _('Tags cannot be both added and removed: %s')
+            raise exceptions.ValidationError(
+                msg % ', '.join(sorted(add & remove)))
+
+        if projects is None:
+            projects = self.list(domain=domain, stream=True, **kwargs)
+        elif domain or kwargs:
+            msg = _('Specify either projects or filters, not both')
+            raise exceptions.ValidationError(msg)
+
+        requests = ({'project': project, 'add': add, 'remove': remove}
+                    for project in projects)
+        return self._bulk(self._change_tags, requests,
+                          max_workers=max_workers, retries=retries,
+                          retry_delay=retry_delay)
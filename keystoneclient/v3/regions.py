@@ -34,6 +34,7 @@ class RegionManager(base.CrudManager):
     resource_class = Region
     collection_key = 'regions'
     key = 'region'
+    server_filters = ('parent_region_id',)
 
     @removals.removed_kwarg(
         'enabled',
@@ -10,9 +10,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 from keystoneclient import base
 from keystoneclient import exceptions
 from keystoneclient.i18n import _
+from keystoneclient import utils
 
 
 class RoleAssignment(base.Resource):
@@ -29,6 +32,309 @@ class RoleAssignment(base.Resource):
     pass
 
 
+Assignment = collections.namedtuple(
+    'Assignment',
+    ['actor_type', 'actor_id', 'scope_type', 'scope_id', 'role_id',
+     'inherited'])
+"""A role assignment held by a :py:class:`RoleAssignmentIndex`.
+
+``actor_type`` is ``user`` or ``group``, ``scope_type`` is ``project``,
+``domain`` or ``system`` and ``inherited`` is True for assignments that are
+inherited to the projects beneath their scope.
+"""
+
+
+_IndexSnapshot = collections.namedtuple('_IndexSnapshot',
+                                        ['assignments', 'by', 'role_ids'])
+
+
+class RoleAssignmentIndex(utils.RefreshingSnapshot):
+    """An in-memory index of role assignments.
+
+    The index is loaded with one ``list()`` call per query and answers
+    questions such as whether a user has a role on a project with set
+    lookups. By default effective assignments are loaded, for which the
+    server has already expanded group membership, inheritance and implied
+    roles.
+
+    When non-effective assignments are loaded, inherited assignments are
+    resolved locally if the project hierarchy is provided, and group
+    assignments are resolved for the groups passed to :py:meth:`has_role`.
+
+    :param manager: the manager to list role assignments with.
+    :type manager: :py:class:`RoleAssignmentManager`
+    :param queries: the keyword arguments of each ``list()`` call used to load
+                    the index. By default every assignment is loaded.
+    :type queries: list of dict
+    :param bool effective: load effective role assignments.
+    :param bool include_names: also load names, so that roles can be given by
+                               name.
+    :param projects: projects, with ``id``, ``domain_id`` and ``parent_id``,
+                     used to resolve inherited assignments. (optional)
+    :type projects: list of :py:class:`keystoneclient.v3.projects.Project`
+    :param int refresh_interval: the number of seconds after which the index
+                                 is reloaded the next time it is used. Until
+                                 the reload completes the previous index is
+                                 used. (optional)
+
+    The role assignments API cannot list what changed since a previous
+    listing, so a periodic reload lists every assignment of the queries again
+    and costs as much as the first load. Where the changes are known, such as
+    after granting a role, :py:meth:`refresh_scope` reloads only the
+    assignments of the scope that changed.
+    """
+
+    _FIELDS = ('user', 'group', 'project', 'domain', 'role')
+
+    def __init__(self, manager, queries=None, effective=True,
+                 include_names=False, projects=None, refresh_interval=None):
+        super(RoleAssignmentIndex, self).__init__(
+            refresh_interval=refresh_interval)
+        self.manager = manager
+        self.queries = queries or [{}]
+        self.effective = effective
+        self.include_names = include_names
+
+        self._parents = {}
+        self._project_domains = {}
+        for project in projects or []:
+            self._parents[project.id] = getattr(project, 'parent_id', None)
+            self._project_domains[project.id] = getattr(project, 'domain_id',
+                                                        None)
+
+    @staticmethod
+    def _assignment(ref):
+        scope = getattr(ref, 'scope', {})
+        inherited = 'OS-INHERIT:inherited_to' in scope
+
+        for actor_type in ('user', 'group'):
+            actor = getattr(ref, actor_type, None)
+            if actor:
+                break
+        else:
+            return None
+
+        for scope_type in ('project', 'domain'):
+            if scope_type in scope:
+                scope_id = scope[scope_type]['id']
+                break
+        else:
+            if 'system' not in scope:
+                return None
+            scope_type, scope_id = 'system', 'all'
+
+        return Assignment(actor_type, actor['id'], scope_type, scope_id,
+                          ref.role['id'], inherited)
+
+    def _load(self, filters=None):
+        assignments = set()
+        role_ids = collections.defaultdict(set)
+
+        for query in self.queries:
+            if filters:
+                # a query that conflicts with the filters has no assignment
+                # in the scope
+                if any(key in query and base.getid(query[key]) != value
+                       for key, value in filters.items()):
+                    continue
+                query = dict(query, **filters)
+
+            refs = self.manager.list(effective=self.effective,
+                                     include_names=self.include_names,
+                                     stream=True, **query)
+            for ref in refs:
+                assignment = self._assignment(ref)
+                if assignment is None:
+                    continue
+                assignments.add(assignment)
+                if ref.role.get('name'):
+                    role_ids[ref.role['name']].add(assignment.role_id)
+
+        return assignments, role_ids
+
+    def _fields(self, assignment):
+        yield assignment.actor_type, assignment.actor_id
+        yield assignment.scope_type, assignment.scope_id
+        yield 'role', assignment.role_id
+
+    def _build(self, previous):
+        assignments, role_ids = self._load()
+        return self._index(assignments, role_ids, previous)
+
+    def _index(self, assignments, role_ids, previous):
+        by = dict((field, collections.defaultdict(set))
+                  for field in self._FIELDS)
+        for assignment in assignments:
+            for field, value in self._fields(assignment):
+                if field in by:
+                    by[field][value].add(assignment)
+
+        old = previous.assignments if previous else frozenset()
+        added = len(assignments - old)
+        removed = len(old - assignments)
+
+        snapshot = _IndexSnapshot(frozenset(assignments), by, role_ids)
+        return snapshot, (added, removed)
+
+    def refresh(self):
+        """Reload the index.
+
+        The new index is built while the previous one keeps being used.
+
+        :returns: the number of assignments added and removed.
+        :rtype: tuple
+        """
+        return super(RoleAssignmentIndex, self).refresh()
+
+    def refresh_scope(self, user=None, group=None, project=None, domain=None,
+                      role=None):
+        """Reload only the assignments matching all of the filters.
+
+        The matching assignments are listed again and replace those in the
+        index, the others are kept. The cost is that of listing the matching
+        assignments rather than the whole index.
+
+        :param user: the user whose assignments are reloaded.
+        :type user: str or :class:`keystoneclient.v3.users.User`
+        :param group: the group whose assignments are reloaded.
+        :type group: str or :class:`keystoneclient.v3.groups.Group`
+        :param project: the project whose assignments are reloaded.
+        :type project: str or :class:`keystoneclient.v3.projects.Project`
+        :param domain: the domain whose assignments are reloaded.
+        :type domain: str or :class:`keystoneclient.v3.domains.Domain`
+        :param role: the role whose assignments are reloaded, by ID.
+        :type role: str or :class:`keystoneclient.v3.roles.Role`
+
+        :returns: the number of assignments added and removed.
+        :rtype: tuple
+        """
+        filters = dict((field, base.getid(value)) for field, value in
+                       [('user', user), ('group', group),
+                        ('project', project), ('domain', domain),
+                        ('role', role)] if value)
+        if not filters:
+            msg = _('Specify the scope to reload, or use refresh() to reload '
+                    'the whole index')
+            raise exceptions.ValidationError(msg)
+
+        def amend(previous):
+            fresh, fresh_role_ids = self._load(filters)
+            stale = self._select(previous,
+                                 [previous.by[field].get(value, set())
+                                  for field, value in filters.items()])
+
+            role_ids = collections.defaultdict(set)
+            for name, ids in previous.role_ids.items():
+                role_ids[name].update(ids)
+            for name, ids in fresh_role_ids.items():
+                role_ids[name].update(ids)
+
+            assignments = (previous.assignments - stale) | fresh
+            return self._index(assignments, role_ids, previous)
+
+        return self._amend(amend)
+
+    @staticmethod
+    def _resolve_role(snapshot, role):
+        role_id = base.getid(role)
+        return snapshot.role_ids.get(role_id, set()) | {role_id}
+
+    def _ancestors(self, project_id):
+        seen = set()
+        parent = self._parents.get(project_id)
+        while parent and parent not in seen and parent in self._parents:
+            seen.add(parent)
+            yield parent
+            parent = self._parents.get(parent)
+
+    def has_role(self, role, user=None, group=None, project=None,
+                 domain=None, system=None, groups=None):
+        """Check whether a user or group has a role on a target.
+
+        :param role: the role, by ID or by name if names were loaded.
+        :type role: str or :class:`keystoneclient.v3.roles.Role`
+        :param user: the user to check.
+        :type user: str or :class:`keystoneclient.v3.users.User`
+        :param group: the group to check.
+        :type group: str or :class:`keystoneclient.v3.groups.Group`
+        :param project: the project to check the role on.
+        :type project: str or :class:`keystoneclient.v3.projects.Project`
+        :param domain: the domain to check the role on.
+        :type domain: str or :class:`keystoneclient.v3.domains.Domain`
+        :param system: check the role on the system, only ``all`` is
+                       supported.
+        :type system: str
+        :param groups: groups whose assignments also count, such as the
+                       groups of the user. (optional)
+        :type groups: list of str or :class:`keystoneclient.v3.groups.Group`
+
+        :rtype: bool
+        """
+        actors = []
+        if user:
+            actors.append(('user', base.getid(user)))
+        if group:
+            actors.append(('group', base.getid(group)))
+        actors.extend(('group', base.getid(g)) for g in groups or [])
+
+        scopes = []
+        if project:
+            project_id = base.getid(project)
+            scopes.append(('project', project_id, False))
+            for ancestor in self._ancestors(project_id):
+                scopes.append(('project', ancestor, True))
+            domain_id = self._project_domains.get(project_id)
+            if domain_id:
+                scopes.append(('domain', domain_id, True))
+        elif domain:
+            scopes.append(('domain', base.getid(domain), False))
+        elif system:
+            scopes.append(('system', system, False))
+
+        snapshot = self._snapshot()
+        role_ids = self._resolve_role(snapshot, role)
+
+        return any(
+            Assignment(actor_type, actor_id, scope_type, scope_id,
+                       role_id, inherited) in snapshot.assignments
+            for actor_type, actor_id in actors
+            for scope_type, scope_id, inherited in scopes
+            for role_id in role_ids)
+
+    def assignments(self, user=None, group=None, project=None, domain=None,
+                    role=None):
+        """Return the indexed assignments matching all of the filters.
+
+        :returns: the matching assignments.
+        :rtype: set of :py:class:`Assignment`
+        """
+        filters = [('user', user), ('group', group), ('project', project),
+                   ('domain', domain)]
+
+        snapshot = self._snapshot()
+
+        candidates = [snapshot.by[field].get(base.getid(value), set())
+                      for field, value in filters if value]
+        if role:
+            candidates.append(set().union(
+                *(snapshot.by['role'].get(role_id, set())
+                  for role_id in self._resolve_role(snapshot, role))))
+
+        return self._select(snapshot, candidates)
+
+    @staticmethod
+    def _select(snapshot, candidates):
+        # The assignments in all of the candidate sets.
+        if not candidates:
+            return set(snapshot.assignments)
+
+        candidates.sort(key=len)
+        return set(candidates[0].intersection(*candidates[1:]))
+
+    def __len__(self):
+        return len(self._snapshot().assignments)
+
+
 class RoleAssignmentManager(base.CrudManager):
     """Manager class for manipulating Identity roles assignments."""
 
@@ -64,7 +370,7 @@ class RoleAssignmentManager(base.CrudManager):
     def list(self, user=None, group=None, project=None, domain=None,
              system=False, role=None, effective=False,
              os_inherit_extension_inherited_to=None, include_subtree=False,
-             include_names=False):
+             include_names=False, stream=False, page_size=None):
         """List role assignments.
 
         If no arguments are provided, all role assignments in the
@@ -91,6 +397,10 @@ class RoleAssignmentManager(base.CrudManager):
         :param boolean include_subtree: Include subtree (optional)
         :param boolean include_names: Display names instead
                                       of IDs. (optional)
+        :param boolean stream: Return a generator that fetches the assignments
+                               a page at a time instead of a list. (optional)
+        :param int page_size: The number of assignments to request per page
+                              when streaming. (optional)
         """
         self._check_not_user_and_group(user, group)
         self._check_not_domain_and_project(domain, project)
@@ -121,7 +431,25 @@ class RoleAssignmentManager(base.CrudManager):
         if include_subtree:
             query_params['include_subtree'] = include_subtree
 
-        return super(RoleAssignmentManager, self).list(**query_params)
+        return super(RoleAssignmentManager, self).list(stream=stream,
+                                                       page_size=page_size,
+                                                       **query_params)
+
+    def index(self, queries=None, effective=True, include_names=False,
+              projects=None, refresh_interval=None):
+        """Build an in-memory index of role assignments.
+
+        See :py:class:`RoleAssignmentIndex` for the arguments.
+
+        :rtype: :py:class:`RoleAssignmentIndex`
+        """
+        index = RoleAssignmentIndex(self, queries=queries,
+                                    effective=effective,
+                                    include_names=include_names,
+                                    projects=projects,
+                                    refresh_interval=refresh_interval)
+        index.refresh()
+        return index
 
     def create(self, **kwargs):
         raise exceptions.MethodNotImplemented(
@@ -52,6 +52,7 @@ class RoleManager(base.CrudManager):
     resource_class = Role
     collection_key = 'roles'
     key = 'role'
+    server_filters = ('name', 'domain_id')
     deprecation_msg = 'keystoneclient.v3.roles.InferenceRuleManager'
 
     def _role_grants_base_url(self, user, group, system, domain, project,
@@ -285,6 +286,62 @@ class RoleManager(base.CrudManager):
                                             role_id=base.getid(role),
                                             **kwargs)
 
+    def _validate_bulk(self, grants):
+        requests = []
+
+        for index, grant in enumerate(grants):
+            grant = dict(grant)
+            try:
+                if not grant.get('role'):
+                    raise exceptions.ValidationError(_('Must specify a role'))
+
+                self._enforce_mutually_exclusive_group(grant.get('system'),
+                                                       grant.get('domain'),
+                                                       grant.get('project'))
+                self._require_user_xor_group(grant.get('user'),
+                                             grant.get('group'))
+                self._role_grants_base_url(
+                    grant.get('user'), grant.get('group'),
+                    grant.get('system'), grant.get('domain'),
+                    grant.get('project'),
+                    grant.get('os_inherit_extension_inherited'))
+            except exceptions.ValidationError as e:
+                msg = _('Invalid role assignment %(index)d: %(error)s') % {
+                    'index': index, 'error': e}
+                raise exceptions.ValidationError(msg)
+
+            requests.append(grant)
+
+        return requests
+
+    def grant_many(self, grants, max_workers=10, retries=2, retry_delay=0.5):
+        """Grant many roles concurrently.
+
+        All the grants are validated before any of them is made, and a grant
+        that fails with a transient error, such as a connection failure or a
+        503 response, is attempted again.
+
+        :param grants: the grants to make, each a dict of the keyword
+                       arguments of :py:meth:`grant`, for example
+                       ``{'role': role, 'user': user, 'project': project}``.
+        :type grants: iterable of dict
+        :param int max_workers: the maximum number of requests in flight.
+        :param int retries: the number of times a grant that failed with a
+                            transient error is attempted again.
+        :param float retry_delay: the bound of the random delay before the
+                                  first retry, doubled for each one after.
+
+        :raises keystoneclient.exceptions.ValidationError: if any of the
+            grants is invalid, in which case none are made.
+
+        :returns: a :py:class:`keystoneclient.base.BulkResult` for each
+                  grant, in order.
+        :rtype: list
+        """
+        return self._bulk(self.grant, self._validate_bulk(grants),
+                          max_workers=max_workers, retries=retries,
+                          retry_delay=retry_delay)
+
     def check(self, role, user=None, group=None, system=None, domain=None,
               project=None, os_inherit_extension_inherited=False, **kwargs):
         """Check if a user or group has a role on a domain or project.
@@ -389,6 +446,35 @@ class RoleManager(base.CrudManager):
             os_inherit_extension_inherited=os_inherit_extension_inherited,
             **kwargs)
 
+    def revoke_many(self, grants, max_workers=10, retries=2,
+                    retry_delay=0.5):
+        """Revoke many roles concurrently.
+
+        All the grants are validated before any of them is revoked, and a
+        revocation that fails with a transient error, such as a connection
+        failure or a 503 response, is attempted again.
+
+        :param grants: the grants to revoke, each a dict of the keyword
+                       arguments of :py:meth:`revoke`, for example
+                       ``{'role': role, 'group': group, 'domain': domain}``.
+        :type grants: iterable of dict
+        :param int max_workers: the maximum number of requests in flight.
+        :param int retries: the number of times a revocation that failed with
+                            a transient error is attempted again.
+        :param float retry_delay: the bound of the random delay before the
+                                  first retry, doubled for each one after.
+
+        :raises keystoneclient.exceptions.ValidationError: if any of the
+            grants is invalid, in which case none are revoked.
+
+        :returns: a :py:class:`keystoneclient.base.BulkResult` for each
+                  grant, in order.
+        :rtype: list
+        """
+        return self._bulk(self.revoke, self._validate_bulk(grants),
+                          max_workers=max_workers, retries=retries,
+                          retry_delay=retry_delay)
+
     @removals.remove(message='Use %s.create instead.' % deprecation_msg,
                      version='3.9.0', removal_version='4.0.0')
     def create_implied(self, prior_role, implied_role, **kwargs):
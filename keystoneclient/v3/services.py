@@ -38,6 +38,7 @@ class ServiceManager(base.CrudManager):
     resource_class = Service
     collection_key = 'services'
     key = 'service'
+    server_filters = ('type',)
 
     def create(self, name, type=None,
                enabled=True, description=None, **kwargs):
@@ -10,8 +10,13 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+
+from oslo_utils import timeutils
+
 from keystoneclient import access
 from keystoneclient import base
+from keystoneclient import utils
 
 
 def _calc_id(token):
@@ -22,10 +27,28 @@ def _calc_id(token):
 
 
 class TokenManager(object):
-    """Manager class for manipulating Identity tokens."""
+    """Manager class for manipulating Identity tokens.
+
+    :param client: The adapter used to talk to the identity server.
+    :param cache: An optional cache in which the results of token validation
+                  are kept. Entries never outlive the token they describe and
+                  are removed when the token is revoked through this manager.
+                  The data of a token fetched with ``allow_expired`` is kept
+                  for at most ALLOW_EXPIRED_CACHE_SECONDS, as it is still
+                  returned once the token has expired.
+    :type cache: :py:class:`keystoneclient.cache.MemoryCache`
 
-    def __init__(self, client):
+    """
+
+    ALLOW_EXPIRED_CACHE_SECONDS = 60
+
+    def __init__(self, client, cache=None):
         self._client = client
+        self.cache = cache
+
+    def _purge_cache(self, token_id):
+        if self.cache is not None:
+            self.cache.delete_if(lambda key: key[0] == token_id)
 
     def revoke_token(self, token):
         """Revoke a token.
@@ -36,7 +59,12 @@ class TokenManager(object):
         """
         token_id = _calc_id(token)
         headers = {'X-Subject-Token': token_id}
-        return self._client.delete('/auth/tokens', headers=headers)
+        try:
+            return self._client.delete('/auth/tokens', headers=headers)
+        finally:
+            # purged once the server has answered, so that a validation that
+            # completed while the request was in flight is not kept
+            self._purge_cache(token_id)
 
     def get_revoked(self, audit_id_only=False):
         """Get revoked tokens list.
@@ -75,6 +103,14 @@ class TokenManager(object):
         :rtype: dict
 
         """
+        cache_key = (token, include_catalog, allow_expired,
+                     access_rules_support)
+
+        if self.cache is not None:
+            body = self.cache.get(cache_key)
+            if body is not None:
+                return copy.deepcopy(body)
+
         headers = {'X-Subject-Token': token}
         if access_rules_support:
             headers['OpenStack-Identity-Access-Rules'] = access_rules_support
@@ -91,6 +127,17 @@ class TokenManager(object):
             url = '%s?%s' % (url, '&'.join(flags))
 
         resp, body = self._client.get(url, headers=headers)
+
+        if self.cache is not None:
+            ttl = expires = None
+            if allow_expired:
+                ttl = self.ALLOW_EXPIRED_CACHE_SECONDS
+            else:
+                expires = timeutils.normalize_time(
+                    timeutils.parse_isotime(body['token']['expires_at']))
+            self.cache.set(cache_key, copy.deepcopy(body), ttl=ttl,
+                           expires=expires)
+
         return body
 
     def validate(self, token, include_catalog=True, allow_expired=False,
@@ -119,3 +166,46 @@ class TokenManager(object):
                                    allow_expired=allow_expired,
                                    access_rules_support=access_rules_support)
         return access.AccessInfo.factory(auth_token=token_id, body=body)
+
+    def validate_many(self, tokens, include_catalog=True, allow_expired=False,
+                      access_rules_support=None, max_workers=10):
+        """Validate many tokens concurrently.
+
+        The tokens are validated over a bounded pool of threads sharing the
+        client's session, and each distinct token is only validated once.
+
+        :param tokens: The tokens to be validated.
+        :type tokens: list of str or :class:`keystoneclient.access.AccessInfo`
+        :param include_catalog: If False, the response is requested to not
+                                include the catalog.
+        :param allow_expired: If True the tokens will be validated and returned
+                              if they have already expired.
+        :type allow_expired: bool
+        :param access_rules_support: Version number indicating that the client
+                                     is capable of enforcing keystone
+                                     access rules, if unset this client
+                                     does not support access rules.
+        :type access_rules_support: float
+        :param int max_workers: The maximum number of validation requests in
+                                flight at once.
+
+        :returns: A list holding, in the order the tokens were given, the
+                  :class:`keystoneclient.access.AccessInfoV3` of each token or
+                  the exception raised while validating it. Duplicated tokens
+                  share the same result.
+        :rtype: list
+
+        """
+        token_ids = [_calc_id(token) for token in tokens]
+        unique_ids = list(dict.fromkeys(token_ids))
+
+        def validate(token_id):
+            return self.validate(token_id,
+                                 include_catalog=include_catalog,
+                                 allow_expired=allow_expired,
+                                 access_rules_support=access_rules_support)
+
+        results = utils.map_concurrently(validate, unique_ids,
+                                         max_workers=max_workers)
+        results = dict(zip(unique_ids, results))
+        return [results[token_id] for token_id in token_ids]
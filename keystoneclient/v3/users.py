@@ -15,6 +15,7 @@
 #    under the License.
 
 from debtcollector import renames
+from oslo_utils import timeutils
 
 from keystoneclient import base
 from keystoneclient import exceptions
@@ -32,12 +33,52 @@ class User(base.Resource):
     pass
 
 
+class GroupMembershipReport(object):
+    """The outcome of reconciling the members of a group.
+
+    Attributes:
+        * group_id: the ID of the reconciled group
+        * added: a :py:class:`keystoneclient.base.BulkResult` for each user
+          that was added to the group
+        * removed: a :py:class:`keystoneclient.base.BulkResult` for each user
+          that was removed from the group
+        * unchanged: the number of users that were already members
+        * elapsed: the number of seconds the reconciliation took
+        * dry_run: whether the changes were only planned, in which case the
+          results in added and removed are marked as planned
+
+    """
+
+    def __init__(self, group_id, dry_run=False):
+        self.group_id = group_id
+        self.added = []
+        self.removed = []
+        self.unchanged = 0
+        self.elapsed = 0.0
+        self.dry_run = dry_run
+
+    @property
+    def failed(self):
+        """The results of the additions and removals that failed."""
+        return [r for r in self.added + self.removed if r.error is not None]
+
+    def __repr__(self):
+        """Return string representation of the report."""
+        return ('<GroupMembershipReport group_id=%s%s added=%d removed=%d '
+                'unchanged=%d failed=%d elapsed=%.3fs>' % (
+                    self.group_id, ' dry_run' if self.dry_run else '',
+                    len(self.added), len(self.removed),
+                    self.unchanged, len(self.failed), self.elapsed))
+
+
 class UserManager(base.CrudManager):
     """Manager class for manipulating Identity users."""
 
     resource_class = User
     collection_key = 'users'
     key = 'user'
+    server_filters = ('name', 'domain_id', 'enabled', 'idp_id', 'protocol_id',
+                      'unique_id', 'password_expires_at')
 
     def _require_user_and_group(self, user, group):
         if not (user and group):
@@ -282,6 +323,73 @@ class UserManager(base.CrudManager):
             base_url=base_url,
             user_id=base.getid(user))
 
+    def reconcile_group(self, group, users, dry_run=False, max_workers=10,
+                        retries=2, retry_delay=0.5):
+        """Make the members of a group exactly the specified users.
+
+        The current members are listed once and only the users that are
+        missing are added and the extra ones removed, concurrently.
+
+        :param group: the group to reconcile.
+        :type group: str or :class:`keystoneclient.v3.groups.Group`
+        :param users: the users that should be members of the group.
+        :type users: iterable of str or :class:`keystoneclient.v3.users.User`
+        :param bool dry_run: only work out the changes to make. The results
+                             in the report are marked as planned and are
+                             not attempted.
+        :param int max_workers: the maximum number of requests in flight.
+        :param int retries: the number of times a change that failed with a
+                            transient error is attempted again.
+        :param float retry_delay: the bound of the random delay before the
+                                  first retry, doubled for each one after.
+
+        :returns: the changes made, or that would be made for a dry run.
+        :rtype: :class:`keystoneclient.v3.users.GroupMembershipReport`
+
+        """
+        if not group:
+            msg = _('Specify a group')
+            raise exceptions.ValidationError(msg)
+
+        watch = timeutils.StopWatch()
+        watch.start()
+
+        group_id = base.getid(group)
+        report = GroupMembershipReport(group_id, dry_run=dry_run)
+
+        desired = set(base.getid(u) for u in users)
+        current = set(u.id for u in self.list(group=group_id, stream=True))
+
+        to_add = [{'user': u, 'group': group_id}
+                  for u in sorted(desired - current)]
+        to_remove = [{'user': u, 'group': group_id}
+                     for u in sorted(current - desired)]
+        report.unchanged = len(desired & current)
+
+        if dry_run:
+            report.added = [base.BulkResult(r, planned=True) for r in to_add]
+            report.removed = [base.BulkResult(r, planned=True)
+                              for r in to_remove]
+        else:
+            outcomes = self._bulk(self._apply_membership,
+                                  [dict(r, add=True) for r in to_add] +
+                                  [dict(r, add=False) for r in to_remove],
+                                  max_workers=max_workers, retries=retries,
+                                  retry_delay=retry_delay)
+            for outcome in outcomes:
+                outcome.request.pop('add')
+            report.added = outcomes[:len(to_add)]
+            report.removed = outcomes[len(to_add):]
+
+        watch.stop()
+        report.elapsed = watch.elapsed()
+        return report
+
+    def _apply_membership(self, user, group, add):
+        if add:
+            return self.add_to_group(user, group)
+        return self.remove_from_group(user, group)
+
     def delete(self, user):
         """Delete a user.
 